@@ -10,18 +10,48 @@ from app.models.schemas import (
     ProcessingStatus,
     BatchProcessResponse
 )
-from app.services.processing_service import get_processing_service
+from app.services.processing_service import get_processing_service, preprocess_stats
+from app.services.ocr_service import hedge_policy, recognition_cache, region_stats
+from app.services.engine_router import engine_router
+from app.services.warmup import warmup_state
+from app.utils.image_preprocessing import ImagePreprocessor
+from app.utils.memory import read_memory_usage
+from app.core.threading_config import threading_report
 from app.core.config import settings
 
 
 router = APIRouter()
 
 
+def parse_preprocess_steps(profile: Optional[str], steps: Optional[str]) -> Optional[List[str]]:
+    """
+    Validate the requested preprocessing profile or steps
+    
+    Args:
+        profile: Profile name from the request
+        steps: Comma-separated step names from the request
+        
+    Returns:
+        Step names, or None to use the profile
+        
+    Raises:
+        HTTPException: 400 if the profile or a step is unknown
+    """
+    names = [name.strip() for name in steps.split(",") if name.strip()] if steps else None
+    try:
+        ImagePreprocessor.resolve_steps(profile, names)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return names
+
+
 @router.post("/process", response_model=ProcessResponse)
 async def process_image(
     file: UploadFile = File(..., description="Image file (JPG, PNG)"),
     preprocess: bool = Form(True, description="Enable image preprocessing"),
-    ocr_engine: Optional[str] = Form(None, description="Specific OCR engine to use (paddleocr, easyocr)")
+    ocr_engine: Optional[str] = Form(None, description="Specific OCR engine to use (paddleocr, easyocr, onnx, tesseract)"),
+    preprocess_profile: Optional[str] = Form(None, description="Preprocessing profile (default, light, ...)"),
+    preprocess_steps: Optional[str] = Form(None, description="Comma-separated preprocessing steps, overriding the profile")
 ):
     """
     Process a single image and extract slip data
@@ -29,9 +59,13 @@ async def process_image(
     - **file**: Image file to process
     - **preprocess**: Enable/disable image preprocessing
     - **ocr_engine**: Optional specific OCR engine to use
+    - **preprocess_profile**: Optional preprocessing profile
+    - **preprocess_steps**: Optional comma-separated preprocessing steps
     
     Returns job_id for tracking the processing status
     """
+    steps = parse_preprocess_steps(preprocess_profile, preprocess_steps)
+    
     # Validate file type
     if not file.filename:
         raise HTTPException(
@@ -75,7 +109,9 @@ async def process_image(
         result = await processing_service.process_image(
             image_data=image_data,
             preprocess=preprocess,
-            ocr_engine=ocr_engine
+            ocr_engine=ocr_engine,
+            preprocess_profile=preprocess_profile,
+            preprocess_steps=steps
         )
         
         return ProcessResponse(
@@ -159,7 +195,9 @@ async def get_result(job_id: str):
 async def process_batch(
     files: List[UploadFile] = File(..., description="Multiple image files"),
     preprocess: bool = Form(True, description="Enable image preprocessing"),
-    ocr_engine: Optional[str] = Form(None, description="Specific OCR engine to use")
+    ocr_engine: Optional[str] = Form(None, description="Specific OCR engine to use"),
+    preprocess_profile: Optional[str] = Form(None, description="Preprocessing profile (default, light, ...)"),
+    preprocess_steps: Optional[str] = Form(None, description="Comma-separated preprocessing steps, overriding the profile")
 ):
     """
     Process multiple images in batch
@@ -167,9 +205,13 @@ async def process_batch(
     - **files**: List of image files to process
     - **preprocess**: Enable/disable image preprocessing
     - **ocr_engine**: Optional specific OCR engine to use
+    - **preprocess_profile**: Optional preprocessing profile
+    - **preprocess_steps**: Optional comma-separated preprocessing steps
     
     Returns batch_id and individual job_ids for tracking
     """
+    steps = parse_preprocess_steps(preprocess_profile, preprocess_steps)
+    
     if len(files) > settings.BATCH_SIZE:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -218,7 +260,9 @@ async def process_batch(
             images=images_data,
             batch_id=batch_id,
             preprocess=preprocess,
-            ocr_engine=ocr_engine
+            ocr_engine=ocr_engine,
+            preprocess_profile=preprocess_profile,
+            preprocess_steps=steps
         )
         
         job_ids = [result.job_id for result in results]
@@ -235,3 +279,51 @@ async def process_batch(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Batch processing failed: {str(e)}"
         )
+
+
+@router.get("/metrics", response_model=dict)
+async def get_metrics():
+    """
+    Get runtime metrics of the OCR pipeline
+    
+    Returns worker pool queue depth and busy-worker count, realized
+    micro-batch sizes and queue wait times, hedging statistics, per-engine
+    circuit state with rolling latency, error rate and confidence, the share
+    of detected text lines recognized in region mode, line cache hit rate
+    and CPU saved, time and memory of each preprocessing step, load state and resident memory of each configured
+    engine, and the startup warm-up duration
+    """
+    processing_service = get_processing_service()
+    
+    try:
+        process_memory = read_memory_usage()
+    except OSError:
+        process_memory = None
+    
+    return {
+        "worker_pool": processing_service.worker_pool.stats(),
+        "micro_batching": processing_service.scheduler.stats(),
+        "hedging": hedge_policy.stats(),
+        "routing": engine_router.stats(),
+        "regions": region_stats.stats(),
+        "line_cache": {"enabled": settings.OCR_LINE_CACHE_ENABLED, **recognition_cache.stats()},
+        "preprocessing": preprocess_stats.stats(),
+        "engines": processing_service.ocr_engine.memory_report() if processing_service.ocr_engine else None,
+        "process_memory": process_memory,
+        "warmup": warmup_state.stats()
+    }
+
+
+@router.get("/diagnostics", response_model=dict)
+async def get_diagnostics():
+    """
+    Get the effective runtime configuration of this worker process
+    
+    Returns the detected CPU limit and its source (cgroup quota or affinity
+    mask), the CPU affinity, the configured intra-op thread count, the
+    OpenMP/BLAS environment and the thread counts reported by OpenCV,
+    Torch, Paddle and ONNX Runtime
+    """
+    return {
+        "threading": threading_report()
+    }
@@ -2,18 +2,28 @@
 Health and monitoring endpoints for OCR service
 """
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
 from typing import Dict, Any
 from datetime import datetime
 import sys
 import platform
 
 from app.services.ocr_service import get_ocr_engine, PADDLE_AVAILABLE, EASYOCR_AVAILABLE
+from app.services.onnx_engine import ONNX_AVAILABLE
 from app.services.redis_service import get_redis_service
+from app.services.warmup import warmup_state
 from app.core.config import settings
 
 router = APIRouter(tags=["Health"])
 
 
+def _ocr_available() -> bool:
+    """Check the local OCR engine; pool processes or the model server own it in the other modes"""
+    if settings.OCR_WORKER_MODE != "thread":
+        return warmup_state.ready and warmup_state.status != "failed"
+    return get_ocr_engine().is_available()
+
+
 @router.get("/health")
 async def health_check() -> Dict[str, Any]:
     """
@@ -29,8 +39,7 @@ async def health_check() -> Dict[str, Any]:
     issues = []
     
     # Check OCR engine
-    ocr_engine = get_ocr_engine()
-    ocr_available = ocr_engine.is_available()
+    ocr_available = _ocr_available()
     if not ocr_available:
         health_status = "degraded"
         issues.append("OCR engine not available")
@@ -46,14 +55,16 @@ async def health_check() -> Dict[str, Any]:
     return {
         "status": health_status,
         "timestamp": datetime.utcnow().isoformat(),
-        "version": settings.API_VERSION,
-        "service": settings.API_TITLE,
+        "version": settings.APP_VERSION,
+        "service": settings.APP_NAME,
         "components": {
             "ocr_engine": {
                 "status": "up" if ocr_available else "down",
                 "paddleocr": PADDLE_AVAILABLE,
-                "easyocr": EASYOCR_AVAILABLE
+                "easyocr": EASYOCR_AVAILABLE,
+                "onnx": ONNX_AVAILABLE
             },
+            "warmup": warmup_state.stats(),
             "redis": {
                 "status": "up" if redis_connected else "down",
                 "host": settings.REDIS_HOST
@@ -74,19 +85,26 @@ async def liveness_probe() -> Dict[str, str]:
 
 
 @router.get("/health/ready")
-async def readiness_probe() -> Dict[str, Any]:
+async def readiness_probe():
     """
     Kubernetes readiness probe endpoint
     
-    Returns 200 only if the service is ready to accept requests
+    Returns 200 only if the service is ready to accept requests: the
+    startup warm-up has finished and an OCR engine is available.
+    Returns 503 otherwise.
     """
-    ocr_engine = get_ocr_engine()
-    is_ready = ocr_engine.is_available()
+    warmed_up = warmup_state.ready
+    ocr_available = warmed_up and _ocr_available()
+    is_ready = warmed_up and ocr_available
     
-    return {
-        "status": "ready" if is_ready else "not_ready",
-        "ocr_available": is_ready
-    }
+    return JSONResponse(
+        status_code=200 if is_ready else 503,
+        content={
+            "status": "ready" if is_ready else "not_ready",
+            "ocr_available": ocr_available,
+            "warmup": warmup_state.status
+        }
+    )
 
 
 @router.get("/metrics")
@@ -99,14 +117,12 @@ async def get_metrics() -> Dict[str, Any]:
     - Configuration
     - Engine status
     """
-    ocr_engine = get_ocr_engine()
-    
     return {
         "timestamp": datetime.utcnow().isoformat(),
         "service": {
-            "name": settings.API_TITLE,
-            "version": settings.API_VERSION,
-            "environment": settings.ENVIRONMENT
+            "name": settings.APP_NAME,
+            "version": settings.APP_VERSION,
+            "environment": "development" if settings.DEBUG else "production"
         },
         "system": {
             "python_version": sys.version,
@@ -123,8 +139,10 @@ async def get_metrics() -> Dict[str, Any]:
         "engines": {
             "paddleocr": PADDLE_AVAILABLE,
             "easyocr": EASYOCR_AVAILABLE,
-            "current": ocr_engine.engine if ocr_engine.is_available() else None
-        }
+            "onnx": ONNX_AVAILABLE,
+            "configured": list(settings.OCR_ENGINES)
+        },
+        "warmup": warmup_state.stats()
     }
 
 
@@ -136,9 +154,9 @@ async def service_info() -> Dict[str, Any]:
     Returns API documentation and configuration info
     """
     return {
-        "name": settings.API_TITLE,
-        "description": settings.API_DESCRIPTION,
-        "version": settings.API_VERSION,
+        "name": settings.APP_NAME,
+        "description": "OCR microservice for Thai bank slip verification",
+        "version": settings.APP_VERSION,
         "documentation": {
             "openapi": "/docs",
             "redoc": "/redoc"
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Any, Optional
 
 
 class Settings(BaseSettings):
@@ -14,6 +14,8 @@ class Settings(BaseSettings):
     API_PREFIX: str = "/api/ocr"
     HOST: str = "0.0.0.0"
     PORT: int = 8000
+    WORKERS: int = 1  # uvicorn worker processes forked by app.prefork
+    OCR_PRELOAD_MODELS: bool = True  # load models in the pre-fork master, shared copy-on-write
     
     # Redis settings
     REDIS_HOST: str = "redis"
@@ -23,9 +25,93 @@ class Settings(BaseSettings):
     REDIS_CACHE_TTL: int = 3600  # 1 hour
     
     # OCR settings
-    OCR_ENGINES: list[str] = ["paddleocr", "easyocr"]
+    OCR_ENGINES: list[str] = ["paddleocr", "easyocr"]  # priority order; first is loaded eagerly
+    OCR_MEMORY_BUDGET_MB: int = 0  # unload LRU secondary engines above this (0 = unlimited)
     OCR_LANGUAGES: list[str] = ["th", "en"]
     OCR_CONFIDENCE_THRESHOLD: float = 0.6
+    OCR_REC_BATCH_SIZE: int = 8  # text line crops per recognizer batch
+    OCR_WARMUP_ENABLED: bool = True  # readiness waits for warm-up
+    OCR_WARMUP_SIZES: list[int] = [640, 1280, 1920]  # synthetic slip heights
+    
+    # Page orientation: one thumbnail check instead of per-line angle classification
+    OCR_ORIENTATION_CHECK: bool = True  # rotate sideways / upside-down slips before OCR
+    OCR_ANGLE_CLS: bool = False  # PaddleOCR's per-line 180-degree classifier
+    
+    # Resolution bound applied before preprocessing and OCR (0 disables a limit)
+    OCR_MAX_LONG_EDGE: int = 2400  # pixels
+    OCR_MAX_PIXELS: int = 4_000_000
+    OCR_DECODE_REDUCED: bool = True  # decode large JPEGs at 1/2, 1/4 or 1/8 scale when the bound allows
+    
+    # Denoising: "auto" picks none / bilateral / nlm from a fast noise estimate
+    OCR_DENOISE_MODE: str = "auto"  # auto, none, bilateral, nlm
+    OCR_DENOISE_LIGHT_SIGMA: float = 2.0  # estimated noise sigma from which the bilateral filter runs
+    OCR_DENOISE_NLM_SIGMA: float = 6.0  # ... and from which non-local means runs
+    
+    # Preprocessing profiles: named step lists, each step {"step": name, **params}
+    OCR_PREPROCESS_PROFILE: str = "default"  # profile used when a request names none
+    OCR_PREPROCESS_PROFILES: dict[str, list[dict[str, Any]]] = {
+        "default": [
+            {"step": "limit_resolution"},
+            {"step": "grayscale"},
+            {"step": "denoise"},
+            {"step": "deskew"},
+            {"step": "threshold", "block_size": 11, "c": 2},
+            {"step": "remove_borders", "border_size": 10},
+            {"step": "enhance_contrast", "clip_limit": 2.0, "tile_size": 8}
+        ],
+        "light": [
+            {"step": "limit_resolution"},
+            {"step": "grayscale"},
+            {"step": "deskew"}
+        ]
+    }
+    OCR_PREPROCESS_TRACE_MEMORY: bool = False  # per-step peak allocations via tracemalloc
+    
+    # Region mode: detect once, recognize only lines that can hold fields
+    OCR_REGION_MODE: bool = False
+    OCR_REGION_FOOTER_FRACTION: float = 0.12  # bottom share of the slip treated as footer
+    OCR_REGION_MAX_HEIGHT_RATIO: float = 3.0  # taller lines (x median) are banners
+    
+    # Line recognition cache: reuse recognitions of static slip labels
+    OCR_LINE_CACHE_ENABLED: bool = False
+    OCR_LINE_CACHE_SIZE: int = 4096  # line recognitions kept (LRU)
+    OCR_LINE_CACHE_HEIGHT: int = 16  # crop height (px) fingerprints are taken at
+    
+    # Pre-OCR bank/layout classifier on thumbnails
+    OCR_CLASSIFIER_ENABLED: bool = False
+    OCR_BANK_REFERENCE_DIR: str = "app/data/bank_references"  # <BANK>_<layout>*.png reference slips
+    OCR_CLASSIFIER_MIN_CONFIDENCE: float = 0.8  # below this, the bank comes from the OCR text
+    
+    # QR fast path: fields from the slip's verification / PromptPay QR code
+    OCR_QR_ENABLED: bool = False
+    
+    # Slip layout templates: read only the field regions of known bank layouts
+    OCR_TEMPLATES_ENABLED: bool = False
+    OCR_TEMPLATE_DIR: str = "app/data/templates"  # one JSON file per bank and layout version
+    OCR_TEMPLATE_MIN_SCORE: float = 0.8  # weaker matches run the full pipeline
+    
+    # Tesseract settings ("tesseract" in OCR_ENGINES, and field regions)
+    OCR_TESSERACT_CMD: Optional[str] = None  # tesseract binary, if not on PATH
+    OCR_FIELD_ENGINE: str = "tesseract"  # Engine tried first for field regions (recognize_field)
+    
+    # ONNX Runtime engine settings ("onnx" in OCR_ENGINES)
+    OCR_ONNX_DET_MODEL: str = "models/onnx/det.onnx"
+    OCR_ONNX_REC_MODEL: str = "models/onnx/rec.onnx"
+    OCR_ONNX_CHARSET: str = "models/onnx/charset.txt"
+    OCR_ONNX_QUANTIZE: bool = False  # dynamic INT8 quantization on load
+    OCR_ONNX_THREADS: int = 0  # intra-op threads per session (0 = ONNX Runtime default)
+    
+    # Cascade settings: cheapest engine first, escalate below the threshold
+    OCR_CASCADE_ENABLED: bool = False
+    OCR_CASCADE_ORDER: list[str] = ["paddleocr", "easyocr"]
+    OCR_CASCADE_REQUIRED_FIELDS: list[str] = ["amount"]
+    OCR_CASCADE_PREPROCESS_STAGE: bool = True  # retry with the other preprocessing setting
+    
+    # Hedging settings: start the secondary engine when the primary stalls
+    OCR_HEDGING_ENABLED: bool = False
+    OCR_HEDGE_PERCENTILE: float = 95.0  # of the primary engine's recent latency
+    OCR_HEDGE_MIN_SAMPLES: int = 20
+    OCR_HEDGE_MAX_RATIO: float = 0.1  # max share of recent requests that may be hedged
     
     # Image processing settings
     MAX_IMAGE_SIZE: int = 10 * 1024 * 1024  # 10MB
@@ -37,6 +123,32 @@ class Settings(BaseSettings):
     BATCH_SIZE: int = 10
     RETRY_ATTEMPTS: int = 3
     
+    # Engine routing and circuit breaker settings
+    OCR_ROUTER_STRATEGY: str = "priority"  # priority (OCR_ENGINES order) or fastest (recent p50)
+    OCR_CIRCUIT_WINDOW: int = 20  # recent calls per engine for error rate and latency
+    OCR_CIRCUIT_MIN_CALLS: int = 10
+    OCR_CIRCUIT_ERROR_RATE: float = 0.5  # open the circuit above this recent error rate
+    OCR_CIRCUIT_SLOW_RATIO: float = 3.0  # ... or when recent p50 exceeds this multiple of the long-run p50
+    OCR_CIRCUIT_COOLDOWN: int = 30  # seconds before probing an open circuit
+    
+    # Worker pool settings
+    OCR_WORKER_MODE: str = "thread"  # thread, process or remote (model server)
+    OCR_WORKERS: int = 2
+    
+    # Threading settings (see app.core.threading_config)
+    OCR_THREADS: int = 0  # intra-op threads per library, 0 = CPU limit / concurrent OCR jobs
+    OCR_CPU_AFFINITY: list[int] = []  # cores to pin to, split across worker processes
+    
+    # Model server settings (OCR_WORKER_MODE=remote)
+    OCR_MODEL_SERVER_SOCKET: str = "/tmp/ocr-model-server.sock"
+    OCR_MODEL_SERVER_PROCESSES: int = 1
+    OCR_MODEL_SERVER_CPUS: list[int] = []  # cores for the inference processes, empty for all
+    
+    # Micro-batching settings (cross-request batching of /process calls)
+    OCR_MICRO_BATCH_ENABLED: bool = False
+    OCR_MICRO_BATCH_WINDOW_MS: int = 20
+    OCR_MICRO_BATCH_MAX_SIZE: int = 8
+    
     # Rate limiting settings
     RATE_LIMIT_ENABLED: bool = True
     RATE_LIMIT_REQUESTS: int = 100  # requests per window
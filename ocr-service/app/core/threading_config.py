@@ -0,0 +1,220 @@
+"""
+Central thread-count and CPU-affinity configuration
+
+OpenCV, Paddle, Torch (EasyOCR) and ONNX Runtime each size their thread
+pools from the host's core count, which inside a CPU-limited container means
+heavy oversubscription. This module detects the container's CPU limit from
+cgroups and the affinity mask, derives one intra-op thread count per
+process, and applies it to every library.
+
+configure_threading() must run before the OCR libraries are imported, since
+OpenMP/MKL read their environment variables only once.
+"""
+import math
+import os
+import sys
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, List, Optional, Tuple
+from loguru import logger
+
+from app.core.config import settings
+
+
+# Environment variables read by the OpenMP/BLAS runtimes on first use
+THREAD_ENV_VARS = (
+    "OMP_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+)
+
+CGROUP_ROOT = "/sys/fs/cgroup"
+
+
+@dataclass
+class ThreadingConfig:
+    """Effective threading configuration of this process"""
+    cpu_limit: float
+    cpu_limit_source: str
+    affinity: Optional[List[int]]
+    threads: int
+
+
+def _read(path: str) -> Optional[str]:
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def detect_cpu_limit(cgroup_root: str = CGROUP_ROOT) -> Tuple[float, str]:
+    """
+    Detect the number of CPUs this process may use
+
+    Takes the smallest of the cgroup v2 ``cpu.max`` quota, the cgroup v1 CFS
+    quota, and the scheduler affinity mask.
+
+    Args:
+        cgroup_root: cgroup filesystem mount point
+
+    Returns:
+        Tuple of (CPU count, source of the limit)
+    """
+    limits = []
+
+    cpu_max = _read(os.path.join(cgroup_root, "cpu.max"))
+    if cpu_max:
+        quota, _, period = cpu_max.partition(" ")
+        if quota != "max" and period:
+            limits.append((int(quota) / int(period), "cgroup2"))
+    else:
+        quota = _read(os.path.join(cgroup_root, "cpu", "cpu.cfs_quota_us"))
+        period = _read(os.path.join(cgroup_root, "cpu", "cpu.cfs_period_us"))
+        if quota and period and int(quota) > 0:
+            limits.append((int(quota) / int(period), "cgroup1"))
+
+    if hasattr(os, "sched_getaffinity"):
+        limits.append((float(len(os.sched_getaffinity(0))), "affinity"))
+    else:
+        limits.append((float(os.cpu_count() or 1), "cpu_count"))
+
+    return min(limits)
+
+
+def split_cpus(cpus: List[int], processes: int) -> List[Optional[List[int]]]:
+    """
+    Split assigned cores into one contiguous set per process
+
+    Args:
+        cpus: Core IDs to distribute (empty for no pinning)
+        processes: Number of processes
+
+    Returns:
+        Core set per process, or None entries when no cores are assigned
+    """
+    if not cpus:
+        return [None] * processes
+
+    processes = min(processes, len(cpus))
+    size, extra = divmod(len(cpus), processes)
+    sets, start = [], 0
+    for index in range(processes):
+        end = start + size + (1 if index < extra else 0)
+        sets.append(cpus[start:end])
+        start = end
+    return sets
+
+
+def pin_process(cpus: Optional[List[int]]):
+    """
+    Pin the current process to a set of cores
+
+    Args:
+        cpus: Core IDs, or None/empty to leave the affinity unchanged
+    """
+    if cpus and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cpus)
+
+
+def _apply_library_threads(threads: int):
+    """Set the thread count of the libraries that can change it at runtime"""
+    import cv2
+    cv2.setNumThreads(threads)
+
+    # Only adjust Torch when EasyOCR has already imported it
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        torch.set_num_threads(threads)
+        try:
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            # Can only be set before the first parallel Torch call
+            pass
+
+
+def configure_threading(
+    threads: Optional[int] = None,
+    cpus: Optional[List[int]] = None,
+    concurrency: Optional[int] = None
+) -> ThreadingConfig:
+    """
+    Apply the threading configuration to this process
+
+    Args:
+        threads: Intra-op threads per library (defaults to OCR_THREADS, or
+            the CPU limit divided by the concurrent OCR jobs when 0)
+        cpus: Cores to pin this process to (defaults to OCR_CPU_AFFINITY)
+        concurrency: OCR jobs that run at once on the CPU limit (defaults to
+            OCR_WORKERS in each of the WORKERS processes)
+
+    Returns:
+        Effective configuration
+    """
+    global _threading_config
+
+    pin_process(cpus if cpus is not None else settings.OCR_CPU_AFFINITY)
+
+    cpu_limit, source = detect_cpu_limit()
+    if threads is None:
+        threads = settings.OCR_THREADS
+    if threads <= 0:
+        if concurrency is None:
+            concurrency = settings.WORKERS * settings.OCR_WORKERS
+        threads = max(1, math.floor(cpu_limit / max(1, concurrency)))
+
+    # Explicitly set environment variables win
+    for name in THREAD_ENV_VARS:
+        os.environ.setdefault(name, str(threads))
+
+    _apply_library_threads(threads)
+
+    affinity = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else None
+    _threading_config = ThreadingConfig(cpu_limit, source, affinity, threads)
+    logger.info(
+        f"Threading: {threads} threads per library "
+        f"(CPU limit {cpu_limit:g} from {source}, affinity {affinity})"
+    )
+    return _threading_config
+
+
+# Effective configuration of this process
+_threading_config: Optional[ThreadingConfig] = None
+
+
+def get_threading_config() -> ThreadingConfig:
+    """Get the effective configuration, applying the defaults on first use"""
+    if _threading_config is None:
+        return configure_threading()
+    return _threading_config
+
+
+def threading_report() -> Dict[str, Any]:
+    """
+    Get the effective thread settings of every library for diagnostics
+
+    Returns:
+        Dictionary with the detected CPU limit, affinity, configured threads
+        and the values each library actually reports
+    """
+    import cv2
+
+    config = get_threading_config()
+    libraries: Dict[str, Any] = {
+        "opencv": cv2.getNumThreads(),
+        "paddle_cpu_threads": config.threads,
+        "onnxruntime_intra_op": settings.OCR_ONNX_THREADS or config.threads,
+    }
+
+    torch = sys.modules.get("torch")
+    libraries["torch"] = {
+        "intra_op": torch.get_num_threads(),
+        "inter_op": torch.get_num_interop_threads()
+    } if torch is not None else None
+
+    return {
+        **asdict(config),
+        "pid": os.getpid(),
+        "environment": {name: os.environ.get(name) for name in THREAD_ENV_VARS},
+        "libraries": libraries
+    }
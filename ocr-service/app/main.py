@@ -3,15 +3,24 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.security import APIKeyHeader
 from loguru import logger
+import asyncio
 import sys
 from datetime import datetime
 from collections import defaultdict
 import time
 
 from app.core.config import settings
+from app.core.threading_config import configure_threading
+
+# Thread limits must be in place before the OCR libraries are imported
+configure_threading()
+
 from app.api.endpoints import router
 from app.services.redis_service import get_redis_service
 from app.services.ocr_service import get_ocr_engine
+from app.services.processing_service import get_processing_service
+from app.services.warmup import run_warmup, warmup_state
+from app.api.health import router as health_router
 from app.models.schemas import HealthResponse
 
 
@@ -128,17 +137,34 @@ async def startup_event():
         logger.warning("Redis not available - caching disabled")
     
     # Initialize OCR engine
-    ocr_engine = get_ocr_engine()
-    if ocr_engine.is_available():
-        logger.info("OCR engine initialized")
+    if settings.OCR_WORKER_MODE == "remote":
+        logger.info(f"Using OCR model server at {settings.OCR_MODEL_SERVER_SOCKET}")
+    elif settings.OCR_WORKER_MODE == "process":
+        logger.info("OCR engines load in the worker pool processes")
     else:
-        logger.error("No OCR engine available!")
+        ocr_engine = get_ocr_engine()
+        if ocr_engine.is_available():
+            logger.info("OCR engine initialized")
+        else:
+            logger.error("No OCR engine available!")
+    
+    logger.info(
+        f"OCR worker pool: {settings.OCR_WORKERS} {settings.OCR_WORKER_MODE} workers"
+    )
+    
+    # Warm up in the background; /health/ready reports ready once it finishes.
+    # Pre-forked workers inherit a finished warm-up from the master.
+    if warmup_state.status == "pending":
+        app.state.warmup_task = asyncio.create_task(
+            run_warmup(get_processing_service().worker_pool)
+        )
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown"""
     logger.info(f"Shutting down {settings.APP_NAME}")
+    get_processing_service().worker_pool.shutdown(wait=False)
 
 
 @app.get("/", response_model=dict)
@@ -167,6 +193,11 @@ async def health_check():
     )
 
 
+# Probes, warm-up state and service info; mounted after /health above so
+# that route keeps its response model
+app.include_router(health_router)
+
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """Global exception handler"""
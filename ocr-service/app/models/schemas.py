@@ -3,7 +3,7 @@ Pydantic schemas for OCR Service
 """
 from datetime import datetime
 from enum import Enum
-from typing import Optional, List
+from typing import Any, Dict, List, Optional
 from pydantic import BaseModel, Field
 
 
@@ -67,7 +67,14 @@ class OcrResult(BaseModel):
     raw_text: Optional[str] = Field(None, description="Raw OCR text output")
     extracted_data: Optional[ExtractedData] = Field(None, description="Structured extracted data")
     confidence: Optional[float] = Field(None, ge=0.0, le=1.0, description="OCR confidence score (0-1)")
-    ocr_engine: Optional[str] = Field(None, description="OCR engine used (paddleocr, easyocr)")
+    ocr_engine: Optional[str] = Field(None, description="OCR engine used (paddleocr, easyocr, onnx, tesseract)")
+    cascade_stage: Optional[str] = Field(None, description="Cascade stage that produced the result (e.g. paddleocr, easyocr+preprocess)")
+    template: Optional[str] = Field(None, description="Slip layout template whose field regions were read (e.g. KBANK/2023)")
+    classification: Optional[Dict[str, Any]] = Field(None, description="Pre-OCR bank/layout prediction with confidence, whether it set the bank (bank_source) and whether it matches the bank named in the text (bank_agrees)")
+    qr_used: bool = Field(False, description="Whether fields were taken from the slip's QR code")
+    qr_kind: Optional[str] = Field(None, description="Kind of QR payload found (slip_verification, promptpay)")
+    qr_check: Optional[Dict[str, bool]] = Field(None, description="For payment-request (PromptPay) QR codes, whether each QR field matches the OCR reading")
+    preprocessing: Optional[Dict[str, Any]] = Field(None, description="Preprocessing path taken (orientation, profile, resolution scale, denoise method, estimated noise sigma, skew angle) with the time and memory of every step")
     processing_time: Optional[float] = Field(None, description="Processing time in seconds")
     error_message: Optional[str] = Field(None, description="Error message if failed")
     created_at: datetime = Field(..., description="Job creation timestamp")
@@ -91,6 +98,22 @@ class OcrResult(BaseModel):
                 },
                 "confidence": 0.95,
                 "ocr_engine": "paddleocr",
+                "cascade_stage": "paddleocr",
+                "template": None,
+                "classification": None,
+                "qr_used": False,
+                "qr_kind": None,
+                "qr_check": None,
+                "preprocessing": {
+                    "orientation": 0,
+                    "profile": "default",
+                    "scale": 0.6,
+                    "denoise": "none",
+                    "noise_sigma": 0.4,
+                    "skew": 0.0,
+                    "steps": [{"step": "limit_resolution", "ms": 9.1, "bytes": 2764800}, {"step": "grayscale", "ms": 1.2, "bytes": 921600}],
+                    "processing_time": 0.05
+                },
                 "processing_time": 2.35,
                 "error_message": None,
                 "created_at": "2024-10-01T14:30:00Z",
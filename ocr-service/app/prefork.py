@@ -0,0 +1,181 @@
+"""
+Pre-fork server for the OCR service
+
+The master process loads and warms every configured OCR engine once, freezes
+the garbage-collected heap, then forks WORKERS uvicorn workers. The workers
+share the read-only model weights with the master copy-on-write instead of
+each loading their own copy. Only thread mode with OCR_WORKERS=1 preloads
+into a fully shared engine.
+
+Usage:
+    python -m app.prefork
+"""
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Callable, Dict, List
+
+from loguru import logger
+
+from app.core.config import settings
+from app.core.threading_config import configure_threading, split_cpus
+
+
+def preload_models():
+    """
+    Load and warm every configured OCR engine in the current process
+
+    The engine becomes the seed engine of every forked worker's pool. With
+    OCR_WORKERS=1 it is the only engine a worker uses, so the workers inherit
+    the finished warm-up state and report ready at once. With more thread
+    workers the warm-up state stays pending, so each worker still warms the
+    private engine instances it creates at startup.
+
+    Returns:
+        The process-wide OCREngine instance
+    """
+    from app.services import warmup
+    from app.services.ocr_service import get_ocr_engine
+
+    started = time.time()
+    engine = get_ocr_engine()
+    for name in engine.engines:
+        engine._ensure_loaded(name)
+
+    # Allocate the inference buffers before forking
+    shared = settings.OCR_WORKERS == 1
+    warmup.warm_up_engine(engine, warmup.warmup_state if shared else warmup.WarmupState())
+
+    logger.info(f"Preloaded OCR engines {engine.engines} in {time.time() - started:.1f}s")
+    return engine
+
+
+def freeze_heap():
+    """
+    Move every tracked object to the permanent generation
+
+    Collections in the workers then never visit the preloaded objects, so
+    their pages are not written to and stay shared.
+    """
+    gc.collect()
+    gc.freeze()
+
+
+def fork_workers(count: int, target: Callable[[int], None]) -> List[int]:
+    """
+    Fork worker processes running target(index)
+
+    Args:
+        count: Number of workers
+        target: Function run in each child with the worker index
+
+    Returns:
+        List of child PIDs
+    """
+    pids = []
+    for index in range(count):
+        pid = os.fork()
+        if pid == 0:
+            exit_code = 0
+            try:
+                target(index)
+            except Exception as e:
+                logger.error(f"Worker {index} crashed: {e}")
+                exit_code = 1
+            finally:
+                os._exit(exit_code)
+        pids.append(pid)
+    return pids
+
+
+def _bind_socket() -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((settings.HOST, settings.PORT))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(sock: socket.socket, index: int):
+    import uvicorn
+    from app.main import app
+
+    cpu_sets = split_cpus(settings.OCR_CPU_AFFINITY, max(1, settings.WORKERS))
+    cpus = cpu_sets[index % len(cpu_sets)]
+    if cpus:
+        configure_threading(cpus=cpus, concurrency=settings.OCR_WORKERS)
+    
+    logger.info(f"Worker {index} started (pid {os.getpid()})")
+    config = uvicorn.Config(app, log_level=settings.LOG_LEVEL.lower())
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def serve():
+    """Preload models, then fork and supervise the uvicorn workers"""
+    sock = _bind_socket()
+
+    # Import the app before forking so the workers share its modules too
+    import app.main  # noqa: F401
+
+    # Only thread workers use the engine of their own process; pool processes
+    # and the model server load their own
+    if settings.OCR_PRELOAD_MODELS and settings.OCR_WORKER_MODE == "thread":
+        if settings.OCR_WORKERS > 1:
+            logger.warning(
+                f"OCR_WORKERS={settings.OCR_WORKERS}: every worker loads "
+                f"{settings.OCR_WORKERS - 1} unshared engine copies besides the preloaded one; "
+                f"use OCR_WORKERS=1 and scale with WORKERS to share the models"
+            )
+        preload_models()
+        freeze_heap()
+
+    workers: Dict[int, int] = {}
+
+    def spawn(index: int):
+        pid, = fork_workers(1, lambda _: _run_worker(sock, index))
+        workers[pid] = index
+
+    for index in range(settings.WORKERS):
+        spawn(index)
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+
+        index = workers.pop(pid, None)
+        if index is None or stopping:
+            continue
+
+        logger.warning(f"Worker {index} (pid {pid}) exited with status {status}, restarting")
+        spawn(index)
+
+    sock.close()
+    logger.info("All workers stopped")
+
+
+if __name__ == "__main__":
+    if not hasattr(os, "fork"):
+        sys.exit("Pre-fork mode requires os.fork()")
+    serve()
@@ -0,0 +1,209 @@
+"""
+Pre-OCR bank and layout classification on thumbnails
+
+Each bank's app renders slips in its own colours, so a colour histogram of a
+tiny thumbnail identifies bank and layout in a few milliseconds, before any
+preprocessing or OCR. Histograms are taken separately over the header, body
+and footer bands so the position of the brand colour counts too.
+
+Prototypes come from labelled reference slips in OCR_BANK_REFERENCE_DIR,
+named ``<BANK>_<layout>[_anything].png`` (e.g. ``KBANK_2023_01.png``), and
+from the header colour and aspect ratio of every slip template whose bank and
+layout have no reference image.
+"""
+import glob
+import os
+import threading
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+from loguru import logger
+
+from app.core.config import settings
+from app.services.slip_templates import HEADER_FRACTION, get_template_registry
+
+
+# Thumbnail (width, height) the histograms are computed on
+THUMB_SIZE = (32, 64)
+
+# Row fractions of the header, body and footer bands
+BANDS = (0.0, 0.15, 0.6, 1.0)
+
+# Weight of each band in the similarity; the brand-coloured header matters most
+BAND_WEIGHTS = np.array([0.6, 0.25, 0.15], dtype=np.float32)
+
+# Hue, saturation and value bins per band
+HIST_BINS = [12, 3, 3]
+
+# Similarity lost per unit of relative aspect ratio difference; screenshots
+# from different phones differ in aspect, so this is only a weak cue
+ASPECT_PENALTY = 0.5
+
+# Softmax temperature over prototype similarities
+TEMPERATURE = 0.05
+
+# Similarity of the implicit "unknown bank" class; slips that match no
+# prototype better than this get a low confidence
+UNKNOWN_SIMILARITY = 0.8
+
+IMAGE_EXTENSIONS = ("png", "jpg", "jpeg")
+
+
+@dataclass
+class BankPrediction:
+    """Bank and layout predicted from a slip thumbnail"""
+    bank: str
+    layout: str
+    confidence: float
+    similarity: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            **asdict(self),
+            "confidence": round(self.confidence, 4),
+            "similarity": round(self.similarity, 4)
+        }
+
+
+def color_features(image: np.ndarray) -> np.ndarray:
+    """
+    Compute the banded HSV histograms of a slip thumbnail
+
+    Args:
+        image: Slip image, colour or grayscale
+
+    Returns:
+        Array of shape (bands, bins), each row summing to 1
+    """
+    if image.ndim == 2:
+        image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+    thumb = cv2.resize(image[:, :, :3], THUMB_SIZE, interpolation=cv2.INTER_AREA)
+    hsv = cv2.cvtColor(thumb, cv2.COLOR_BGR2HSV)
+
+    rows = hsv.shape[0]
+    features = []
+    for top, bottom in zip(BANDS, BANDS[1:]):
+        band = np.ascontiguousarray(hsv[int(top * rows):max(int(bottom * rows), int(top * rows) + 1)])
+        hist = cv2.calcHist([band], [0, 1, 2], None, HIST_BINS, [0, 180, 0, 256, 0, 256]).ravel()
+        features.append(hist / max(hist.sum(), 1.0))
+    return np.array(features, dtype=np.float32)
+
+
+def decode_thumbnail_source(image_data: bytes) -> Optional[np.ndarray]:
+    """Decode image bytes at 1/8 resolution, which is all the classifier needs"""
+    return cv2.imdecode(np.frombuffer(image_data, np.uint8), cv2.IMREAD_REDUCED_COLOR_8)
+
+
+@dataclass
+class _Prototype:
+    bank: str
+    layout: str
+    features: np.ndarray
+    aspect_ratio: float
+
+
+class BankClassifier:
+    """Nearest-prototype bank/layout classifier on thumbnail colour histograms"""
+
+    def __init__(self, reference_dir: Optional[str] = None, use_templates: bool = True):
+        """
+        Initialize classifier
+
+        Args:
+            reference_dir: Directory of labelled reference slips (defaults to
+                OCR_BANK_REFERENCE_DIR)
+            use_templates: Whether to add prototypes rendered from slip templates
+        """
+        self.reference_dir = reference_dir or settings.OCR_BANK_REFERENCE_DIR
+        self.prototypes: List[_Prototype] = []
+        self._load_references()
+        if use_templates:
+            self._add_template_prototypes()
+        logger.info(f"Bank classifier loaded {len(self.prototypes)} prototypes")
+
+    def add(self, bank: str, layout: str, image: np.ndarray):
+        """
+        Add a labelled example slip
+
+        Args:
+            bank: Bank code (as in ThaiSlipPatterns.THAI_BANKS)
+            layout: Layout version
+            image: Slip image
+        """
+        height, width = image.shape[:2]
+        self.prototypes.append(_Prototype(bank, layout, color_features(image), height / max(width, 1)))
+
+    def _load_references(self):
+        paths = []
+        for extension in IMAGE_EXTENSIONS:
+            paths += glob.glob(os.path.join(self.reference_dir, f"*.{extension}"))
+        for path in sorted(paths):
+            parts = os.path.splitext(os.path.basename(path))[0].split("_")
+            image = cv2.imread(path, cv2.IMREAD_COLOR)
+            if len(parts) < 2 or image is None:
+                logger.warning(f"Skipping bank reference {path}: expected <BANK>_<layout>.<ext>")
+                continue
+            self.add(parts[0].upper(), parts[1], image)
+
+    def _add_template_prototypes(self):
+        """Render a plain slip with each template's header colour and aspect ratio"""
+        known = {(p.bank, p.layout) for p in self.prototypes}
+        for template in get_template_registry().templates:
+            if (template.bank, template.version) in known:
+                continue
+            width = 90
+            height = int(width * template.aspect_ratio)
+            image = np.full((height, width, 3), 255, dtype=np.uint8)
+            image[:max(1, int(height * HEADER_FRACTION))] = template.header_color.astype(np.uint8)
+            self.add(template.bank, template.version, image)
+
+    def _similarities(self, image: np.ndarray) -> Dict[Tuple[str, str], float]:
+        """Best prototype similarity per (bank, layout)"""
+        features = color_features(image)
+        height, width = image.shape[:2]
+        aspect = height / max(width, 1)
+
+        scores: Dict[Tuple[str, str], float] = {}
+        for prototype in self.prototypes:
+            intersection = float(np.minimum(features, prototype.features).sum(axis=1) @ BAND_WEIGHTS)
+            aspect_score = 1 - ASPECT_PENALTY * min(1.0, abs(aspect - prototype.aspect_ratio) / prototype.aspect_ratio)
+            key = (prototype.bank, prototype.layout)
+            scores[key] = max(scores.get(key, 0.0), intersection * aspect_score)
+        return scores
+
+    def classify(self, image: np.ndarray) -> Optional[BankPrediction]:
+        """
+        Predict bank and layout of a slip
+
+        Args:
+            image: Slip image; a reduced-resolution decode is enough
+
+        Returns:
+            Prediction with its confidence (softmax share of the best class
+            against the other classes and "unknown"), or None without prototypes
+        """
+        scores = self._similarities(image)
+        if not scores:
+            return None
+
+        (bank, layout), best = max(scores.items(), key=lambda item: item[1])
+        logits = np.array(list(scores.values()) + [UNKNOWN_SIMILARITY]) / TEMPERATURE
+        weights = np.exp(logits - logits.max())
+        confidence = float(np.exp(best / TEMPERATURE - logits.max()) / weights.sum())
+        return BankPrediction(bank, layout, confidence, best)
+
+
+# Process-wide classifier, loaded on first use
+_bank_classifier: Optional[BankClassifier] = None
+_classifier_lock = threading.Lock()
+
+
+def get_bank_classifier() -> BankClassifier:
+    """Get or create the bank classifier"""
+    global _bank_classifier
+    with _classifier_lock:
+        if _bank_classifier is None:
+            _bank_classifier = BankClassifier()
+        return _bank_classifier
@@ -0,0 +1,131 @@
+import asyncio
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+from loguru import logger
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.pipeline import run_ocr, run_batch_ocr
+from app.services.worker_pool import OCRWorkerPool
+from app.utils.rolling_stats import RollingWindow
+
+
+@dataclass
+class _PendingImage:
+    """Single-image request waiting to be batched"""
+    image: np.ndarray
+    future: asyncio.Future
+    enqueued_at: float
+
+
+class MicroBatchScheduler:
+    """Dynamic micro-batching of concurrent single-image OCR requests
+
+    Requests for the same engine are held for up to ``window_ms`` or until
+    ``max_batch`` images are queued, then run as one batched inference in the
+    worker pool. Each result is routed back to its awaiting request.
+    """
+
+    def __init__(
+        self,
+        worker_pool: OCRWorkerPool,
+        window_ms: Optional[float] = None,
+        max_batch: Optional[int] = None
+    ):
+        """
+        Initialize scheduler
+
+        Args:
+            worker_pool: Pool running the batched inference
+            window_ms: Maximum time to hold a request (defaults to OCR_MICRO_BATCH_WINDOW_MS)
+            max_batch: Batch size that triggers an immediate flush
+                (defaults to OCR_MICRO_BATCH_MAX_SIZE)
+        """
+        self.worker_pool = worker_pool
+        self.window = (window_ms if window_ms is not None else settings.OCR_MICRO_BATCH_WINDOW_MS) / 1000
+        self.max_batch = max(1, max_batch or settings.OCR_MICRO_BATCH_MAX_SIZE)
+
+        self._queues: Dict[Optional[str], List[_PendingImage]] = {}
+        self._timers: Dict[Optional[str], asyncio.TimerHandle] = {}
+        self._tasks: set = set()
+
+        self._batch_sizes = RollingWindow()
+        self._queue_waits = RollingWindow()
+        self._size_histogram: Counter = Counter()
+
+    async def submit(self, image: np.ndarray, ocr_engine: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Queue an image for batched OCR and await its result
+
+        Args:
+            image: Prepared image
+            ocr_engine: Specific OCR engine to use
+
+        Returns:
+            Dictionary with text, confidence, and engine used
+        """
+        loop = asyncio.get_running_loop()
+        pending = _PendingImage(image, loop.create_future(), time.perf_counter())
+
+        queue = self._queues.setdefault(ocr_engine, [])
+        queue.append(pending)
+
+        if len(queue) >= self.max_batch:
+            self._flush(ocr_engine)
+        elif len(queue) == 1:
+            self._timers[ocr_engine] = loop.call_later(self.window, self._flush, ocr_engine)
+
+        return await pending.future
+
+    def _flush(self, ocr_engine: Optional[str]):
+        """Dispatch the queued requests for an engine as one batch"""
+        timer = self._timers.pop(ocr_engine, None)
+        if timer is not None:
+            timer.cancel()
+
+        batch = self._queues.pop(ocr_engine, [])
+        if not batch:
+            return
+
+        task = asyncio.ensure_future(self._run_batch(ocr_engine, batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, ocr_engine: Optional[str], batch: List[_PendingImage]):
+        dispatched_at = time.perf_counter()
+        for pending in batch:
+            self._queue_waits.add(dispatched_at - pending.enqueued_at)
+        self._batch_sizes.add(len(batch))
+        self._size_histogram[len(batch)] += 1
+
+        try:
+            if len(batch) == 1:
+                results = [await self.worker_pool.run(run_ocr, batch[0].image, ocr_engine)]
+            else:
+                results = await self.worker_pool.run(
+                    run_batch_ocr, [pending.image for pending in batch], ocr_engine
+                )
+        except Exception as e:
+            logger.error(f"Micro-batch of {len(batch)} images failed: {e}")
+            for pending in batch:
+                if not pending.future.done():
+                    pending.future.set_exception(e)
+            return
+
+        for pending, result in zip(batch, results):
+            if not pending.future.done():
+                pending.future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get realized batch size and queue wait statistics"""
+        return {
+            "window_ms": self.window * 1000,
+            "max_batch": self.max_batch,
+            "queued": sum(len(queue) for queue in self._queues.values()),
+            "batch_size": self._batch_sizes.summary(),
+            "batch_size_histogram": dict(sorted(self._size_histogram.items())),
+            "queue_wait_ms": self._queue_waits.summary(scale=1000)
+        }
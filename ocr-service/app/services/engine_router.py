@@ -0,0 +1,260 @@
+"""
+Latency-aware engine routing with a circuit breaker per engine
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+from loguru import logger
+
+from app.core.config import settings
+from app.utils.rolling_stats import RollingWindow, recording
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class EngineHealth:
+    """Rolling call statistics and circuit state of one engine"""
+
+    def __init__(self):
+        window = max(1, settings.OCR_CIRCUIT_WINDOW)
+        self.recent_latency = RollingWindow(maxlen=window)
+        self.baseline_latency = RollingWindow(maxlen=500)
+        self.recent_errors = RollingWindow(maxlen=window)
+        self.confidence = RollingWindow(maxlen=500)
+        self.state = CLOSED
+        self.opened_at: Optional[float] = None
+        self.open_reason: Optional[str] = None
+        self.probe_started: Optional[float] = None
+        self.trips = 0
+
+    def error_rate(self) -> Optional[float]:
+        """Share of failed calls in the recent window"""
+        return self.recent_errors.mean()
+
+    def slowdown(self) -> Optional[float]:
+        """Recent median latency relative to the long-run median"""
+        if len(self.baseline_latency) < 2 * max(1, settings.OCR_CIRCUIT_WINDOW):
+            return None
+        recent = self.recent_latency.percentile(50)
+        baseline = self.baseline_latency.percentile(50)
+        if recent is None or not baseline:
+            return None
+        return recent / baseline
+
+    def reset_recent(self):
+        """Forget the recent window, e.g. after the circuit closes again"""
+        self.recent_latency.clear()
+        self.recent_errors.clear()
+
+
+class EngineRouter:
+    """Routes OCR calls to healthy engines
+
+    Tracks rolling latency percentiles, error rate and mean confidence per
+    engine. An engine whose recent error rate exceeds OCR_CIRCUIT_ERROR_RATE,
+    or whose recent median latency exceeds OCR_CIRCUIT_SLOW_RATIO times its
+    long-run median, has its circuit opened and receives no traffic. After
+    OCR_CIRCUIT_COOLDOWN seconds a single probe call is let through; its
+    outcome closes or re-opens the circuit.
+
+    Shared by every OCREngine instance in the process.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize router
+
+        Args:
+            clock: Monotonic time source
+        """
+        self.engines: Dict[str, EngineHealth] = {}
+        self._clock = clock
+        self._lock = threading.RLock()
+
+    def _health(self, engine: str) -> EngineHealth:
+        with self._lock:
+            health = self.engines.get(engine)
+            if health is None:
+                health = self.engines[engine] = EngineHealth()
+            return health
+
+    def available(self, engine: str) -> bool:
+        """
+        Check whether an engine may receive a call now, without reserving it
+
+        Args:
+            engine: Engine name
+
+        Returns:
+            True if the circuit is closed, or a probe is due
+        """
+        health = self._health(engine)
+        now = self._clock()
+        cooldown = settings.OCR_CIRCUIT_COOLDOWN
+        if health.state == CLOSED:
+            return True
+        if health.state == OPEN:
+            return now - health.opened_at >= cooldown
+        # A probe that never reported back is given up after a cooldown
+        return health.probe_started is None or now - health.probe_started >= cooldown
+
+    def acquire(self, engine: str) -> bool:
+        """
+        Reserve a call to an engine, taking the probe slot of an open circuit
+
+        Args:
+            engine: Engine name
+
+        Returns:
+            True if the call may proceed
+        """
+        health = self._health(engine)
+        with self._lock:
+            if not self.available(engine):
+                return False
+            if health.state != CLOSED:
+                health.state = HALF_OPEN
+                health.probe_started = self._clock()
+            return True
+
+    def order(self, engines: List[str], preferred: Optional[str] = None) -> List[str]:
+        """
+        Order engines for a request, leaving out those with an open circuit
+
+        Args:
+            engines: Usable engines in priority order
+            preferred: Engine requested by the caller, tried first if available
+
+        Returns:
+            Available engines, preferred first, then by priority or, with
+            OCR_ROUTER_STRATEGY=fastest, by recent median latency
+        """
+        candidates = [name for name in engines if self.available(name)]
+
+        if settings.OCR_ROUTER_STRATEGY == "fastest":
+            def expected_latency(name: str) -> float:
+                # Engines without samples sort first so they get measured
+                p50 = self._health(name).recent_latency.percentile(50)
+                return p50 if p50 is not None else 0.0
+            candidates.sort(key=expected_latency)
+
+        return sorted(candidates, key=lambda name: name != preferred)
+
+    def record_success(self, engine: str, seconds: Optional[float], confidence: Optional[float] = None):
+        """
+        Record a completed engine call
+
+        Args:
+            engine: Engine name
+            seconds: Call latency, or None when not comparable (batched calls)
+            confidence: Mean recognition confidence of the output
+        """
+        if not recording():
+            return
+        health = self._health(engine)
+        health.recent_errors.add(0.0)
+        if seconds is not None:
+            health.recent_latency.add(seconds)
+            health.baseline_latency.add(seconds)
+        if confidence is not None:
+            health.confidence.add(confidence)
+
+        with self._lock:
+            if health.state == HALF_OPEN:
+                self._close(health)
+                return
+        self._evaluate(engine, health)
+
+    def record_failure(self, engine: str, seconds: Optional[float] = None):
+        """
+        Record a failed engine call
+
+        Args:
+            engine: Engine name
+            seconds: Time until the failure
+        """
+        if not recording():
+            return
+        health = self._health(engine)
+        health.recent_errors.add(1.0)
+
+        with self._lock:
+            if health.state == HALF_OPEN:
+                self._open(health, "probe failed")
+                return
+        self._evaluate(engine, health)
+
+    def _evaluate(self, engine: str, health: EngineHealth):
+        """Open the circuit of a closed engine that is failing or too slow"""
+        if len(health.recent_errors) < settings.OCR_CIRCUIT_MIN_CALLS:
+            return
+
+        reason = None
+        error_rate = health.error_rate()
+        slowdown = health.slowdown()
+        if error_rate is not None and error_rate > settings.OCR_CIRCUIT_ERROR_RATE:
+            reason = f"error rate {error_rate:.0%}"
+        elif slowdown is not None and slowdown > settings.OCR_CIRCUIT_SLOW_RATIO:
+            reason = f"{slowdown:.1f}x slower than usual"
+
+        if reason:
+            with self._lock:
+                if health.state == CLOSED:
+                    self._open(health, reason)
+                    logger.warning(f"Circuit opened for {engine}: {reason}")
+
+    def _open(self, health: EngineHealth, reason: str):
+        health.state = OPEN
+        health.opened_at = self._clock()
+        health.open_reason = reason
+        health.probe_started = None
+        health.trips += 1
+
+    @staticmethod
+    def _close(health: EngineHealth):
+        health.state = CLOSED
+        health.opened_at = None
+        health.open_reason = None
+        health.probe_started = None
+        health.reset_recent()
+
+    def reset(self):
+        """Forget all engine statistics and close every circuit"""
+        with self._lock:
+            self.engines.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the state and rolling statistics of every engine"""
+        now = self._clock()
+        engines = {}
+        for name, health in list(self.engines.items()):
+            error_rate = health.error_rate()
+            confidence = health.confidence.mean()
+            slowdown = health.slowdown()
+            engines[name] = {
+                "state": health.state,
+                "open_reason": health.open_reason,
+                "retry_in_seconds": (
+                    round(max(0.0, settings.OCR_CIRCUIT_COOLDOWN - (now - health.opened_at)), 1)
+                    if health.state == OPEN else None
+                ),
+                "trips": health.trips,
+                "latency_ms": health.recent_latency.summary(scale=1000),
+                "baseline_p50_ms": (
+                    round(health.baseline_latency.percentile(50) * 1000, 3)
+                    if len(health.baseline_latency) else None
+                ),
+                "slowdown": round(slowdown, 2) if slowdown is not None else None,
+                "error_rate": round(error_rate, 4) if error_rate is not None else None,
+                "mean_confidence": round(confidence, 4) if confidence is not None else None
+            }
+        return {
+            "strategy": settings.OCR_ROUTER_STRATEGY,
+            "engines": engines
+        }
+
+
+engine_router = EngineRouter()
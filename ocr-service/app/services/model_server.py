@@ -0,0 +1,262 @@
+"""
+Local model server for the OCR service
+
+One or more dedicated inference processes own the OCR engine and serve
+pipeline jobs to the API workers over a Unix domain socket. The API workers
+stay lightweight (no model weights) and can be scaled for I/O independently,
+while inference runs only on the cores assigned to the model server.
+
+Usage:
+    python -m app.services.model_server
+
+and run the API with OCR_WORKER_MODE=remote.
+"""
+import os
+import signal
+import sys
+import threading
+from contextlib import closing
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Any, Callable, Dict, List, Optional
+from loguru import logger
+
+from app.core.config import settings
+from app.core.threading_config import configure_threading, split_cpus
+
+
+class ModelServer:
+    """Pre-forked inference processes serving jobs over a Unix socket
+
+    Each client connection carries one ``(func, args)`` request; whichever
+    idle process accepts it runs ``func(engine, *args)`` with its own engine,
+    replies with ``("ok", result)`` or ``("error", message)`` and closes the
+    connection, so any number of clients share the processes. ``func`` must
+    be a module-level function such as those in :mod:`app.services.pipeline`.
+    """
+
+    # Pending client connections queued by the kernel while every process is busy
+    BACKLOG = 128
+
+    def __init__(
+        self,
+        address: Optional[str] = None,
+        processes: Optional[int] = None,
+        cpus: Optional[List[int]] = None,
+        engine_factory: Optional[Callable[[], Any]] = None,
+        preload: Optional[bool] = None
+    ):
+        """
+        Initialize model server
+
+        Args:
+            address: Unix socket path (defaults to OCR_MODEL_SERVER_SOCKET)
+            processes: Number of inference processes (defaults to OCR_MODEL_SERVER_PROCESSES)
+            cpus: Cores to pin the inference processes to (defaults to OCR_MODEL_SERVER_CPUS)
+            engine_factory: Callable creating the engine
+            preload: Create the engine once before forking so the inference
+                processes share it (defaults to OCR_PRELOAD_MODELS)
+        """
+        self.address = address or settings.OCR_MODEL_SERVER_SOCKET
+        self.cpu_sets = split_cpus(
+            list(cpus if cpus is not None else settings.OCR_MODEL_SERVER_CPUS),
+            max(1, processes or settings.OCR_MODEL_SERVER_PROCESSES)
+        )
+        if engine_factory is None:
+            from app.services.ocr_service import OCREngine
+            engine_factory = lambda: OCREngine(languages=settings.OCR_LANGUAGES)
+        self.engine_factory = engine_factory
+        self.preload = settings.OCR_PRELOAD_MODELS if preload is None else preload
+
+        self._engine: Any = None
+        self._listener: Optional[Listener] = None
+        self._pids: Dict[int, int] = {}
+
+    def start(self) -> List[int]:
+        """
+        Bind the socket and fork the inference processes
+
+        Returns:
+            List of inference process PIDs
+        """
+        if os.path.exists(self.address):
+            os.unlink(self.address)
+        configure_threading(concurrency=len(self.cpu_sets))
+        self._listener = Listener(self.address, family="AF_UNIX", backlog=self.BACKLOG)
+
+        if self.preload:
+            # Load once here so the inference processes share the weights copy-on-write
+            from app.prefork import freeze_heap
+            from app.services.warmup import warm_up_engine
+            self._engine = self.engine_factory()
+            warm_up_engine(self._engine)
+            freeze_heap()
+
+        for index in range(len(self.cpu_sets)):
+            self._spawn(index)
+
+        logger.info(
+            f"Model server listening on {self.address} with "
+            f"{len(self._pids)} inference processes"
+        )
+        return list(self._pids)
+
+    def _spawn(self, index: int):
+        pid = os.fork()
+        if pid == 0:
+            exit_code = 0
+            try:
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                signal.signal(signal.SIGINT, signal.SIG_DFL)
+                self._serve_forever(index)
+            except Exception as e:
+                logger.error(f"Inference process {index} crashed: {e}")
+                exit_code = 1
+            finally:
+                os._exit(exit_code)
+        self._pids[pid] = index
+
+    def _serve_forever(self, index: int):
+        cpus = self.cpu_sets[index]
+        if cpus:
+            configure_threading(cpus=cpus, concurrency=1)
+
+        engine = self._engine
+        if engine is None:
+            from app.services.warmup import warm_up_engine
+            engine = self.engine_factory()
+            warm_up_engine(engine)
+        logger.info(f"Inference process {index} ready (pid {os.getpid()}, cpus {cpus or 'all'})")
+
+        while True:
+            conn = self._listener.accept()
+            # One job per connection, so a client never pins this process
+            try:
+                self._serve_request(engine, conn)
+            finally:
+                conn.close()
+
+    @staticmethod
+    def _serve_request(engine: Any, conn: Connection):
+        try:
+            func, args = conn.recv()
+        except (EOFError, OSError):
+            return
+
+        try:
+            reply = ("ok", func(engine, *args))
+        except Exception as e:
+            reply = ("error", f"{type(e).__name__}: {e}")
+        try:
+            conn.send(reply)
+        except OSError:
+            # The client went away before the reply
+            pass
+
+    def supervise(self):
+        """Wait on the inference processes, restarting any that exit"""
+        stopping = False
+
+        def stop(signum, frame):
+            nonlocal stopping
+            stopping = True
+            self.stop()
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+
+        while self._pids:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            except InterruptedError:
+                continue
+
+            index = self._pids.pop(pid, None)
+            if index is None or stopping:
+                continue
+
+            logger.warning(f"Inference process {index} (pid {pid}) exited with status {status}, restarting")
+            self._spawn(index)
+
+    def stop(self):
+        """Terminate the inference processes and remove the socket"""
+        for pid in list(self._pids):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                self._pids.pop(pid, None)
+
+        if self._listener is not None:
+            self._listener.close()
+            self._listener = None
+        if os.path.exists(self.address):
+            os.unlink(self.address)
+
+    def join(self):
+        """Reap the inference processes after stop()"""
+        for pid in list(self._pids):
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+            self._pids.pop(pid, None)
+
+
+class ModelServerClient:
+    """Client for the local model server
+
+    Opens one socket connection per job and closes it after the reply, so
+    the connection is never held while idle and concurrent jobs from every
+    API worker are picked up by whichever inference process is free. At
+    most ``max_connections`` jobs are in flight at a time.
+    """
+
+    def __init__(self, address: Optional[str] = None, max_connections: Optional[int] = None):
+        """
+        Initialize client
+
+        Args:
+            address: Unix socket path (defaults to OCR_MODEL_SERVER_SOCKET)
+            max_connections: Maximum concurrent jobs (defaults to OCR_WORKERS)
+        """
+        self.address = address or settings.OCR_MODEL_SERVER_SOCKET
+        self.max_connections = max(1, max_connections or settings.OCR_WORKERS)
+        self._slots = threading.BoundedSemaphore(self.max_connections)
+
+    def call(self, func: Callable, *args) -> Any:
+        """
+        Run func(engine, *args) in an inference process
+
+        Args:
+            func: Module-level job function
+            *args: Job arguments
+
+        Returns:
+            Return value of func
+        """
+        with self._slots:
+            with closing(Client(self.address, family="AF_UNIX")) as conn:
+                conn.send((func, args))
+                status, value = conn.recv()
+
+        if status != "ok":
+            raise RuntimeError(f"Model server job failed: {value}")
+        return value
+
+    def close(self):
+        """Release the client (connections are closed after every job)"""
+
+
+def serve():
+    """Run the model server until SIGTERM/SIGINT"""
+    server = ModelServer()
+    server.start()
+    server.supervise()
+    logger.info("Model server stopped")
+
+
+if __name__ == "__main__":
+    if not hasattr(os, "fork"):
+        sys.exit("The model server requires os.fork()")
+    serve()
@@ -1,8 +1,23 @@
+import cv2
 import numpy as np
-from typing import Tuple, Optional, List, Dict
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from contextlib import contextmanager
+from typing import Tuple, Optional, List, Dict, Callable, Any
 from loguru import logger
+import gc
+import threading
 import time
 
+from app.core.config import settings
+from app.core.threading_config import get_threading_config
+from app.services.engine_router import engine_router
+from app.utils.charset import FIELD_CHARSETS, constrain_to_allowlist
+from app.utils.layout import find_qr_rect, select_field_regions
+from app.utils.line_cache import RecognitionCache, crop_fingerprint
+from app.utils.rolling_stats import RollingWindow, recording
+from app.utils.memory import current_rss_bytes
+
 try:
     from paddleocr import PaddleOCR
     PADDLE_AVAILABLE = True
@@ -17,47 +32,396 @@ except ImportError:
     EASYOCR_AVAILABLE = False
     logger.warning("EasyOCR not available")
 
+try:
+    import pytesseract
+    TESSERACT_AVAILABLE = True
+except ImportError:
+    TESSERACT_AVAILABLE = False
+    logger.warning("pytesseract not available")
+
+from app.services.onnx_engine import ONNX_AVAILABLE, OnnxOCR
+
+
+class HedgePolicy:
+    """Tracks per-engine latency and caps how often requests are hedged
+    
+    Shared by every OCREngine instance in the process so the latency
+    percentiles and the hedge rate reflect all workers.
+    """
+    
+    def __init__(self, window: int = 200):
+        self.latencies: Dict[str, RollingWindow] = {}
+        self._decisions = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.hedged = 0
+        self.secondary_wins = 0
+    
+    def record_latency(self, engine: str, seconds: float):
+        """Record the latency of a completed engine call"""
+        if not recording():
+            return
+        with self._lock:
+            window = self.latencies.setdefault(engine, RollingWindow(maxlen=500))
+        window.add(seconds)
+    
+    def hedge_delay(self, engine: str) -> Optional[float]:
+        """
+        Time to wait for an engine before hedging
+        
+        Returns:
+            OCR_HEDGE_PERCENTILE of the engine's recent latency, or None while
+            fewer than OCR_HEDGE_MIN_SAMPLES calls have been observed
+        """
+        window = self.latencies.get(engine)
+        if window is None or len(window) < settings.OCR_HEDGE_MIN_SAMPLES:
+            return None
+        return window.percentile(settings.OCR_HEDGE_PERCENTILE)
+    
+    def acquire_hedge(self) -> bool:
+        """
+        Decide whether a stalled request may be hedged
+        
+        Hedging is refused once OCR_HEDGE_MAX_RATIO of the recent requests
+        were hedged, so extra CPU load stays bounded under saturation.
+        """
+        with self._lock:
+            recent = sum(self._decisions)
+            allowed = recent < settings.OCR_HEDGE_MAX_RATIO * max(len(self._decisions), 1)
+            self._decisions.append(allowed)
+            self.requests += 1
+            if allowed:
+                self.hedged += 1
+            return allowed
+    
+    def record_unhedged(self):
+        """Record a request that completed without hedging"""
+        with self._lock:
+            self._decisions.append(False)
+            self.requests += 1
+    
+    def record_secondary_win(self):
+        """Record a hedged request answered by the secondary engine"""
+        with self._lock:
+            self.secondary_wins += 1
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get hedging statistics"""
+        with self._lock:
+            recent_rate = sum(self._decisions) / len(self._decisions) if self._decisions else 0.0
+        return {
+            "enabled": settings.OCR_HEDGING_ENABLED,
+            "requests": self.requests,
+            "hedged": self.hedged,
+            "secondary_wins": self.secondary_wins,
+            "recent_hedge_rate": round(recent_rate, 4),
+            "hedge_delay_ms": {
+                engine: round(delay * 1000, 3) if delay is not None else None
+                for engine, delay in ((name, self.hedge_delay(name)) for name in list(self.latencies))
+            }
+        }
+
+
+hedge_policy = HedgePolicy()
+
+# Threads running hedged engine calls; each OCR worker needs at most two
+_hedge_executor: Optional[ThreadPoolExecutor] = None
+_hedge_executor_lock = threading.Lock()
+
+
+def _get_hedge_executor() -> ThreadPoolExecutor:
+    global _hedge_executor
+    with _hedge_executor_lock:
+        if _hedge_executor is None:
+            _hedge_executor = ThreadPoolExecutor(
+                max_workers=2 * max(1, settings.OCR_WORKERS),
+                thread_name_prefix="ocr-hedge"
+            )
+        return _hedge_executor
+
+
+class RegionStats:
+    """Counts detected and recognized text lines in region mode"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.images = 0
+        self.detected = 0
+        self.recognized = 0
+        self.fallbacks = 0
+    
+    def record(self, detected: int, recognized: int, fallback: bool):
+        """Record the region pass of one image"""
+        if not recording():
+            return
+        with self._lock:
+            self.images += 1
+            self.detected += detected
+            self.recognized += recognized
+            self.fallbacks += int(fallback)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get region selection statistics"""
+        with self._lock:
+            return {
+                "enabled": settings.OCR_REGION_MODE,
+                "images": self.images,
+                "lines_detected": self.detected,
+                "lines_recognized": self.recognized,
+                "recognized_ratio": round(self.recognized / self.detected, 4) if self.detected else None,
+                "fallbacks": self.fallbacks
+            }
+
+
+region_stats = RegionStats()
+
+# Line recognitions shared by every OCREngine instance in the process
+recognition_cache = RecognitionCache(maxsize=settings.OCR_LINE_CACHE_SIZE)
+
 
 class OCREngine:
     """OCR engine with multiple backends and fallback support"""
     
-    def __init__(self, languages: List[str] = None, use_gpu: bool = False):
+    # Backend reader attribute of each engine
+    ENGINE_ATTRIBUTES = {
+        "paddleocr": "paddle_ocr",
+        "easyocr": "easy_ocr",
+        "onnx": "onnx_ocr",
+        "tesseract": "tesseract_ocr"
+    }
+    
+    # Allowlist of each short slip field, used by recognize_field
+    FIELD_CHARSETS = FIELD_CHARSETS
+    
+    # Engines with separate detection and recognition, usable in region mode
+    REGION_ENGINES = ("paddleocr", "onnx", "easyocr")
+    
+    # Tesseract language codes of the service's language codes
+    TESSERACT_LANGUAGES = {"th": "tha", "en": "eng"}
+    
+    def __init__(
+        self,
+        languages: List[str] = None,
+        use_gpu: bool = False,
+        engines: Optional[List[str]] = None
+    ):
         """
         Initialize OCR engines
         
+        Only engines listed in ``engines``, plus OCR_FIELD_ENGINE for field
+        regions, are ever loaded. The first one (primary) is loaded
+        immediately; the others (secondaries) are loaded on first use and may
+        be unloaded again to stay within OCR_MEMORY_BUDGET_MB.
+        
         Args:
             languages: List of language codes (e.g., ['th', 'en'])
             use_gpu: Whether to use GPU acceleration
+            engines: Engine names in priority order (defaults to OCR_ENGINES)
         """
         self.languages = languages or ['th', 'en']
         self.use_gpu = use_gpu
+        self.engines = [
+            name for name in (engines if engines is not None else settings.OCR_ENGINES)
+            if name in self.ENGINE_ATTRIBUTES
+        ]
         
         # Initialize engines
         self.paddle_ocr = None
         self.easy_ocr = None
+        self.onnx_ocr = None
+        self.tesseract_ocr = None
         
-        if PADDLE_AVAILABLE:
-            try:
-                self.paddle_ocr = PaddleOCR(
-                    use_angle_cls=True,
-                    lang='en',  # PaddleOCR doesn't have direct Thai support, but works with mixed text
-                    use_gpu=use_gpu,
-                    show_log=False
-                )
-                logger.info("PaddleOCR initialized successfully")
-            except Exception as e:
-                logger.error(f"Failed to initialize PaddleOCR: {e}")
+        # A backend reader must never run two calls at once; a discarded
+        # hedged call may still be running when the next job starts
+        self._locks = {name: threading.Lock() for name in self.ENGINE_ATTRIBUTES}
         
-        if EASYOCR_AVAILABLE:
-            try:
-                self.easy_ocr = easyocr.Reader(
-                    self.languages,
-                    gpu=use_gpu,
-                    verbose=False
-                )
-                logger.info("EasyOCR initialized successfully")
-            except Exception as e:
-                logger.error(f"Failed to initialize EasyOCR: {e}")
+        self._load_lock = threading.Lock()
+        self._load_failed = set()
+        self._last_used: Dict[str, float] = {}
+        self.engine_memory: Dict[str, int] = {}
+        
+        if self.engines:
+            self._ensure_loaded(self.engines[0])
+    
+    def _create_backend(self, name: str):
+        """Construct the backend reader of an engine"""
+        if name == "paddleocr":
+            if not PADDLE_AVAILABLE:
+                raise RuntimeError("PaddleOCR not installed")
+            return PaddleOCR(
+                use_angle_cls=settings.OCR_ANGLE_CLS,
+                lang='en',  # PaddleOCR doesn't have direct Thai support, but works with mixed text
+                use_gpu=self.use_gpu,
+                rec_batch_num=settings.OCR_REC_BATCH_SIZE,
+                cpu_threads=get_threading_config().threads,
+                show_log=False
+            )
+        if name == "easyocr":
+            if not EASYOCR_AVAILABLE:
+                raise RuntimeError("EasyOCR not installed")
+            return easyocr.Reader(
+                self.languages,
+                gpu=self.use_gpu,
+                verbose=False
+            )
+        if name == "onnx":
+            return OnnxOCR(
+                det_model=settings.OCR_ONNX_DET_MODEL,
+                rec_model=settings.OCR_ONNX_REC_MODEL,
+                charset_path=settings.OCR_ONNX_CHARSET,
+                quantize=settings.OCR_ONNX_QUANTIZE,
+                threads=settings.OCR_ONNX_THREADS or get_threading_config().threads
+            )
+        if name == "tesseract":
+            if not TESSERACT_AVAILABLE:
+                raise RuntimeError("pytesseract not installed")
+            if settings.OCR_TESSERACT_CMD:
+                pytesseract.pytesseract.tesseract_cmd = settings.OCR_TESSERACT_CMD
+            # Fails fast when the tesseract binary is missing
+            pytesseract.get_tesseract_version()
+            return pytesseract
+        raise ValueError(f"Unknown OCR engine: {name}")
+    
+    def _ensure_loaded(self, name: str) -> bool:
+        """
+        Get an engine ready for use, loading it on first use
+        
+        Args:
+            name: Engine name
+            
+        Returns:
+            True if the engine's backend is loaded
+        """
+        attribute = self.ENGINE_ATTRIBUTES.get(name)
+        if attribute is None:
+            return False
+        
+        if getattr(self, attribute) is None:
+            if name not in self._loadable_engines() or name in self._load_failed:
+                return False
+            
+            with self._load_lock:
+                if getattr(self, attribute) is None:
+                    rss_before = current_rss_bytes()
+                    try:
+                        setattr(self, attribute, self._create_backend(name))
+                    except Exception as e:
+                        logger.error(f"Failed to initialize {name}: {e}")
+                        self._load_failed.add(name)
+                        return False
+                    self.engine_memory[name] = max(current_rss_bytes() - rss_before, 0)
+                    logger.info(
+                        f"{name} initialized successfully "
+                        f"({self.engine_memory[name] / (1024 * 1024):.0f} MB resident)"
+                    )
+        
+        self._last_used[name] = time.monotonic()
+        self._enforce_memory_budget(keep=name)
+        return True
+    
+    def _loadable_engines(self) -> List[str]:
+        """Configured engines, plus the field engine used by recognize_field"""
+        field_engine = settings.OCR_FIELD_ENGINE
+        if field_engine in self.ENGINE_ATTRIBUTES and field_engine not in self.engines:
+            return self.engines + [field_engine]
+        return self.engines
+    
+    def _reader(self, name: str):
+        """Get an engine's loaded backend reader; call while holding its lock"""
+        reader = getattr(self, self.ENGINE_ATTRIBUTES[name])
+        if reader is None:
+            raise RuntimeError(f"{name} was unloaded")
+        return reader
+    
+    @contextmanager
+    def _use(self, name: str):
+        """
+        Hold an engine's lock with its backend loaded for the duration of a call
+        
+        The memory budget only unloads engines whose lock is free, so the
+        backend cannot be unloaded between loading and use. An engine unloaded
+        since the caller's availability check is loaded again here.
+        
+        Args:
+            name: Engine name
+            
+        Yields:
+            The engine's backend reader
+        """
+        with self._locks[name]:
+            if not self._ensure_loaded(name):
+                raise RuntimeError(f"{name} not available")
+            yield self._reader(name)
+    
+    def _loaded_engines(self) -> List[str]:
+        """Names of engines whose backend is currently loaded"""
+        return [
+            name for name, attribute in self.ENGINE_ATTRIBUTES.items()
+            if getattr(self, attribute) is not None
+        ]
+    
+    def _enforce_memory_budget(self, keep: str):
+        """Unload least recently used secondary engines while over OCR_MEMORY_BUDGET_MB"""
+        budget = settings.OCR_MEMORY_BUDGET_MB * 1024 * 1024
+        if budget <= 0:
+            return
+        
+        primary = self.engines[0] if self.engines else None
+        candidates = sorted(
+            (
+                name for name in self._loaded_engines()
+                if name not in (primary, keep) and name in self.engine_memory
+            ),
+            key=lambda name: self._last_used.get(name, 0.0)
+        )
+        for name in candidates:
+            if sum(self.engine_memory.get(loaded, 0) for loaded in self._loaded_engines()) <= budget:
+                break
+            # Engines in use are skipped; they are unloaded on a later load
+            self.unload(name, wait=False)
+    
+    def unload(self, name: str, wait: bool = True) -> bool:
+        """
+        Unload an engine's backend; it is reloaded on next use
+        
+        Args:
+            name: Engine name
+            wait: Wait for a running call of the engine to finish; when False
+                an engine in use is left loaded
+            
+        Returns:
+            True if the engine was unloaded
+        """
+        attribute = self.ENGINE_ATTRIBUTES[name]
+        lock = self._locks[name]
+        if not lock.acquire(blocking=wait):
+            return False
+        try:
+            setattr(self, attribute, None)
+        finally:
+            lock.release()
+        freed = self.engine_memory.pop(name, 0)
+        gc.collect()
+        logger.info(f"Unloaded {name} (~{freed / (1024 * 1024):.0f} MB)")
+        return True
+    
+    def memory_report(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get load state and resident memory of each configured engine
+        
+        Returns:
+            Dictionary keyed by engine name with loaded flag and resident MB
+            measured as the RSS growth when the engine was loaded
+        """
+        loaded = self._loaded_engines()
+        return {
+            name: {
+                "loaded": name in loaded,
+                "primary": name == self.engines[0],
+                "resident_mb": round(self.engine_memory.get(name, 0) / (1024 * 1024), 1) if name in loaded else 0.0
+            }
+            for name in self._loadable_engines()
+        }
     
     def process_with_paddle(self, image: np.ndarray) -> Tuple[str, float]:
         """
@@ -69,11 +433,14 @@ class OCREngine:
         Returns:
             Tuple of (text, confidence)
         """
-        if not self.paddle_ocr:
+        if not self._ensure_loaded("paddleocr"):
             raise RuntimeError("PaddleOCR not available")
         
         try:
-            result = self.paddle_ocr.ocr(image, cls=True)
+            with self._use("paddleocr") as reader:
+                started = time.perf_counter()
+                result = reader.ocr(image, cls=settings.OCR_ANGLE_CLS)
+                hedge_policy.record_latency("paddleocr", time.perf_counter() - started)
             
             if not result or not result[0]:
                 return "", 0.0
@@ -107,11 +474,14 @@ class OCREngine:
         Returns:
             Tuple of (text, confidence)
         """
-        if not self.easy_ocr:
+        if not self._ensure_loaded("easyocr"):
             raise RuntimeError("EasyOCR not available")
         
         try:
-            result = self.easy_ocr.readtext(image)
+            with self._use("easyocr") as reader:
+                started = time.perf_counter()
+                result = reader.readtext(image)
+                hedge_policy.record_latency("easyocr", time.perf_counter() - started)
             
             if not result:
                 return "", 0.0
@@ -134,60 +504,959 @@ class OCREngine:
             logger.error(f"EasyOCR processing error: {e}")
             raise
     
-    def process(
+    def process_with_onnx(self, image: np.ndarray) -> Tuple[str, float]:
+        """
+        Process image with the ONNX Runtime models
+        
+        Args:
+            image: Input image as numpy array
+            
+        Returns:
+            Tuple of (text, confidence)
+        """
+        if not self._ensure_loaded("onnx"):
+            raise RuntimeError("ONNX engine not available")
+        
+        try:
+            with self._use("onnx") as reader:
+                started = time.perf_counter()
+                crops = [self._crop_box(image, box) for box in self._sort_boxes(reader.detect(image))]
+                recognized = self._recognize_cached(
+                    "onnx", crops, lambda batch: reader.recognize(batch, batch_size=settings.OCR_REC_BATCH_SIZE)
+                )
+                hedge_policy.record_latency("onnx", time.perf_counter() - started)
+            
+            lines = [(text, conf) for text, conf in recognized if text]
+            if not lines:
+                return "", 0.0
+            
+            full_text = "\n".join(text for text, _ in lines)
+            avg_confidence = sum(conf for _, conf in lines) / len(lines)
+            
+            return full_text, avg_confidence
+            
+        except Exception as e:
+            logger.error(f"ONNX processing error: {e}")
+            raise
+    
+    @staticmethod
+    def _tesseract_output(data: Dict[str, List]) -> Tuple[str, float]:
+        """
+        Join Tesseract image_to_data output into lines
+        
+        Args:
+            data: pytesseract image_to_data dictionary
+            
+        Returns:
+            Tuple of (text, confidence) with confidence scaled to 0-1
+        """
+        lines: Dict[Tuple[int, int, int], List[str]] = {}
+        confidences = []
+        for idx, word in enumerate(data["text"]):
+            conf = float(data["conf"][idx])
+            if not word.strip() or conf < 0:
+                continue
+            key = (data["block_num"][idx], data["par_num"][idx], data["line_num"][idx])
+            lines.setdefault(key, []).append(word)
+            confidences.append(conf / 100)
+        
+        text = "\n".join(" ".join(words) for _, words in sorted(lines.items()))
+        return text, sum(confidences) / len(confidences) if confidences else 0.0
+    
+    def process_with_tesseract(self, image: np.ndarray) -> Tuple[str, float]:
+        """
+        Process image with Tesseract
+        
+        Args:
+            image: Input image as numpy array
+            
+        Returns:
+            Tuple of (text, confidence)
+        """
+        if not self._ensure_loaded("tesseract"):
+            raise RuntimeError("Tesseract not available")
+        
+        try:
+            lang = "+".join(self.TESSERACT_LANGUAGES.get(code, code) for code in self.languages)
+            with self._use("tesseract") as reader:
+                started = time.perf_counter()
+                data = reader.image_to_data(
+                    image,
+                    lang=lang,
+                    output_type=pytesseract.Output.DICT
+                )
+                hedge_policy.record_latency("tesseract", time.perf_counter() - started)
+            return self._tesseract_output(data)
+            
+        except Exception as e:
+            logger.error(f"Tesseract processing error: {e}")
+            raise
+    
+    def read_with_tesseract(self, crop: np.ndarray, allowlist: Optional[str] = None) -> Tuple[str, float]:
+        """
+        Read a single-line region with Tesseract, restricted to an allowlist
+        
+        Much faster than the deep-learning pipeline for short Latin/digit
+        fields such as amount, time, account and reference numbers.
+        
+        Args:
+            crop: Region containing one line of text
+            allowlist: Characters Tesseract may output (tessedit_char_whitelist)
+            
+        Returns:
+            Tuple of (text, confidence)
+        """
+        if not self._ensure_loaded("tesseract"):
+            raise RuntimeError("Tesseract not available")
+        
+        # psm 7: treat the image as a single text line
+        config = "--psm 7"
+        if allowlist:
+            config += f" -c tessedit_char_whitelist={allowlist}"
+            lang = "eng"
+        else:
+            lang = "+".join(self.TESSERACT_LANGUAGES.get(code, code) for code in self.languages)
+        with self._use("tesseract") as reader:
+            data = reader.image_to_data(
+                crop,
+                lang=lang,
+                config=config,
+                output_type=pytesseract.Output.DICT
+            )
+        text, confidence = self._tesseract_output(data)
+        return text.replace("\n", " "), confidence
+    
+    def read_with_easyocr(self, crop: np.ndarray, allowlist: Optional[str] = None) -> Tuple[str, float]:
+        """
+        Read a single-line region with EasyOCR's recognizer, restricted to an allowlist
+        
+        Skips text detection: the whole crop is one line. EasyOCR drops the
+        characters outside the allowlist from its decoder.
+        
+        Args:
+            crop: Region containing one line of text
+            allowlist: Characters EasyOCR may output
+            
+        Returns:
+            Tuple of (text, confidence)
+        """
+        if not self._ensure_loaded("easyocr"):
+            raise RuntimeError("EasyOCR not available")
+        
+        gray = cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY) if crop.ndim == 3 else crop
+        with self._use("easyocr") as reader:
+            result = reader.recognize(gray, allowlist=allowlist, detail=1)
+        if not result:
+            return "", 0.0
+        
+        text = " ".join(detection[1] for detection in result)
+        confidence = sum(detection[2] for detection in result) / len(result)
+        return text, float(confidence)
+    
+    def read_with_onnx(self, crop: np.ndarray, allowlist: Optional[str] = None) -> Tuple[str, float]:
+        """
+        Read a single-line region with the ONNX recognizer, masking disallowed classes
+        
+        Args:
+            crop: Region containing one line of text
+            allowlist: Characters the CTC decoder may emit
+            
+        Returns:
+            Tuple of (text, confidence)
+        """
+        if not self._ensure_loaded("onnx"):
+            raise RuntimeError("ONNX engine not available")
+        
+        with self._use("onnx") as reader:
+            return reader.recognize([crop], batch_size=1, allowlist=allowlist)[0]
+    
+    def read_with_paddle(self, crop: np.ndarray, allowlist: Optional[str] = None) -> Tuple[str, float]:
+        """
+        Read a single-line region with the PaddleOCR recognizer
+        
+        PaddleOCR has no restricted decoder; recognize() maps its output onto
+        the allowlist afterwards.
+        
+        Args:
+            crop: Region containing one line of text
+            allowlist: Unused, accepted for a uniform signature
+            
+        Returns:
+            Tuple of (text, confidence)
+        """
+        if not self._ensure_loaded("paddleocr"):
+            raise RuntimeError("PaddleOCR not available")
+        
+        return self._recognize_with_paddle([crop])[0]
+    
+    def _read_funcs(self) -> Dict[str, Callable[[np.ndarray, Optional[str]], Tuple[str, float]]]:
+        """Single-line readers by engine name"""
+        return {
+            "tesseract": self.read_with_tesseract,
+            "easyocr": self.read_with_easyocr,
+            "onnx": self.read_with_onnx,
+            "paddleocr": self.read_with_paddle
+        }
+    
+    def recognize(
         self,
-        image: np.ndarray,
+        crop: np.ndarray,
+        allowlist: Optional[str] = None,
         engine: Optional[str] = None
-    ) -> Dict[str, any]:
+    ) -> Dict[str, Any]:
         """
-        Process image with OCR with fallback support
+        Recognize one text line region, optionally restricted to a character allowlist
+        
+        Restricting the charset makes the decoders faster and removes
+        confusions such as O/0 and l/1 in numeric fields. Tesseract, EasyOCR
+        and ONNX decode with the allowlist directly; the output of every
+        engine is then mapped onto it (see constrain_to_allowlist).
+        
+        The requested engine is tried first, then the configured engines in
+        priority order, until one succeeds.
         
         Args:
-            image: Input image as numpy array
-            engine: Specific engine to use ('paddleocr', 'easyocr', or None for auto)
+            crop: Region containing one line of text
+            allowlist: Allowed characters, or None for the full charset
+            engine: Engine to try first
             
         Returns:
-            Dictionary with text, confidence, and engine used
+            Dictionary with text, confidence, engine used and processing time
         """
         start_time = time.time()
+        funcs = self._read_funcs()
+        candidates = [engine] if engine else []
+        candidates += self.engines + list(self.ENGINE_ATTRIBUTES)
         
-        # Try specified engine first
-        if engine == "paddleocr" and self.paddle_ocr:
+        tried = set()
+        for engine_name in candidates:
+            if engine_name in tried or engine_name not in funcs:
+                continue
+            tried.add(engine_name)
+            if not self._ensure_loaded(engine_name):
+                continue
             try:
-                text, confidence = self.process_with_paddle(image)
-                processing_time = time.time() - start_time
+                text, confidence = funcs[engine_name](crop, allowlist)
+                text = constrain_to_allowlist(text, allowlist)
                 return {
                     "text": text,
-                    "confidence": confidence,
-                    "engine": "paddleocr",
-                    "processing_time": processing_time
+                    # Nothing of the read survived the allowlist
+                    "confidence": confidence if text.strip() else 0.0,
+                    "engine": engine_name,
+                    "processing_time": time.time() - start_time
                 }
             except Exception as e:
-                logger.warning(f"PaddleOCR failed, trying fallback: {e}")
+                logger.warning(f"{engine_name} line read failed: {e}")
+        
+        return {
+            "text": "",
+            "confidence": 0.0,
+            "engine": "none",
+            "processing_time": time.time() - start_time
+        }
+    
+    def recognize_field(self, crop: np.ndarray, field: str) -> Dict[str, Any]:
+        """
+        Recognize a field region restricted to the field's characters
+        
+        Uses OCR_FIELD_ENGINE first (the Tesseract fast path by default),
+        loading it on first use even when it is not in OCR_ENGINES, and
+        falls back to the other engines on the same crop.
+        
+        Args:
+            crop: Region containing one line of the field
+            field: Field name in FIELD_CHARSETS
+            
+        Returns:
+            Dictionary with text, confidence, engine used and processing time
+        """
+        return self.recognize(
+            crop,
+            allowlist=self.FIELD_CHARSETS.get(field),
+            engine=settings.OCR_FIELD_ENGINE
+        )
+    
+    @staticmethod
+    def _sort_boxes(boxes: List) -> List[np.ndarray]:
+        """Sort text boxes top-to-bottom, then left-to-right within a line"""
+        boxes = [np.asarray(box, dtype=np.float32).reshape(4, 2) for box in boxes]
+        boxes.sort(key=lambda b: (b[:, 1].min(), b[:, 0].min()))
+        
+        for i in range(len(boxes) - 1):
+            for j in range(i, -1, -1):
+                same_line = abs(boxes[j + 1][0, 1] - boxes[j][0, 1]) < 10
+                if same_line and boxes[j + 1][0, 0] < boxes[j][0, 0]:
+                    boxes[j], boxes[j + 1] = boxes[j + 1], boxes[j]
+                else:
+                    break
+        return boxes
+    
+    @staticmethod
+    def _crop_box(image: np.ndarray, box: np.ndarray) -> np.ndarray:
+        """
+        Crop a (possibly rotated) quadrilateral text box from an image
+        
+        Args:
+            image: Source image
+            box: 4x2 array of corner points (clockwise from top-left)
+            
+        Returns:
+            Upright crop of the text line
+        """
+        box = np.asarray(box, dtype=np.float32)
+        width = int(max(np.linalg.norm(box[0] - box[1]), np.linalg.norm(box[2] - box[3])))
+        height = int(max(np.linalg.norm(box[0] - box[3]), np.linalg.norm(box[1] - box[2])))
+        width, height = max(width, 1), max(height, 1)
+        
+        target = np.float32([[0, 0], [width, 0], [width, height], [0, height]])
+        matrix = cv2.getPerspectiveTransform(box, target)
+        crop = cv2.warpPerspective(
+            image,
+            matrix,
+            (width, height),
+            borderMode=cv2.BORDER_REPLICATE,
+            flags=cv2.INTER_CUBIC
+        )
+        
+        # Vertical boxes are text lines rotated by 90 degrees
+        if height / width >= 1.5:
+            crop = np.rot90(crop)
+        return crop
+    
+    def _recognize_cached(
+        self,
+        name: str,
+        crops: List[np.ndarray],
+        recognize: Callable[[List[np.ndarray]], List[Tuple[str, float]]]
+    ) -> List[Tuple[str, float]]:
+        """
+        Recognize text line crops, reusing cached recognitions of identical lines
+        
+        With OCR_LINE_CACHE_ENABLED, crops whose fingerprint (see
+        crop_fingerprint) was recognized by the same engine before are
+        answered from the cache; only the others reach ``recognize``. Warm-up
+        calls bypass the cache so synthetic lines do not occupy it.
+        
+        Args:
+            name: Engine name, part of the cache key
+            crops: Text line crops
+            recognize: Recognizer taking a list of crops
+            
+        Returns:
+            List of (text, confidence) per crop
+        """
+        if not crops:
+            return []
+        if not settings.OCR_LINE_CACHE_ENABLED or not recording():
+            return recognize(crops)
+        
+        keys = [(name, crop_fingerprint(crop, settings.OCR_LINE_CACHE_HEIGHT)) for crop in crops]
+        outputs = [recognition_cache.get(key) for key in keys]
+        missing = [idx for idx, output in enumerate(outputs) if output is None]
+        if missing:
+            started = time.perf_counter()
+            recognized = recognize([crops[idx] for idx in missing])
+            recognition_cache.record_recognition(time.perf_counter() - started)
+            for idx, output in zip(missing, recognized):
+                recognition_cache.put(keys[idx], output)
+                outputs[idx] = output
+        return outputs
+    
+    def _recognize_with_paddle(self, crops: List[np.ndarray]) -> List[Tuple[str, float]]:
+        """
+        Recognize text line crops with PaddleOCR in batches of OCR_REC_BATCH_SIZE
         
-        if engine == "easyocr" and self.easy_ocr:
+        Args:
+            crops: Text line crops
+            
+        Returns:
+            List of (text, confidence) per crop
+        """
+        if not crops:
+            return []
+        
+        crops = [
+            cv2.cvtColor(crop, cv2.COLOR_GRAY2BGR) if crop.ndim == 2 else crop
+            for crop in crops
+        ]
+        with self._use("paddleocr") as reader:
+            result = reader.ocr(crops, det=False, rec=True, cls=False)
+        return [(text, float(conf)) for text, conf in result[0]]
+    
+    def batch_with_paddle(self, images: List[np.ndarray]) -> List[Tuple[str, float]]:
+        """
+        Process several images with PaddleOCR, batching recognition across images
+        
+        Detection runs per image; the text line crops of all images are then
+        recognized together so the recognizer sees full batches.
+        
+        Args:
+            images: Input images as numpy arrays
+            
+        Returns:
+            List of (text, confidence) per image
+        """
+        if not self._ensure_loaded("paddleocr"):
+            raise RuntimeError("PaddleOCR not available")
+        
+        try:
+            crops = []
+            owners = []
+            for idx, image in enumerate(images):
+                with self._use("paddleocr") as reader:
+                    detected = reader.ocr(image, det=True, rec=False, cls=False)
+                boxes = detected[0] if detected and detected[0] else []
+                for box in self._sort_boxes(boxes):
+                    crops.append(self._crop_box(image, box))
+                    owners.append(idx)
+            
+            recognized = self._recognize_cached("paddleocr", crops, self._recognize_with_paddle)
+            
+            lines = [[] for _ in images]
+            for idx, (text, conf) in zip(owners, recognized):
+                lines[idx].append((text, conf))
+            
+            return [
+                (
+                    "\n".join(text for text, _ in image_lines),
+                    sum(conf for _, conf in image_lines) / len(image_lines) if image_lines else 0.0
+                )
+                for image_lines in lines
+            ]
+            
+        except Exception as e:
+            logger.error(f"PaddleOCR batch processing error: {e}")
+            raise
+    
+    def batch_with_easyocr(self, images: List[np.ndarray]) -> List[Tuple[str, float]]:
+        """
+        Process several images with EasyOCR's batched reader
+        
+        Images are padded onto a common canvas so detection runs as a single
+        batch without distorting aspect ratios.
+        
+        Args:
+            images: Input images as numpy arrays
+            
+        Returns:
+            List of (text, confidence) per image
+        """
+        if not self._ensure_loaded("easyocr"):
+            raise RuntimeError("EasyOCR not available")
+        
+        try:
+            color = any(image.ndim == 3 for image in images)
+            height = max(image.shape[0] for image in images)
+            width = max(image.shape[1] for image in images)
+            
+            canvases = []
+            for image in images:
+                if color and image.ndim == 2:
+                    image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+                canvas = np.full((height, width) + image.shape[2:], 255, dtype=np.uint8)
+                canvas[:image.shape[0], :image.shape[1]] = image
+                canvases.append(canvas)
+            
+            with self._use("easyocr") as reader:
+                batched = reader.readtext_batched(
+                    canvases,
+                    batch_size=settings.OCR_REC_BATCH_SIZE
+                )
+            
+            outputs = []
+            for detections in batched:
+                texts = [detection[1] for detection in detections]
+                confidences = [detection[2] for detection in detections]
+                outputs.append((
+                    "\n".join(texts),
+                    sum(confidences) / len(confidences) if confidences else 0.0
+                ))
+            return outputs
+            
+        except Exception as e:
+            logger.error(f"EasyOCR batch processing error: {e}")
+            raise
+    
+    def batch_with_onnx(self, images: List[np.ndarray]) -> List[Tuple[str, float]]:
+        """
+        Process several images with the ONNX Runtime models
+        
+        Detection runs per image; the text line crops of all images are then
+        recognized together so the recognizer sees full batches.
+        
+        Args:
+            images: Input images as numpy arrays
+            
+        Returns:
+            List of (text, confidence) per image
+        """
+        if not self._ensure_loaded("onnx"):
+            raise RuntimeError("ONNX engine not available")
+        
+        try:
+            with self._use("onnx") as reader:
+                crops = []
+                owners = []
+                for idx, image in enumerate(images):
+                    for box in self._sort_boxes(reader.detect(image)):
+                        crops.append(self._crop_box(image, box))
+                        owners.append(idx)
+                recognized = self._recognize_cached(
+                    "onnx", crops, lambda batch: reader.recognize(batch, batch_size=settings.OCR_REC_BATCH_SIZE)
+                )
+            
+            lines = [[] for _ in images]
+            for idx, (text, conf) in zip(owners, recognized):
+                if text:
+                    lines[idx].append((text, conf))
+            
+            return [
+                (
+                    "\n".join(text for text, _ in image_lines),
+                    sum(conf for _, conf in image_lines) / len(image_lines) if image_lines else 0.0
+                )
+                for image_lines in lines
+            ]
+            
+        except Exception as e:
+            logger.error(f"ONNX batch processing error: {e}")
+            raise
+    
+    def batch_with_tesseract(self, images: List[np.ndarray]) -> List[Tuple[str, float]]:
+        """
+        Process several images with Tesseract, one call per image
+        
+        Args:
+            images: Input images as numpy arrays
+            
+        Returns:
+            List of (text, confidence) per image
+        """
+        return [self.process_with_tesseract(image) for image in images]
+    
+    def _detect_lines(self, name: str, image: np.ndarray) -> List[np.ndarray]:
+        """
+        Run only the text detector of an engine
+        
+        Args:
+            name: Engine name in REGION_ENGINES
+            image: Input image
+            
+        Returns:
+            Text line boxes in reading order
+        """
+        with self._use(name) as reader:
+            if name == "paddleocr":
+                detected = reader.ocr(image, det=True, rec=False, cls=False)
+                boxes = detected[0] if detected and detected[0] else []
+            elif name == "onnx":
+                boxes = reader.detect(image)
+            else:
+                horizontal, free = reader.detect(image)
+                boxes = [
+                    [[x0, y0], [x1, y0], [x1, y1], [x0, y1]]
+                    for x0, x1, y0, y1 in horizontal[0]
+                ] + list(free[0])
+        return self._sort_boxes(boxes)
+    
+    def _recognize_lines(self, name: str, crops: List[np.ndarray]) -> List[Tuple[str, float]]:
+        """
+        Run only the text recognizer of an engine on line crops
+        
+        Args:
+            name: Engine name in REGION_ENGINES
+            crops: Text line crops
+            
+        Returns:
+            List of (text, confidence) per crop
+        """
+        if name == "paddleocr":
+            return self._recognize_cached(name, crops, self._recognize_with_paddle)
+        if name == "onnx":
+            with self._use("onnx") as reader:
+                return self._recognize_cached(
+                    name, crops, lambda batch: reader.recognize(batch, batch_size=settings.OCR_REC_BATCH_SIZE)
+                )
+        return self._recognize_cached(name, crops, lambda batch: [self.read_with_easyocr(crop) for crop in batch])
+    
+    def process_regions(
+        self,
+        name: str,
+        images: List[np.ndarray],
+        accept: Optional[Callable[[str], bool]] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        Detect once, then recognize only the lines that can hold slip fields
+        
+        Layout cues (select_field_regions) drop banners, footers, fine print
+        and the QR code caption before recognition. The selected lines of all
+        images are recognized in one batch. Images whose selected lines fail
+        ``accept`` have their remaining lines recognized as well, so region
+        mode never loses a field the full pipeline would have found.
+        
+        Args:
+            name: Engine name in REGION_ENGINES
+            images: Input images as numpy arrays
+            accept: Optional check on the recognized text (e.g. required fields extracted)
+            
+        Returns:
+            List of (text, confidence) per image
+        """
+        if not self._ensure_loaded(name):
+            raise RuntimeError(f"{name} not available")
+        
+        try:
+            crops = []
+            selected = []
+            for image in images:
+                boxes = self._detect_lines(name, image)
+                crops.append([self._crop_box(image, box) for box in boxes])
+                selected.append(set(select_field_regions(boxes, image.shape, find_qr_rect(image))))
+            
+            lines: List[Dict[int, Tuple[str, float]]] = [{} for _ in images]
+            
+            def recognize(keys: List[Tuple[int, int]]):
+                recognized = self._recognize_lines(name, [crops[idx][line] for idx, line in keys])
+                for (idx, line), output in zip(keys, recognized):
+                    lines[idx][line] = output
+            
+            def joined(idx: int) -> Tuple[str, float]:
+                image_lines = [lines[idx][line] for line in sorted(lines[idx]) if lines[idx][line][0]]
+                return (
+                    "\n".join(text for text, _ in image_lines),
+                    sum(conf for _, conf in image_lines) / len(image_lines) if image_lines else 0.0
+                )
+            
+            recognize([(idx, line) for idx in range(len(images)) for line in sorted(selected[idx])])
+            
+            fallback = []
+            for idx in range(len(images)):
+                text, _ = joined(idx)
+                if len(selected[idx]) < len(crops[idx]) and not (text and (accept(text) if accept else True)):
+                    fallback.append(idx)
+            recognize([
+                (idx, line) for idx in fallback
+                for line in range(len(crops[idx])) if line not in selected[idx]
+            ])
+            
+            for idx in range(len(images)):
+                region_stats.record(len(crops[idx]), len(lines[idx]), idx in fallback)
+            return [joined(idx) for idx in range(len(images))]
+            
+        except Exception as e:
+            logger.error(f"{name} region processing error: {e}")
+            raise
+    
+    def _is_installed(self, name: str) -> bool:
+        """Check whether an engine's library is importable"""
+        return {
+            "paddleocr": PADDLE_AVAILABLE,
+            "easyocr": EASYOCR_AVAILABLE,
+            "onnx": ONNX_AVAILABLE,
+            "tesseract": TESSERACT_AVAILABLE
+        }.get(name, False)
+    
+    def _usable_engines(self) -> List[str]:
+        """Engines that are loaded or can be loaded on demand, in priority order"""
+        loaded = self._loaded_engines()
+        names = [
+            name for name in self.engines
+            if name in loaded or (name not in self._load_failed and self._is_installed(name))
+        ]
+        return names + [name for name in loaded if name not in names]
+    
+    def _engine_funcs(
+        self,
+        accept: Optional[Callable[[str], bool]] = None
+    ) -> Dict[str, Callable[[np.ndarray], Tuple[str, float]]]:
+        """Single-image processing functions of the usable engines"""
+        funcs = {
+            "paddleocr": self.process_with_paddle,
+            "easyocr": self.process_with_easyocr,
+            "onnx": self.process_with_onnx,
+            "tesseract": self.process_with_tesseract
+        }
+        if settings.OCR_REGION_MODE:
+            for name in self.REGION_ENGINES:
+                funcs[name] = lambda image, name=name: self.process_regions(name, [image], accept)[0]
+        return {name: funcs[name] for name in self._usable_engines()}
+    
+    def _batch_funcs(
+        self,
+        accept: Optional[Callable[[str], bool]] = None
+    ) -> Dict[str, Callable[[List[np.ndarray]], List[Tuple[str, float]]]]:
+        """Batched processing functions of the usable engines"""
+        funcs = {
+            "paddleocr": self.batch_with_paddle,
+            "easyocr": self.batch_with_easyocr,
+            "onnx": self.batch_with_onnx,
+            "tesseract": self.batch_with_tesseract
+        }
+        if settings.OCR_REGION_MODE:
+            for name in self.REGION_ENGINES:
+                funcs[name] = lambda images, name=name: self.process_regions(name, images, accept)
+        return {name: funcs[name] for name in self._usable_engines()}
+    
+    def _run_engine(self, name: str, func: Callable, payload: Any, batch: bool = False) -> Any:
+        """
+        Call an engine function through the engine router
+        
+        Args:
+            name: Engine name
+            func: Single-image or batched processing function
+            payload: Image, or list of images when batch is True
+            batch: Whether func is a batched function
+            
+        Returns:
+            Output of func
+        """
+        if not engine_router.acquire(name):
+            raise RuntimeError(f"{name} circuit is open")
+        
+        started = time.perf_counter()
+        try:
+            output = func(payload)
+        except Exception:
+            engine_router.record_failure(name, time.perf_counter() - started)
+            raise
+        
+        if batch:
+            # Batch latency is not comparable with single-image calls
+            confidences = [conf for _, conf in output]
+            engine_router.record_success(
+                name, None, sum(confidences) / len(confidences) if confidences else None
+            )
+        else:
+            engine_router.record_success(name, time.perf_counter() - started, output[1])
+        return output
+    
+    def _routed_funcs(
+        self,
+        preferred: Optional[str] = None,
+        accept: Optional[Callable[[str], bool]] = None
+    ) -> Dict[str, Callable[[np.ndarray], Tuple[str, float]]]:
+        """Single-image functions of the engines the router lets through, in routing order"""
+        funcs = self._engine_funcs(accept)
+        return {name: funcs[name] for name in engine_router.order(list(funcs), preferred)}
+    
+    @staticmethod
+    def is_acceptable(
+        text: str,
+        confidence: float,
+        accept: Optional[Callable[[str], bool]] = None,
+        min_confidence: Optional[float] = None
+    ) -> bool:
+        """
+        Check whether an OCR output is good enough to stop the cascade
+        
+        Args:
+            text: Recognized text
+            confidence: Average recognition confidence
+            accept: Optional check on the text (e.g. required fields extracted)
+            min_confidence: Confidence threshold (defaults to OCR_CONFIDENCE_THRESHOLD)
+            
+        Returns:
+            True if the output meets the threshold and passes the check
+        """
+        if min_confidence is None:
+            min_confidence = settings.OCR_CONFIDENCE_THRESHOLD
+        if not text or confidence < min_confidence:
+            return False
+        return accept(text) if accept else True
+    
+    def process_cascade(
+        self,
+        image: np.ndarray,
+        accept: Optional[Callable[[str], bool]] = None,
+        start_stage: int = 0,
+        best: Optional[Dict[str, any]] = None
+    ) -> Dict[str, any]:
+        """
+        Process image through the engine cascade, cheapest engine first
+        
+        Each stage runs only if the previous ones produced no acceptable
+        output (confidence below OCR_CONFIDENCE_THRESHOLD or failed accept
+        check). If no stage is acceptable, the most confident output is returned.
+        
+        Args:
+            image: Input image as numpy array
+            accept: Optional check on the recognized text
+            start_stage: Index in OCR_CASCADE_ORDER to start from
+            best: Best result of the stages already run, if any
+            
+        Returns:
+            Dictionary with text, confidence, engine used, cascade stage, and
+            whether the result was accepted
+        """
+        start_time = time.time()
+        funcs = self._engine_funcs(accept)
+        stages = [name for name in settings.OCR_CASCADE_ORDER if name in funcs]
+        
+        for engine_name in stages[start_stage:]:
+            if not engine_router.available(engine_name):
+                logger.info(f"Cascade stage {engine_name} skipped, circuit open")
+                continue
             try:
-                text, confidence = self.process_with_easyocr(image)
-                processing_time = time.time() - start_time
-                return {
+                text, confidence = self._run_engine(engine_name, funcs[engine_name], image)
+            except Exception as e:
+                logger.warning(f"Cascade stage {engine_name} failed: {e}")
+                continue
+            
+            candidate = {
+                "text": text,
+                "confidence": confidence,
+                "engine": engine_name,
+                "cascade_stage": engine_name,
+                "accepted": self.is_acceptable(text, confidence, accept)
+            }
+            if best is None or confidence > best["confidence"]:
+                best = candidate
+            if candidate["accepted"]:
+                best = candidate
+                break
+            
+            logger.info(f"Cascade stage {engine_name} not accepted (confidence {confidence:.2f}), escalating")
+        
+        if best is None:
+            best = {
+                "text": "",
+                "confidence": 0.0,
+                "engine": "none",
+                "cascade_stage": None,
+                "accepted": False
+            }
+        
+        best = dict(best)
+        best["processing_time"] = best.get("processing_time", 0.0) + time.time() - start_time
+        return best
+    
+    def process_hedged(
+        self,
+        image: np.ndarray,
+        accept: Optional[Callable[[str], bool]] = None,
+        funcs: Optional[Dict[str, Callable[[np.ndarray], Tuple[str, float]]]] = None
+    ) -> Dict[str, any]:
+        """
+        Process image with the primary engine, hedging with the secondary on stalls
+        
+        If the primary engine has not returned within OCR_HEDGE_PERCENTILE of
+        its recent latency, the secondary engine is started in parallel
+        (subject to the OCR_HEDGE_MAX_RATIO cap). The first acceptable result
+        wins; the other call is cancelled if not yet started, or discarded.
+        
+        Args:
+            image: Input image as numpy array
+            accept: Optional check on the recognized text
+            funcs: Routed engine functions, as returned by _routed_funcs
+            
+        Returns:
+            Dictionary with text, confidence, engine used, and whether the
+            request was hedged
+        """
+        start_time = time.time()
+        if funcs is None:
+            funcs = self._routed_funcs(accept=accept)
+        if len(funcs) < 2:
+            # A circuit opened since the caller checked; nothing to hedge with
+            result = self._process_in_order(image, funcs)
+            result["hedged"] = False
+            return result
+        (primary, primary_func), (secondary, secondary_func) = list(funcs.items())[:2]
+        
+        executor = _get_hedge_executor()
+        futures = {executor.submit(self._run_engine, primary, primary_func, image): primary}
+        
+        hedged = False
+        delay = hedge_policy.hedge_delay(primary)
+        if delay is not None:
+            done, _ = wait(futures, timeout=delay)
+            if not done and hedge_policy.acquire_hedge():
+                logger.info(f"{primary} exceeded {delay * 1000:.0f} ms, hedging with {secondary}")
+                futures[executor.submit(self._run_engine, secondary, secondary_func, image)] = secondary
+                hedged = True
+        if not hedged:
+            hedge_policy.record_unhedged()
+        
+        best = None
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                engine_name = futures[future]
+                try:
+                    text, confidence = future.result()
+                except Exception as e:
+                    logger.error(f"{engine_name} failed: {e}")
+                    if not hedged and engine_name == primary:
+                        # Plain fallback when the primary fails fast
+                        fallback = executor.submit(self._run_engine, secondary, secondary_func, image)
+                        futures[fallback] = secondary
+                        pending.add(fallback)
+                    continue
+                
+                candidate = {
                     "text": text,
                     "confidence": confidence,
-                    "engine": "easyocr",
-                    "processing_time": processing_time
+                    "engine": engine_name,
+                    "hedged": hedged
                 }
-            except Exception as e:
-                logger.warning(f"EasyOCR failed: {e}")
+                if self.is_acceptable(text, confidence, accept):
+                    for other in pending:
+                        other.cancel()
+                    pending = set()
+                    best = candidate
+                    break
+                if best is None or confidence > best["confidence"]:
+                    best = candidate
+        
+        if best is None:
+            best = {"text": "", "confidence": 0.0, "engine": "none", "hedged": hedged}
+        elif hedged and best["engine"] == secondary:
+            hedge_policy.record_secondary_win()
+        
+        best["processing_time"] = time.time() - start_time
+        return best
+    
+    def process(
+        self,
+        image: np.ndarray,
+        engine: Optional[str] = None,
+        accept: Optional[Callable[[str], bool]] = None
+    ) -> Dict[str, any]:
+        """
+        Process image with OCR with fallback support
+        
+        Args:
+            image: Input image as numpy array
+            engine: Specific engine to use ('paddleocr', 'easyocr', 'onnx', 'tesseract', or None for auto)
+            accept: Optional check on the recognized text used by the cascade
+            
+        Returns:
+            Dictionary with text, confidence, and engine used
+        """
+        if engine is None and settings.OCR_CASCADE_ENABLED:
+            return self.process_cascade(image, accept=accept)
+        
+        # Route once: the router's state changes under concurrent requests
+        funcs = self._routed_funcs(preferred=engine, accept=accept)
+        if engine is None and settings.OCR_HEDGING_ENABLED and len(funcs) > 1:
+            return self.process_hedged(image, accept=accept, funcs=funcs)
         
-        # Try all available engines with fallback
-        engines_to_try = []
-        if self.paddle_ocr:
-            engines_to_try.append(("paddleocr", self.process_with_paddle))
-        if self.easy_ocr:
-            engines_to_try.append(("easyocr", self.process_with_easyocr))
+        return self._process_in_order(image, funcs)
+    
+    def _process_in_order(
+        self,
+        image: np.ndarray,
+        funcs: Dict[str, Callable[[np.ndarray], Tuple[str, float]]]
+    ) -> Dict[str, any]:
+        """Try the routed engines one after another until one succeeds"""
+        start_time = time.time()
         
-        for engine_name, process_func in engines_to_try:
+        # Specified engine first, then the others in routing order; engines
+        # whose circuit is open were left out by the router
+        for engine_name in funcs:
             try:
-                text, confidence = process_func(image)
+                text, confidence = self._run_engine(engine_name, funcs[engine_name], image)
                 processing_time = time.time() - start_time
                 return {
                     "text": text,
@@ -208,9 +1477,122 @@ class OCREngine:
             "processing_time": processing_time
         }
     
+    def process_batch(
+        self,
+        images: List[np.ndarray],
+        engine: Optional[str] = None,
+        accept: Optional[Callable[[str], bool]] = None
+    ) -> List[Dict[str, any]]:
+        """
+        Process several images with one batched engine call, with fallback support
+        
+        In cascade mode the whole batch runs on the cheapest engine and only
+        the images whose output is not acceptable escalate, one by one.
+        
+        Args:
+            images: Input images as numpy arrays
+            engine: Specific engine to use ('paddleocr', 'easyocr', 'onnx', 'tesseract', or None for auto)
+            accept: Optional check on the recognized text used by the cascade
+            
+        Returns:
+            List of dictionaries with text, confidence, and engine used, one per image
+        """
+        start_time = time.time()
+        
+        if not images:
+            return []
+        
+        batch_funcs = self._batch_funcs(accept)
+        
+        if engine is None and settings.OCR_CASCADE_ENABLED:
+            return self._process_batch_cascade(images, batch_funcs, accept)
+        
+        # Try specified engine first, skipping engines whose circuit is open
+        for engine_name in engine_router.order(list(batch_funcs), preferred=engine):
+            try:
+                outputs = self._run_engine(engine_name, batch_funcs[engine_name], images, batch=True)
+                processing_time = time.time() - start_time
+                return [
+                    {
+                        "text": text,
+                        "confidence": confidence,
+                        "engine": engine_name,
+                        "processing_time": processing_time
+                    }
+                    for text, confidence in outputs
+                ]
+            except Exception as e:
+                logger.error(f"{engine_name} batch failed: {e}")
+                continue
+        
+        # All engines failed
+        processing_time = time.time() - start_time
+        return [
+            {
+                "text": "",
+                "confidence": 0.0,
+                "engine": "none",
+                "processing_time": processing_time
+            }
+            for _ in images
+        ]
+    
+    def _process_batch_cascade(
+        self,
+        images: List[np.ndarray],
+        batch_funcs: Dict[str, Callable],
+        accept: Optional[Callable[[str], bool]] = None
+    ) -> List[Dict[str, any]]:
+        """Run the first cascade stage batched and escalate rejected images"""
+        start_time = time.time()
+        stages = [name for name in settings.OCR_CASCADE_ORDER if name in batch_funcs]
+        
+        # The first stage whose circuit is not open runs batched
+        first_stage = next((idx for idx, name in enumerate(stages) if engine_router.available(name)), None)
+        stages = stages[first_stage:] if first_stage is not None else []
+        # Escalation continues after the batched stage, also when it failed
+        next_stage = first_stage + 1 if first_stage is not None else 0
+        
+        first_results = [None] * len(images)
+        if stages:
+            try:
+                outputs = self._run_engine(stages[0], batch_funcs[stages[0]], images, batch=True)
+                processing_time = time.time() - start_time
+                first_results = [
+                    {
+                        "text": text,
+                        "confidence": confidence,
+                        "engine": stages[0],
+                        "cascade_stage": stages[0],
+                        "accepted": self.is_acceptable(text, confidence, accept),
+                        "processing_time": processing_time
+                    }
+                    for text, confidence in outputs
+                ]
+            except Exception as e:
+                logger.warning(f"Cascade stage {stages[0]} batch failed: {e}")
+        
+        results = []
+        for image, first in zip(images, first_results):
+            if first is not None and first["accepted"]:
+                results.append(first)
+            else:
+                results.append(self.process_cascade(
+                    image,
+                    accept=accept,
+                    start_stage=next_stage,
+                    best=first
+                ))
+        return results
+    
     def is_available(self) -> bool:
-        """Check if at least one OCR engine is available"""
-        return self.paddle_ocr is not None or self.easy_ocr is not None
+        """
+        Check if at least one OCR engine is available, without loading any
+        
+        An engine counts when it is loaded, or installed and not known to
+        fail loading, so health checks never pay for model loading.
+        """
+        return bool(self._usable_engines())
 
 
 # Global OCR engine instance
@@ -0,0 +1,287 @@
+"""
+ONNX Runtime OCR backend
+
+Runs exported text detection (DB) and recognition (CTC) models, such as the
+PaddleOCR PP-OCR models converted with paddle2onnx, on the ONNX Runtime CPU
+execution provider. Models can be dynamically quantized to INT8 on load.
+"""
+import os
+import cv2
+import numpy as np
+from typing import List, Optional, Tuple
+from loguru import logger
+
+try:
+    import onnxruntime as ort
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+    logger.warning("ONNX Runtime not available")
+
+
+def quantize_model(model_path: str) -> str:
+    """
+    Dynamically quantize a model's weights to INT8
+
+    The quantized model is written next to the original as
+    ``<name>.int8.onnx`` and reused on later loads.
+
+    Args:
+        model_path: Path of the FP32 ONNX model
+
+    Returns:
+        Path of the INT8 model
+    """
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    root, ext = os.path.splitext(model_path)
+    quantized_path = f"{root}.int8{ext}"
+    if not os.path.exists(quantized_path) or os.path.getmtime(quantized_path) < os.path.getmtime(model_path):
+        logger.info(f"Quantizing {model_path} to INT8")
+        quantize_dynamic(model_path, quantized_path, weight_type=QuantType.QInt8)
+    return quantized_path
+
+
+def load_charset(path: str, use_space_char: bool = True) -> List[str]:
+    """
+    Load a recognizer character dictionary (one character per line)
+
+    Args:
+        path: Dictionary file path
+        use_space_char: Whether the model was trained with a trailing space class
+
+    Returns:
+        Characters indexed by class, with the CTC blank at index 0
+    """
+    with open(path, encoding="utf-8") as f:
+        chars = [line.rstrip("\r\n") for line in f]
+    if use_space_char:
+        chars.append(" ")
+    return ["<blank>"] + chars
+
+
+def charset_mask(charset: List[str], allowlist: str) -> np.ndarray:
+    """
+    Build a class mask that keeps the CTC blank and the allowed characters
+
+    Args:
+        charset: Characters by class index, blank at index 0
+        allowlist: Allowed characters
+
+    Returns:
+        Boolean array with one entry per class
+    """
+    allowed = set(allowlist)
+    mask = np.array([char in allowed for char in charset], dtype=bool)
+    mask[0] = True
+    return mask
+
+
+def ctc_greedy_decode(
+    probs: np.ndarray,
+    charset: List[str],
+    mask: Optional[np.ndarray] = None
+) -> List[Tuple[str, float]]:
+    """
+    Decode CTC outputs by best path
+
+    Args:
+        probs: Class probabilities of shape (batch, time, classes)
+        charset: Characters by class index, blank at index 0
+        mask: Classes the decoder may emit (see charset_mask), or None for all
+
+    Returns:
+        List of (text, confidence) per sequence; confidence is the mean
+        probability of the emitted characters
+    """
+    if mask is not None:
+        # Best allowed path: disallowed classes can never win the argmax
+        probs = np.where(mask[:probs.shape[2]], probs, -1.0)
+    best = probs.argmax(axis=2)
+    best_probs = probs.max(axis=2)
+
+    results = []
+    for indices, scores in zip(best, best_probs):
+        keep = indices != 0
+        keep[1:] &= indices[1:] != indices[:-1]
+        text = "".join(charset[i] for i in indices[keep] if i < len(charset))
+        confidence = float(scores[keep].mean()) if keep.any() else 0.0
+        results.append((text, confidence))
+    return results
+
+
+class OnnxOCR:
+    """Text detection and recognition with ONNX Runtime"""
+
+    DET_MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32)
+    DET_STD = np.array([0.229, 0.224, 0.225], dtype=np.float32)
+
+    def __init__(
+        self,
+        det_model: str,
+        rec_model: str,
+        charset_path: str,
+        quantize: bool = False,
+        threads: int = 0,
+        det_limit_side: int = 960,
+        det_threshold: float = 0.3,
+        box_threshold: float = 0.6,
+        unclip_ratio: float = 1.5,
+        rec_height: int = 48
+    ):
+        """
+        Load the detection and recognition models
+
+        Args:
+            det_model: Path of the DB detection model
+            rec_model: Path of the CTC recognition model
+            charset_path: Path of the recognizer character dictionary
+            quantize: Whether to run INT8 dynamically quantized models
+            threads: Intra-op threads per session (0 for the ONNX Runtime default)
+            det_limit_side: Longest image side fed to the detector
+            det_threshold: Probability threshold of the text mask
+            box_threshold: Minimum mean probability of a kept box
+            unclip_ratio: Box expansion ratio (DB shrinks text regions)
+            rec_height: Recognizer input height
+        """
+        if not ONNX_AVAILABLE:
+            raise RuntimeError("ONNX Runtime not installed")
+
+        if quantize:
+            det_model = quantize_model(det_model)
+            rec_model = quantize_model(rec_model)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads > 0:
+            options.intra_op_num_threads = threads
+        providers = ["CPUExecutionProvider"]
+
+        self.det_session = ort.InferenceSession(det_model, options, providers=providers)
+        self.rec_session = ort.InferenceSession(rec_model, options, providers=providers)
+        self.det_input = self.det_session.get_inputs()[0].name
+        self.rec_input = self.rec_session.get_inputs()[0].name
+
+        self.charset = load_charset(charset_path)
+        self.det_limit_side = det_limit_side
+        self.det_threshold = det_threshold
+        self.box_threshold = box_threshold
+        self.unclip_ratio = unclip_ratio
+        self.rec_height = rec_height
+
+    @staticmethod
+    def _to_bgr(image: np.ndarray) -> np.ndarray:
+        return cv2.cvtColor(image, cv2.COLOR_GRAY2BGR) if image.ndim == 2 else image
+
+    def _detector_input(self, image: np.ndarray) -> Tuple[np.ndarray, float, float]:
+        """Resize to multiples of 32 within det_limit_side and normalize to NCHW"""
+        height, width = image.shape[:2]
+        scale = min(1.0, self.det_limit_side / max(height, width))
+        resized_h = max(32, int(round(height * scale / 32)) * 32)
+        resized_w = max(32, int(round(width * scale / 32)) * 32)
+
+        resized = cv2.resize(image, (resized_w, resized_h))
+        rgb = cv2.cvtColor(resized, cv2.COLOR_BGR2RGB).astype(np.float32) / 255.0
+        tensor = ((rgb - self.DET_MEAN) / self.DET_STD).transpose(2, 0, 1)[np.newaxis]
+        return np.ascontiguousarray(tensor), width / resized_w, height / resized_h
+
+    @staticmethod
+    def _order_points(points: np.ndarray) -> np.ndarray:
+        """Order four corners clockwise starting from the top-left"""
+        by_x = points[np.argsort(points[:, 0])]
+        left = by_x[:2][np.argsort(by_x[:2, 1])]
+        right = by_x[2:][np.argsort(by_x[2:, 1])]
+        return np.array([left[0], right[0], right[1], left[1]], dtype=np.float32)
+
+    def _boxes_from_mask(self, probs: np.ndarray) -> List[np.ndarray]:
+        """Extract expanded text boxes from the DB probability map"""
+        mask = (probs > self.det_threshold).astype(np.uint8)
+        contours, _ = cv2.findContours(mask, cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE)
+
+        boxes = []
+        for contour in contours:
+            if len(contour) < 4:
+                continue
+
+            rect_mask = np.zeros_like(mask)
+            cv2.drawContours(rect_mask, [contour], -1, 1, -1)
+            if probs[rect_mask.astype(bool)].mean() < self.box_threshold:
+                continue
+
+            (cx, cy), (w, h), angle = cv2.minAreaRect(contour)
+            if min(w, h) < 3:
+                continue
+
+            # Offset the shrunk region outwards by area * ratio / perimeter
+            distance = w * h * self.unclip_ratio / (2 * (w + h))
+            expanded = ((cx, cy), (w + 2 * distance, h + 2 * distance), angle)
+            boxes.append(self._order_points(cv2.boxPoints(expanded)))
+        return boxes
+
+    def detect(self, image: np.ndarray) -> List[np.ndarray]:
+        """
+        Detect text lines
+
+        Args:
+            image: Input image as numpy array
+
+        Returns:
+            List of 4x2 box corner arrays in image coordinates
+        """
+        image = self._to_bgr(image)
+        tensor, scale_x, scale_y = self._detector_input(image)
+        probs = self.det_session.run(None, {self.det_input: tensor})[0][0, 0]
+
+        height, width = image.shape[:2]
+        boxes = []
+        for box in self._boxes_from_mask(probs):
+            box[:, 0] = np.clip(box[:, 0] * scale_x, 0, width - 1)
+            box[:, 1] = np.clip(box[:, 1] * scale_y, 0, height - 1)
+            boxes.append(box)
+        return boxes
+
+    def _recognizer_input(self, crops: List[np.ndarray]) -> np.ndarray:
+        """Resize crops to the recognizer height and right-pad to a common width"""
+        widths = [
+            max(1, int(np.ceil(self.rec_height * crop.shape[1] / max(crop.shape[0], 1))))
+            for crop in crops
+        ]
+        max_width = max(widths)
+
+        batch = np.zeros((len(crops), 3, self.rec_height, max_width), dtype=np.float32)
+        for idx, (crop, width) in enumerate(zip(crops, widths)):
+            resized = cv2.resize(self._to_bgr(crop), (width, self.rec_height)).astype(np.float32)
+            batch[idx, :, :, :width] = ((resized / 255.0 - 0.5) / 0.5).transpose(2, 0, 1)
+        return batch
+
+    def recognize(
+        self,
+        crops: List[np.ndarray],
+        batch_size: int = 8,
+        allowlist: Optional[str] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        Recognize text line crops
+
+        Crops are sorted by aspect ratio before batching so each batch pads
+        as little as possible.
+
+        Args:
+            crops: Text line crops
+            batch_size: Crops per recognizer run
+            allowlist: Characters the decoder may emit, or None for the full charset
+
+        Returns:
+            List of (text, confidence) per crop, in input order
+        """
+        mask = charset_mask(self.charset, allowlist) if allowlist else None
+        order = sorted(range(len(crops)), key=lambda i: crops[i].shape[1] / max(crops[i].shape[0], 1))
+        results: List[Optional[Tuple[str, float]]] = [None] * len(crops)
+
+        for start in range(0, len(order), max(1, batch_size)):
+            indices = order[start:start + batch_size]
+            batch = self._recognizer_input([crops[i] for i in indices])
+            probs = self.rec_session.run(None, {self.rec_input: batch})[0]
+            for i, decoded in zip(indices, ctc_greedy_decode(probs, self.charset, mask)):
+                results[i] = decoded
+        return results
@@ -0,0 +1,196 @@
+"""
+CPU-bound pipeline stages executed inside OCR worker pool workers
+
+Every job takes the worker's engine as its first argument (None for jobs that
+do not need one) and must stay a module-level function so it can be pickled
+for the process pool.
+"""
+import time
+import cv2
+import numpy as np
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.services.bank_classifier import decode_thumbnail_source, get_bank_classifier
+from app.services.slip_templates import get_template_registry, read_template
+from app.utils.image_preprocessing import ImagePreprocessor
+from app.utils.data_extraction import DataExtractor
+from app.utils.layout import decode_qr
+from app.utils.qr_payload import parse_slip_qr
+
+
+def prepare_image(
+    engine: Any,
+    image_data: bytes,
+    preprocess: bool = True,
+    profile: Optional[str] = None,
+    steps: Optional[List[str]] = None
+) -> Tuple[np.ndarray, Dict[str, Any]]:
+    """
+    Decode and optionally preprocess an image
+
+    Args:
+        engine: Unused, present for the worker job signature
+        image_data: Image bytes
+        preprocess: Whether to preprocess image
+        profile: Preprocessing profile (OCR_PREPROCESS_PROFILE if None)
+        steps: Preprocessing steps overriding the profile
+
+    Returns:
+        Tuple of the image as numpy array, rotated upright when
+        OCR_ORIENTATION_CHECK is on and within the resolution limits, and the
+        preprocessing path taken (decode mode, orientation, profile, scale,
+        denoise method, estimated noise sigma, skew, per-step time and
+        memory, time)
+    """
+    start_time = time.time()
+    report: Dict[str, Any] = {}
+    # Decode straight to grayscale when the first preprocessing step would convert anyway
+    grayscale = preprocess and ImagePreprocessor.grayscale_input(profile, steps)
+    image = ImagePreprocessor.decode(image_data, grayscale, report)
+    if image is None:
+        raise ValueError("Failed to decode image")
+
+    if settings.OCR_ORIENTATION_CHECK:
+        image = ImagePreprocessor.correct_orientation(image, report)
+    if preprocess:
+        image = ImagePreprocessor.preprocess_image(image, report, profile, steps)
+    else:
+        image = ImagePreprocessor.limit_resolution(image, report)
+    report["processing_time"] = round(time.time() - start_time, 4)
+    return image, report
+
+
+def read_slip_qr(engine: Any, image_data: bytes) -> Optional[Dict[str, Any]]:
+    """
+    Decode and parse the slip's QR code
+
+    Args:
+        engine: Unused, present for the worker job signature
+        image_data: Image bytes
+
+    Returns:
+        Parsed payload (see parse_slip_qr) plus the raw ``payload`` and the
+        decode time, or None if there is no QR code in a known slip format
+    """
+    start_time = time.time()
+    image = cv2.imdecode(np.frombuffer(image_data, np.uint8), cv2.IMREAD_GRAYSCALE)
+    if image is None:
+        return None
+
+    payload = decode_qr(image)
+    parsed = parse_slip_qr(payload) if payload else None
+    if parsed is None:
+        return None
+
+    parsed["payload"] = payload
+    parsed["processing_time"] = time.time() - start_time
+    return parsed
+
+
+def classify_slip(engine: Any, image_data: bytes) -> Optional[Dict[str, Any]]:
+    """
+    Predict bank and layout from a reduced-resolution decode of the slip
+
+    Args:
+        engine: Unused, present for the worker job signature
+        image_data: Image bytes
+
+    Returns:
+        Dictionary with bank, layout, confidence and similarity, or None if
+        the image cannot be decoded or no prototypes are configured
+    """
+    thumbnail = decode_thumbnail_source(image_data)
+    if thumbnail is None:
+        return None
+    prediction = get_bank_classifier().classify(thumbnail)
+    return prediction.to_dict() if prediction else None
+
+
+def run_template_ocr(
+    engine: Any,
+    image_data: bytes,
+    bank: Optional[str] = None,
+    layout: Optional[str] = None,
+    known_fields: Optional[List[str]] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Read only the field regions of a slip that matches a bank layout template
+
+    Args:
+        engine: OCR engine checked out by the worker
+        image_data: Image bytes (templates are matched on the original colours)
+        bank: Bank code predicted before OCR, restricting the templates tried
+        layout: Layout version predicted before OCR
+        known_fields: Extracted fields already supplied (e.g. by the QR code),
+            whose regions are not read
+
+    Returns:
+        OCR result dictionary with the extracted fields, or None when no
+        template matches confidently and the full pipeline must run
+    """
+    start_time = time.time()
+    image = ImagePreprocessor._to_numpy(image_data)
+    if image is None:
+        return None
+    if settings.OCR_ORIENTATION_CHECK:
+        image = ImagePreprocessor.correct_orientation(image)
+
+    matched = get_template_registry().match(image, bank, layout)
+    if matched is None:
+        return None
+
+    template, score = matched
+    result = read_template(engine, image, template, known_fields)
+    if result is not None:
+        result["template_score"] = score
+        result["processing_time"] = time.time() - start_time
+    return result
+
+
+def has_required_fields(text: str) -> bool:
+    """
+    Check that the cascade's required fields can be extracted from OCR text
+
+    Args:
+        text: Recognized text
+
+    Returns:
+        True if every field in OCR_CASCADE_REQUIRED_FIELDS was extracted
+    """
+    extracted = DataExtractor.extract_all(text)
+    return all(extracted.get(field) for field in settings.OCR_CASCADE_REQUIRED_FIELDS)
+
+
+def run_ocr(engine: Any, image: np.ndarray, ocr_engine: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Run OCR on a prepared image
+
+    Args:
+        engine: OCR engine checked out by the worker
+        image: Prepared image
+        ocr_engine: Specific OCR engine to use
+
+    Returns:
+        Dictionary with text, confidence, and engine used
+    """
+    return engine.process(image, engine=ocr_engine, accept=has_required_fields)
+
+
+def run_batch_ocr(
+    engine: Any,
+    images: List[np.ndarray],
+    ocr_engine: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Run batched OCR on several prepared images
+
+    Args:
+        engine: OCR engine checked out by the worker
+        images: Prepared images
+        ocr_engine: Specific OCR engine to use
+
+    Returns:
+        One result dictionary per image, in input order
+    """
+    return engine.process_batch(images, engine=ocr_engine, accept=has_required_fields)
@@ -1,5 +1,7 @@
+import asyncio
+import threading
 import uuid
-from typing import Optional
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 from loguru import logger
 import time
@@ -12,18 +14,81 @@ from app.models.schemas import (
 )
 from app.services.ocr_service import get_ocr_engine
 from app.services.redis_service import get_redis_service
-from app.utils.image_preprocessing import ImagePreprocessor
-from app.utils.data_extraction import DataExtractor
+from app.services.worker_pool import OCRWorkerPool
+from app.services.batch_scheduler import MicroBatchScheduler
+from app.services.pipeline import (
+    classify_slip,
+    prepare_image,
+    read_slip_qr,
+    run_ocr,
+    run_batch_ocr,
+    run_template_ocr
+)
+from app.utils.data_extraction import DataExtractor, ThaiSlipPatterns
+from app.utils.qr_payload import cross_check, trusted_fields
+from app.utils.rolling_stats import RollingWindow
 from app.core.config import settings
 
 
+class PreprocessStats:
+    """Rolling time and memory of each preprocessing step over recent jobs"""
+    
+    def __init__(self, window: int = 500):
+        """
+        Initialize statistics
+        
+        Args:
+            window: Number of recent runs of each step to keep
+        """
+        self.window = window
+        self._lock = threading.Lock()
+        self._steps: Dict[str, Dict[str, RollingWindow]] = {}
+        self.profiles: Dict[str, int] = {}
+    
+    def record(self, preprocessing: Optional[Dict[str, Any]]):
+        """Record the steps of one job's preprocessing report"""
+        if not preprocessing or "steps" not in preprocessing:
+            return
+        with self._lock:
+            profile = preprocessing.get("profile")
+            self.profiles[profile] = self.profiles.get(profile, 0) + 1
+            for timing in preprocessing["steps"]:
+                windows = self._steps.setdefault(timing["step"], {
+                    "ms": RollingWindow(self.window),
+                    "bytes": RollingWindow(self.window),
+                    "peak_bytes": RollingWindow(self.window)
+                })
+                for key, window in windows.items():
+                    if key in timing:
+                        window.add(timing[key])
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get per-step statistics"""
+        with self._lock:
+            steps = {
+                step: {key: window.summary() for key, window in windows.items() if len(window)}
+                for step, windows in self._steps.items()
+            }
+            return {
+                "profile": settings.OCR_PREPROCESS_PROFILE,
+                "jobs_by_profile": dict(self.profiles),
+                "steps": steps
+            }
+
+
+preprocess_stats = PreprocessStats()
+
+
 class ProcessingService:
     """Main processing service for OCR and data extraction"""
     
     def __init__(self):
-        self.ocr_engine = get_ocr_engine()
+        # Only thread workers use an engine of this process; pool processes
+        # and the model server load their own
+        self.ocr_engine = get_ocr_engine() if settings.OCR_WORKER_MODE == "thread" else None
         self.redis = get_redis_service()
-        self.preprocessor = ImagePreprocessor()
+        self.worker_pool = OCRWorkerPool(seed_engine=self.ocr_engine)
+        self.scheduler = MicroBatchScheduler(self.worker_pool)
     
     def generate_job_id(self) -> str:
         """Generate unique job ID"""
@@ -34,7 +99,9 @@ class ProcessingService:
         image_data: bytes,
         job_id: Optional[str] = None,
         preprocess: bool = True,
-        ocr_engine: Optional[str] = None
+        ocr_engine: Optional[str] = None,
+        preprocess_profile: Optional[str] = None,
+        preprocess_steps: Optional[List[str]] = None
     ) -> OcrResult:
         """
         Process image with OCR and data extraction
@@ -44,6 +111,8 @@ class ProcessingService:
             job_id: Job ID (generated if not provided)
             preprocess: Whether to preprocess image
             ocr_engine: Specific OCR engine to use
+            preprocess_profile: Preprocessing profile (OCR_PREPROCESS_PROFILE if None)
+            preprocess_steps: Preprocessing steps overriding the profile
             
         Returns:
             OcrResult object
@@ -65,69 +134,314 @@ class ProcessingService:
         self._save_result(result)
         
         try:
-            # Preprocess image
-            if preprocess:
-                logger.info(f"Preprocessing image for job {job_id}")
-                image = self.preprocessor.preprocess_image(image_data)
-            else:
-                image = self.preprocessor._to_numpy(image_data)
-            
-            # Perform OCR
-            logger.info(f"Performing OCR for job {job_id}")
-            ocr_result = self.ocr_engine.process(image, engine=ocr_engine)
+            # Bank and layout from a thumbnail, before any expensive work
+            classification = await self._classify(image_data)
             
-            raw_text = ocr_result["text"]
-            confidence = ocr_result["confidence"]
-            engine_used = ocr_result["engine"]
+            # The slip's QR code may already carry every required field;
+            # otherwise slips matching a bank layout template only have their
+            # field regions recognized
+            qr = await self._read_qr(image_data)
+            ocr_result = await self._fast_path(image_data, ocr_engine, classification, qr)
             
-            if not raw_text:
-                raise ValueError("No text extracted from image")
+            if ocr_result is None:
+                # Decode and preprocess image in the worker pool
+                if preprocess:
+                    logger.info(f"Preprocessing image for job {job_id}")
+                image, preprocessing = await self.worker_pool.run(
+                    prepare_image, image_data, preprocess, preprocess_profile, preprocess_steps,
+                    with_engine=False
+                )
+                
+                # Perform OCR on a worker-owned engine, micro-batched with
+                # concurrent requests when enabled
+                logger.info(f"Performing OCR for job {job_id}")
+                if settings.OCR_MICRO_BATCH_ENABLED:
+                    ocr_result = await self.scheduler.submit(image, ocr_engine)
+                else:
+                    ocr_result = await self.worker_pool.run(run_ocr, image, ocr_engine)
+                ocr_result = {**ocr_result, "preprocessing": preprocessing}
+                
+                if self._should_escalate_preprocessing(ocr_result, ocr_engine):
+                    ocr_result = await self._escalate_preprocessing(
+                        image_data, preprocess, ocr_result, preprocess_profile, preprocess_steps
+                    )
             
-            # Extract structured data
-            logger.info(f"Extracting data for job {job_id}")
-            extracted = DataExtractor.extract_all(raw_text)
+            self._complete_result(result, ocr_result, start_time, classification, qr)
             
-            # Create extracted data model
-            bank = None
-            if extracted.get("bank"):
-                bank = BankInfo(**extracted["bank"])
+        except Exception as e:
+            self._fail_result(result, e, start_time)
+        
+        # Save final result to Redis
+        self._save_result(result)
+        
+        return result
+    
+    async def _classify(self, image_data: bytes) -> Optional[dict]:
+        """
+        Predict bank and layout with the thumbnail classifier
+        
+        Args:
+            image_data: Image bytes
             
-            extracted_data = ExtractedData(
-                amount=extracted.get("amount"),
-                transaction_date=extracted.get("transaction_date"),
-                transaction_time=extracted.get("transaction_time"),
-                reference_number=extracted.get("reference_number"),
-                bank=bank,
-                sender_account=extracted.get("sender_account"),
-                receiver_account=extracted.get("receiver_account"),
-                sender_name=extracted.get("sender_name"),
-                receiver_name=extracted.get("receiver_name")
-            )
+        Returns:
+            Prediction with bank, layout and confidence, or None when the
+            classifier is disabled or fails
+        """
+        if not settings.OCR_CLASSIFIER_ENABLED:
+            return None
+        try:
+            return await self.worker_pool.run(classify_slip, image_data, with_engine=False)
+        except Exception as e:
+            logger.warning(f"Bank classification failed: {e}")
+            return None
+    
+    async def _read_qr(self, image_data: bytes) -> Optional[dict]:
+        """
+        Decode the slip's QR code
+        
+        Args:
+            image_data: Image bytes
             
-            # Update result
-            processing_time = time.time() - start_time
-            result.status = ProcessingStatus.COMPLETED
-            result.raw_text = raw_text
-            result.extracted_data = extracted_data
-            result.confidence = confidence
-            result.ocr_engine = engine_used
-            result.processing_time = processing_time
-            result.updated_at = datetime.utcnow()
+        Returns:
+            Parsed QR payload with a valid CRC, or None when the QR path is
+            disabled or the slip has no usable QR code
+        """
+        if not settings.OCR_QR_ENABLED:
+            return None
+        try:
+            qr = await self.worker_pool.run(read_slip_qr, image_data, with_engine=False)
+        except Exception as e:
+            logger.warning(f"QR decoding failed: {e}")
+            return None
+        if qr is not None and not qr["crc_valid"]:
+            logger.warning(f"Ignoring {qr['kind']} QR code with an invalid CRC")
+            return None
+        return qr
+    
+    @staticmethod
+    def _qr_result(qr: Optional[dict]) -> Optional[dict]:
+        """
+        Build an OCR result from the QR code alone
+        
+        Args:
+            qr: Parsed QR payload
             
-            logger.info(f"Job {job_id} completed successfully in {processing_time:.2f}s")
+        Returns:
+            Result carrying the QR fields if the QR code proves a transfer
+            (see trusted_fields) and includes every field in
+            OCR_CASCADE_REQUIRED_FIELDS, else None so OCR reads the rest
+        """
+        if qr is None:
+            return None
+        fields = trusted_fields(qr)
+        if not fields or any(name not in fields for name in settings.OCR_CASCADE_REQUIRED_FIELDS):
+            return None
+        logger.info(f"{qr['kind']} QR code supplies all required fields, skipping OCR")
+        return {
+            "text": qr["payload"],
+            "confidence": 1.0,
+            "engine": "qr",
+            "fields": fields,
+            "processing_time": qr.get("processing_time", 0.0)
+        }
+    
+    @staticmethod
+    def _is_confident(classification: Optional[dict]) -> bool:
+        return bool(classification) and classification["confidence"] >= settings.OCR_CLASSIFIER_MIN_CONFIDENCE
+    
+    async def _match_template(
+        self,
+        image_data: bytes,
+        ocr_engine: Optional[str],
+        classification: Optional[dict] = None,
+        qr: Optional[dict] = None
+    ) -> Optional[dict]:
+        """
+        Try the template fast path
+        
+        Args:
+            image_data: Image bytes
+            ocr_engine: Specific OCR engine requested; disables templates
+            classification: Bank classifier prediction; when confident, only
+                the predicted bank's templates are tried
+            qr: Parsed QR payload; regions of the fields it supplies are not read
             
+        Returns:
+            OCR result from the template's field regions, or None to run the
+            full pipeline
+        """
+        if not settings.OCR_TEMPLATES_ENABLED or ocr_engine is not None:
+            return None
+        bank, layout = (
+            (classification["bank"], classification["layout"])
+            if self._is_confident(classification) else (None, None)
+        )
+        try:
+            known_fields = list(trusted_fields(qr)) if qr else None
+            ocr_result = await self.worker_pool.run(run_template_ocr, image_data, bank, layout, known_fields)
         except Exception as e:
-            logger.error(f"Job {job_id} failed: {e}")
-            processing_time = time.time() - start_time
-            result.status = ProcessingStatus.FAILED
-            result.error_message = str(e)
-            result.processing_time = processing_time
-            result.updated_at = datetime.utcnow()
+            logger.warning(f"Template matching failed: {e}")
+            return None
+        if ocr_result is not None:
+            logger.info(f"Matched slip template {ocr_result['template']} (score {ocr_result['template_score']:.2f})")
+        return ocr_result
+    
+    async def _fast_path(
+        self,
+        image_data: bytes,
+        ocr_engine: Optional[str],
+        classification: Optional[dict],
+        qr: Optional[dict]
+    ) -> Optional[dict]:
+        """QR-only result if the QR code is sufficient, else the template fast path"""
+        return self._qr_result(qr) or await self._match_template(image_data, ocr_engine, classification, qr)
+    
+    def _should_escalate_preprocessing(self, ocr_result: dict, ocr_engine: Optional[str]) -> bool:
+        """Check whether the cascade should retry with the other preprocessing setting"""
+        return (
+            settings.OCR_CASCADE_ENABLED
+            and settings.OCR_CASCADE_PREPROCESS_STAGE
+            and ocr_engine is None
+            and not ocr_result.get("accepted", True)
+        )
+    
+    async def _escalate_preprocessing(
+        self,
+        image_data: bytes,
+        preprocess: bool,
+        ocr_result: dict,
+        preprocess_profile: Optional[str] = None,
+        preprocess_steps: Optional[List[str]] = None
+    ) -> dict:
+        """
+        Final cascade stage: rerun the engine cascade with preprocessing toggled
         
-        # Save final result to Redis
-        self._save_result(result)
+        Args:
+            image_data: Image bytes
+            preprocess: Preprocessing setting of the rejected attempt
+            ocr_result: Rejected OCR result
+            preprocess_profile: Preprocessing profile of the request
+            preprocess_steps: Preprocessing steps of the request
+            
+        Returns:
+            The escalated result if it is accepted or more confident, else ocr_result
+        """
+        suffix = "+preprocess" if not preprocess else "+raw"
+        logger.info(f"Cascade escalating to {suffix.lstrip('+')} image")
         
-        return result
+        image, preprocessing = await self.worker_pool.run(
+            prepare_image, image_data, not preprocess, preprocess_profile, preprocess_steps,
+            with_engine=False
+        )
+        escalated = await self.worker_pool.run(run_ocr, image, None)
+        escalated["preprocessing"] = preprocessing
+        
+        if escalated.get("cascade_stage"):
+            escalated["cascade_stage"] += suffix
+        escalated["processing_time"] = escalated.get("processing_time", 0.0) + ocr_result.get("processing_time", 0.0)
+        
+        if escalated.get("accepted") or escalated["confidence"] > ocr_result["confidence"]:
+            return escalated
+        return ocr_result
+    
+    def _complete_result(
+        self,
+        result: OcrResult,
+        ocr_result: dict,
+        start_time: float,
+        classification: Optional[dict] = None,
+        qr: Optional[dict] = None
+    ):
+        """Extract structured data from an OCR result and mark the job completed"""
+        raw_text = ocr_result["text"]
+        confidence = ocr_result["confidence"]
+        engine_used = ocr_result["engine"]
+        
+        if not raw_text:
+            raise ValueError("No text extracted from image")
+        
+        # Extract structured data; template reads already carry their fields
+        logger.info(f"Extracting data for job {result.job_id}")
+        extracted = dict(ocr_result.get("fields") or DataExtractor.extract_all(raw_text))
+        
+        # The bank named in the text wins; a confident thumbnail classification
+        # only fills it in when the text names none
+        bank_source = "text" if extracted.get("bank") else None
+        bank_agrees = None
+        if self._is_confident(classification):
+            predicted = ThaiSlipPatterns.bank_by_code(classification["bank"])
+            if predicted and extracted.get("bank"):
+                bank_agrees = predicted["code"] == extracted["bank"]["code"]
+                if not bank_agrees:
+                    logger.warning(
+                        f"Classifier predicted {predicted['code']} but the text names "
+                        f"{extracted['bank']['code']} for job {result.job_id}"
+                    )
+            elif predicted:
+                extracted["bank"] = predicted
+                bank_source = "classifier"
+        
+        # Slip verification QR fields are CRC-checked, so they override anything
+        # read from pixels; payment-request QR fields are only compared with OCR
+        qr_fields, qr_check = {}, None
+        if qr is not None:
+            qr_fields = trusted_fields(qr)
+            if qr_fields:
+                extracted.update(qr_fields)
+                if "bank" in qr_fields:
+                    bank_source = "qr"
+            else:
+                qr_check = cross_check(qr, extracted)
+                if not all(qr_check.values()):
+                    logger.warning(f"{qr['kind']} QR code disagrees with OCR for job {result.job_id}: {qr_check}")
+        
+        # Create extracted data model
+        bank = None
+        if extracted.get("bank"):
+            bank = BankInfo(**extracted["bank"])
+        
+        extracted_data = ExtractedData(
+            amount=extracted.get("amount"),
+            transaction_date=extracted.get("transaction_date"),
+            transaction_time=extracted.get("transaction_time"),
+            reference_number=extracted.get("reference_number"),
+            bank=bank,
+            sender_account=extracted.get("sender_account"),
+            receiver_account=extracted.get("receiver_account"),
+            sender_name=extracted.get("sender_name"),
+            receiver_name=extracted.get("receiver_name")
+        )
+        
+        # Update result
+        processing_time = time.time() - start_time
+        result.status = ProcessingStatus.COMPLETED
+        result.raw_text = raw_text
+        result.extracted_data = extracted_data
+        result.confidence = confidence
+        result.ocr_engine = engine_used
+        result.cascade_stage = ocr_result.get("cascade_stage")
+        result.template = ocr_result.get("template")
+        result.classification = (
+            {**classification, "bank_source": bank_source, "bank_agrees": bank_agrees}
+            if classification else None
+        )
+        result.qr_used = bool(qr_fields)
+        result.qr_kind = qr["kind"] if qr else None
+        result.qr_check = qr_check
+        result.preprocessing = ocr_result.get("preprocessing")
+        preprocess_stats.record(result.preprocessing)
+        result.processing_time = processing_time
+        result.updated_at = datetime.utcnow()
+        
+        logger.info(f"Job {result.job_id} completed successfully in {processing_time:.2f}s")
+    
+    def _fail_result(self, result: OcrResult, error: Exception, start_time: float):
+        """Mark the job failed"""
+        logger.error(f"Job {result.job_id} failed: {error}")
+        result.status = ProcessingStatus.FAILED
+        result.error_message = str(error)
+        result.processing_time = time.time() - start_time
+        result.updated_at = datetime.utcnow()
     
     def get_result(self, job_id: str) -> Optional[OcrResult]:
         """
@@ -160,45 +474,103 @@ class ProcessingService:
         images: list[bytes],
         batch_id: str,
         preprocess: bool = True,
-        ocr_engine: Optional[str] = None
+        ocr_engine: Optional[str] = None,
+        preprocess_profile: Optional[str] = None,
+        preprocess_steps: Optional[List[str]] = None
     ) -> list[OcrResult]:
         """
-        Process multiple images
+        Process multiple images with batched OCR inference
+        
+        Images are decoded and preprocessed concurrently across the worker
+        pool, then recognized together in a single batched engine call.
         
         Args:
             images: List of image bytes
             batch_id: Batch ID
             preprocess: Whether to preprocess images
             ocr_engine: Specific OCR engine to use
+            preprocess_profile: Preprocessing profile (OCR_PREPROCESS_PROFILE if None)
+            preprocess_steps: Preprocessing steps overriding the profile
             
         Returns:
             List of OcrResult objects
         """
+        start_time = time.time()
+        logger.info(f"Processing {len(images)} images in batch {batch_id}")
+        
         results = []
+        for idx in range(len(images)):
+            result = OcrResult(
+                job_id=f"{batch_id}_{idx}",
+                status=ProcessingStatus.PROCESSING,
+                created_at=datetime.utcnow(),
+                updated_at=datetime.utcnow()
+            )
+            self._save_result(result)
+            results.append(result)
         
-        for idx, image_data in enumerate(images):
-            job_id = f"{batch_id}_{idx}"
-            logger.info(f"Processing image {idx+1}/{len(images)} in batch {batch_id}")
-            
+        # Classifier, QR and template fast paths first; slips they cover skip
+        # the full pipeline
+        classifications = await asyncio.gather(*[self._classify(image_data) for image_data in images])
+        qrs = await asyncio.gather(*[self._read_qr(image_data) for image_data in images])
+        templated = await asyncio.gather(
+            *[
+                self._fast_path(image_data, ocr_engine, classification, qr)
+                for image_data, classification, qr in zip(images, classifications, qrs)
+            ]
+        )
+        for idx, ocr_result in enumerate(templated):
+            if ocr_result is not None:
+                try:
+                    self._complete_result(results[idx], ocr_result, start_time, classifications[idx], qrs[idx])
+                except Exception as e:
+                    self._fail_result(results[idx], e, start_time)
+        
+        # Decode and preprocess the other images concurrently
+        pending = [idx for idx, ocr_result in enumerate(templated) if ocr_result is None]
+        prepared = dict(zip(pending, await asyncio.gather(
+            *[
+                self.worker_pool.run(
+                    prepare_image, images[idx], preprocess, preprocess_profile, preprocess_steps,
+                    with_engine=False
+                )
+                for idx in pending
+            ],
+            return_exceptions=True
+        )))
+        
+        ready = []
+        for idx, outcome in prepared.items():
+            if isinstance(outcome, Exception):
+                logger.error(f"Failed to process image {idx+1} in batch {batch_id}: {outcome}")
+                self._fail_result(results[idx], outcome, start_time)
+            else:
+                ready.append(idx)
+        
+        # Recognize all decoded images in one batched call
+        if ready:
             try:
-                result = await self.process_image(
-                    image_data=image_data,
-                    job_id=job_id,
-                    preprocess=preprocess,
-                    ocr_engine=ocr_engine
+                ocr_results = await self.worker_pool.run(
+                    run_batch_ocr, [prepared[idx][0] for idx in ready], ocr_engine
                 )
-                results.append(result)
             except Exception as e:
-                logger.error(f"Failed to process image {idx+1} in batch {batch_id}: {e}")
-                # Create failed result
-                result = OcrResult(
-                    job_id=job_id,
-                    status=ProcessingStatus.FAILED,
-                    error_message=str(e),
-                    created_at=datetime.utcnow(),
-                    updated_at=datetime.utcnow()
-                )
-                results.append(result)
+                ocr_results = [e] * len(ready)
+            
+            for idx, ocr_result in zip(ready, ocr_results):
+                try:
+                    if isinstance(ocr_result, Exception):
+                        raise ocr_result
+                    ocr_result = {**ocr_result, "preprocessing": prepared[idx][1]}
+                    if self._should_escalate_preprocessing(ocr_result, ocr_engine):
+                        ocr_result = await self._escalate_preprocessing(
+                            images[idx], preprocess, ocr_result, preprocess_profile, preprocess_steps
+                        )
+                    self._complete_result(results[idx], ocr_result, start_time, classifications[idx], qrs[idx])
+                except Exception as e:
+                    self._fail_result(results[idx], e, start_time)
+        
+        for result in results:
+            self._save_result(result)
         
         return results
 
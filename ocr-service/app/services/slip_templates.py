@@ -0,0 +1,315 @@
+"""
+Per-bank slip layout templates
+
+Each bank's mobile app renders its transfer slip with a fixed layout. A
+template stores, for one bank and layout version, where each field sits as
+fractions of the slip's width and height. When a slip matches a template
+confidently, only the field crops are recognized; otherwise the caller falls
+back to the full pipeline.
+
+Templates are JSON files in OCR_TEMPLATE_DIR, one per bank and layout version:
+
+    {
+        "bank": "KBANK",
+        "version": "2023",
+        "aspect_ratio": 2.0,
+        "header_color": "#00A950",
+        "anchors": [{"region": [0.05, 0.02, 0.6, 0.08], "keywords": ["kasikorn", "k plus"]}],
+        "regions": {"amount": [0.45, 0.55, 0.95, 0.61], "date": [...], ...}
+    }
+
+``aspect_ratio`` is height / width, ``header_color`` the mean colour of the
+top HEADER_FRACTION of the slip and every region is [x0, y0, x1, y1]. Anchors
+are optional text checks that confirm the match before fields are read.
+"""
+import glob
+import json
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+
+from app.core.config import settings
+from app.utils.data_extraction import ThaiSlipPatterns
+
+
+# Top share of the slip whose mean colour identifies the bank's header band
+HEADER_FRACTION = 0.1
+
+# Relative aspect ratio difference at which the layout score drops to zero
+ASPECT_TOLERANCE = 0.15
+
+# Colour distance (0-255 per channel) at which the header score drops to zero
+COLOR_TOLERANCE = 120.0
+
+# Allowlist (FIELD_CHARSETS key) of each template region
+REGION_CHARSETS = {
+    "amount": "amount",
+    "date": "date",
+    "time": "time",
+    "reference": "reference",
+    "sender_account": "account",
+    "receiver_account": "account"
+}
+
+
+def _parse_color(value: str) -> np.ndarray:
+    """Convert "#RRGGBB" to a BGR float array"""
+    value = value.lstrip("#")
+    r, g, b = (int(value[i:i + 2], 16) for i in (0, 2, 4))
+    return np.array([b, g, r], dtype=np.float32)
+
+
+@dataclass
+class SlipTemplate:
+    """Field layout of one bank's slip in one layout version"""
+    bank: str
+    version: str
+    aspect_ratio: float
+    header_color: np.ndarray
+    regions: Dict[str, List[float]]
+    anchors: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def name(self) -> str:
+        return f"{self.bank}/{self.version}"
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SlipTemplate":
+        """
+        Build a template from its JSON representation
+
+        Raises:
+            ValueError: If a region is not [x0, y0, x1, y1] within 0-1, or a
+                region has no known field name
+        """
+        regions = data["regions"]
+        anchors = data.get("anchors", [])
+        unknown = set(regions) - set(REGION_CHARSETS)
+        if unknown:
+            raise ValueError(f"Unknown template regions: {sorted(unknown)}")
+        for region in list(regions.values()) + [anchor["region"] for anchor in anchors]:
+            x0, y0, x1, y1 = region
+            if not (0 <= x0 < x1 <= 1 and 0 <= y0 < y1 <= 1):
+                raise ValueError(f"Region {region} must be [x0, y0, x1, y1] within 0-1")
+
+        return cls(
+            bank=data["bank"],
+            version=str(data["version"]),
+            aspect_ratio=float(data["aspect_ratio"]),
+            header_color=_parse_color(data["header_color"]),
+            regions=regions,
+            anchors=anchors
+        )
+
+
+def crop_region(image: np.ndarray, region: List[float]) -> np.ndarray:
+    """
+    Crop a normalized [x0, y0, x1, y1] region from an image
+
+    Args:
+        image: Slip image
+        region: Region as fractions of the image width and height
+
+    Returns:
+        Cropped image
+    """
+    height, width = image.shape[:2]
+    x0, y0, x1, y1 = region
+    return image[int(y0 * height):max(int(y1 * height), int(y0 * height) + 1),
+                 int(x0 * width):max(int(x1 * width), int(x0 * width) + 1)]
+
+
+def header_color(image: np.ndarray) -> np.ndarray:
+    """Mean BGR colour of the slip's header band"""
+    band = image[:max(1, int(image.shape[0] * HEADER_FRACTION))]
+    if band.ndim == 2:
+        return np.repeat(band.mean(), 3).astype(np.float32)
+    return band.reshape(-1, band.shape[2])[:, :3].mean(axis=0).astype(np.float32)
+
+
+class TemplateRegistry:
+    """Slip templates loaded from JSON files"""
+
+    def __init__(self, directory: Optional[str] = None):
+        """
+        Initialize registry
+
+        Args:
+            directory: Template directory (defaults to OCR_TEMPLATE_DIR)
+        """
+        self.directory = directory or settings.OCR_TEMPLATE_DIR
+        self.templates: List[SlipTemplate] = []
+        self.load()
+
+    def load(self):
+        """(Re)load every *.json template in the directory, skipping invalid files"""
+        templates = []
+        for path in sorted(glob.glob(os.path.join(self.directory, "*.json"))):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    templates.append(SlipTemplate.from_dict(json.load(f)))
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                logger.error(f"Invalid slip template {path}: {e}")
+        self.templates = templates
+        logger.info(f"Loaded {len(templates)} slip templates from {self.directory}")
+
+    @staticmethod
+    def score(template: SlipTemplate, image: np.ndarray) -> float:
+        """
+        Score how well an image's layout fits a template, without OCR
+
+        Args:
+            template: Slip template
+            image: Decoded slip image
+
+        Returns:
+            Score from 0 (no match) to 1, the product of the aspect ratio and
+            header colour similarities
+        """
+        height, width = image.shape[:2]
+        aspect = height / max(width, 1)
+        aspect_score = 1 - abs(aspect - template.aspect_ratio) / (template.aspect_ratio * ASPECT_TOLERANCE)
+
+        if image.ndim == 2:
+            # Grayscale images can only be compared by brightness
+            target = np.repeat(template.header_color @ np.float32([0.114, 0.587, 0.299]), 3)
+        else:
+            target = template.header_color
+        distance = float(np.linalg.norm(header_color(image) - target)) / np.sqrt(3)
+        color_score = 1 - distance / COLOR_TOLERANCE
+
+        return max(0.0, aspect_score) * max(0.0, color_score)
+
+    def match(
+        self,
+        image: np.ndarray,
+        bank: Optional[str] = None,
+        layout: Optional[str] = None
+    ) -> Optional[Tuple[SlipTemplate, float]]:
+        """
+        Find the best matching template
+
+        Args:
+            image: Decoded slip image
+            bank: Bank code already known (e.g. from the bank classifier);
+                only its templates are considered
+            layout: Layout version already known; preferred when it has a template
+
+        Returns:
+            Tuple of (template, score), or None if no template scores at
+            least OCR_TEMPLATE_MIN_SCORE
+        """
+        candidates = [t for t in self.templates if bank is None or t.bank == bank]
+        if layout is not None:
+            candidates = [t for t in candidates if t.version == layout] or candidates
+        scored = [(template, self.score(template, image)) for template in candidates]
+        if not scored:
+            return None
+        template, score = max(scored, key=lambda item: item[1])
+        if score < settings.OCR_TEMPLATE_MIN_SCORE:
+            return None
+        return template, score
+
+
+def _parse_field(name: str, text: str) -> Optional[Any]:
+    """Convert the text of a template region to an extracted value"""
+    text = text.strip()
+    if not text:
+        return None
+    if name == "amount":
+        try:
+            return float(text.replace(",", "").replace(" ", ""))
+        except ValueError:
+            return None
+    if name == "date":
+        return ThaiSlipPatterns.extract_date(text)
+    if name == "time":
+        return ThaiSlipPatterns.extract_time(text)
+    return text.replace(" ", "")
+
+
+# Keys of the template regions in DataExtractor.extract_all output
+EXTRACTED_KEYS = {
+    "amount": "amount",
+    "date": "transaction_date",
+    "time": "transaction_time",
+    "reference": "reference_number",
+    "sender_account": "sender_account",
+    "receiver_account": "receiver_account"
+}
+
+
+def read_template(
+    engine: Any,
+    image: np.ndarray,
+    template: SlipTemplate,
+    known_fields: Optional[List[str]] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Recognize only the field regions of a matched template
+
+    Args:
+        engine: OCREngine instance
+        image: Decoded slip image
+        template: Matched template
+        known_fields: Extracted fields supplied by other means, whose regions
+            are skipped and which count as read
+
+    Returns:
+        OCR result dictionary with text, confidence, engine, template and the
+        extracted fields, or None if an anchor is missing or a field in
+        OCR_CASCADE_REQUIRED_FIELDS could not be read
+    """
+    for anchor in template.anchors:
+        text = engine.recognize(crop_region(image, anchor["region"]))["text"].lower()
+        if not any(keyword.lower() in text for keyword in anchor["keywords"]):
+            logger.info(f"Template {template.name} anchor not found, using the full pipeline")
+            return None
+
+    extracted: Dict[str, Any] = {key: None for key in EXTRACTED_KEYS.values()}
+    extracted.update(bank=ThaiSlipPatterns.bank_by_code(template.bank), sender_name=None, receiver_name=None)
+    lines, confidences, engines = [], [], set()
+    known_fields = known_fields or []
+    for name, region in template.regions.items():
+        if EXTRACTED_KEYS[name] in known_fields:
+            continue
+        result = engine.recognize_field(crop_region(image, region), REGION_CHARSETS[name])
+        extracted[EXTRACTED_KEYS[name]] = _parse_field(name, result["text"])
+        if result["text"]:
+            lines.append(result["text"])
+            confidences.append(result["confidence"])
+            engines.add(result["engine"])
+
+    missing = [
+        name for name in settings.OCR_CASCADE_REQUIRED_FIELDS
+        if not extracted.get(name) and name not in known_fields
+    ]
+    if missing:
+        logger.info(f"Template {template.name} could not read {missing}, using the full pipeline")
+        return None
+
+    return {
+        "text": "\n".join(lines),
+        "confidence": sum(confidences) / len(confidences) if confidences else 0.0,
+        "engine": "+".join(sorted(engines)),
+        "template": template.name,
+        "fields": extracted
+    }
+
+
+# Process-wide registry, loaded on first use
+_template_registry: Optional[TemplateRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_template_registry() -> TemplateRegistry:
+    """Get or create the template registry"""
+    global _template_registry
+    with _registry_lock:
+        if _template_registry is None:
+            _template_registry = TemplateRegistry()
+        return _template_registry
@@ -0,0 +1,221 @@
+"""
+Startup warm-up of the OCR pipeline
+
+Runs the preprocessing pipeline and the primary engine of every OCR worker
+on synthetic slip images at several sizes, so model initialization,
+allocator growth and first-call overheads are paid before the service
+reports ready.
+"""
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import cv2
+import numpy as np
+from loguru import logger
+
+from app.core.config import settings
+from app.services.pipeline import prepare_image
+from app.utils.rolling_stats import unrecorded
+
+
+# Text lines of the synthetic slip, laid out like a mobile banking receipt
+SLIP_LINES = [
+    "Transfer successful",
+    "15 Jan 2024 14:30",
+    "From  KASIKORNBANK",
+    "xxx-x-x1234-x",
+    "To  Bangkok Bank",
+    "xxx-x-x5678-x",
+    "Amount  1,500.00 THB",
+    "Ref No. 202401151430001234",
+]
+
+
+def synthetic_slip(height: int, width: Optional[int] = None) -> bytes:
+    """
+    Render a synthetic slip image
+
+    Args:
+        height: Image height in pixels
+        width: Image width (defaults to a 9:16 phone screenshot)
+
+    Returns:
+        PNG-encoded image bytes
+    """
+    width = width or height * 9 // 16
+    image = np.full((height, width, 3), 255, dtype=np.uint8)
+
+    # Header band, as on most bank apps
+    cv2.rectangle(image, (0, 0), (width, height // 8), (60, 140, 30), -1)
+
+    scale = width / 480
+    line_height = int(44 * scale)
+    y = height // 8 + line_height
+    for line in SLIP_LINES:
+        cv2.putText(
+            image, line, (int(24 * scale), y),
+            cv2.FONT_HERSHEY_SIMPLEX, 0.8 * scale, (20, 20, 20),
+            max(1, int(2 * scale)), cv2.LINE_AA
+        )
+        y += line_height
+
+    _, encoded = cv2.imencode(".png", image)
+    return encoded.tobytes()
+
+
+class WarmupState:
+    """Progress and timings of the startup warm-up"""
+
+    def __init__(self):
+        self.status = "pending"
+        self.started_at: Optional[float] = None
+        self.duration: Optional[float] = None
+        self.stages: Dict[str, float] = {}
+        self.errors: List[str] = []
+        self._done = threading.Event()
+
+    def start(self):
+        """Mark warm-up as running"""
+        self.status = "running"
+        self.started_at = time.time()
+
+    def record(self, stage: str, seconds: float):
+        """Record the duration of a warm-up stage"""
+        self.stages[stage] = seconds
+
+    def finish(self, status: str = "done"):
+        """Mark warm-up as finished; the service reports ready from now on"""
+        self.status = status
+        if self.started_at is not None:
+            self.duration = time.time() - self.started_at
+        self._done.set()
+
+    @property
+    def ready(self) -> bool:
+        """Whether warm-up has finished (or was skipped)"""
+        return self._done.is_set()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get warm-up status and per-stage durations in milliseconds"""
+        return {
+            "status": self.status,
+            "duration_seconds": round(self.duration, 3) if self.duration is not None else None,
+            "stages_ms": {stage: round(seconds * 1000, 1) for stage, seconds in self.stages.items()},
+            "errors": self.errors
+        }
+
+
+# Process-wide warm-up state; inherited by pre-forked workers
+warmup_state = WarmupState()
+
+
+def _fail(state: WarmupState, error: Exception) -> WarmupState:
+    # A failed warm-up must not keep the service unready forever
+    state.errors.append(str(error))
+    state.finish("failed")
+    logger.error(f"Warm-up failed: {error}")
+    return state
+
+
+def _log_finished(state: WarmupState):
+    if state.errors:
+        logger.warning(f"Warm-up finished in {state.duration:.1f}s with errors: {state.errors}")
+    else:
+        logger.info(f"Warm-up finished in {state.duration:.1f}s")
+
+
+def _warm_up(engine: Any, state: WarmupState):
+    # Only the primary engine; the others load when a request first falls back to them
+    for size in settings.OCR_WARMUP_SIZES:
+        started = time.perf_counter()
+        image, _ = prepare_image(None, synthetic_slip(size), True)
+        state.record(f"preprocess_{size}", time.perf_counter() - started)
+
+        for name in engine.engines[:1]:
+            started = time.perf_counter()
+            try:
+                engine.process(image, engine=name)
+            except Exception as e:
+                state.errors.append(f"{name}@{size}: {e}")
+            state.record(f"{name}_{size}", time.perf_counter() - started)
+
+
+def warm_up_engine(engine: Any, state: WarmupState = warmup_state) -> WarmupState:
+    """
+    Warm up preprocessing and the primary engine of an OCREngine in this process
+
+    Warm-up calls are left out of the engine, hedging and cache statistics.
+
+    Args:
+        engine: OCREngine instance
+        state: State to record into
+
+    Returns:
+        The warm-up state
+    """
+    if not settings.OCR_WARMUP_ENABLED:
+        state.finish("skipped")
+        return state
+
+    state.start()
+    try:
+        with unrecorded():
+            _warm_up(engine, state)
+    except Exception as e:
+        return _fail(state, e)
+
+    state.finish()
+    _log_finished(state)
+    return state
+
+
+def warm_up_worker(engine: Any) -> Dict[str, Any]:
+    """
+    Worker pool job warming up the engine of the worker running it
+
+    Args:
+        engine: Engine of the worker
+
+    Returns:
+        Warm-up stats of the worker
+    """
+    if warmup_state.ready:
+        # Model server inference processes warm up when they start
+        return warmup_state.stats()
+    return warm_up_engine(engine, WarmupState()).stats()
+
+
+async def run_warmup(worker_pool: Any, state: WarmupState = warmup_state) -> WarmupState:
+    """
+    Warm up every worker of the OCR worker pool
+
+    One warm-up job runs on each worker at the same time, so every engine
+    instance (thread mode) or pool process (process mode) is warm before the
+    service reports ready. Stage timings are those of the slowest worker.
+    The jobs are not counted in the pool totals.
+
+    Args:
+        worker_pool: OCRWorkerPool instance
+        state: State to record into
+
+    Returns:
+        The warm-up state
+    """
+    if not settings.OCR_WARMUP_ENABLED:
+        state.finish("skipped")
+        return state
+
+    state.start()
+    reports = await worker_pool.run_on_every_worker(warm_up_worker, record=False)
+    for idx, report in enumerate(reports):
+        if isinstance(report, Exception):
+            reports[idx] = report = {"status": "failed", "stages_ms": {}, "errors": [str(report)]}
+        for stage, ms in report["stages_ms"].items():
+            state.record(stage, max(ms / 1000, state.stages.get(stage, 0.0)))
+        state.errors.extend(error for error in report["errors"] if error not in state.errors)
+
+    # The service can serve as long as one worker warmed up
+    state.finish("failed" if all(report["status"] == "failed" for report in reports) else "done")
+    _log_finished(state)
+    return state
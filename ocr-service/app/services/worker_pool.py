@@ -0,0 +1,298 @@
+"""
+Worker pool running OCR jobs off the asyncio event loop, in threads, pool
+processes or the local model server
+"""
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional
+from loguru import logger
+
+from app.core.config import settings
+from app.core.threading_config import configure_threading, split_cpus
+
+
+class EnginePool:
+    """Pool of OCR engine instances, one per concurrently running worker
+
+    PaddleOCR and EasyOCR readers are not thread-safe, so a worker checks out
+    an engine for the duration of a job and returns it afterwards. Engines are
+    created lazily, only when every existing instance is busy.
+    """
+
+    def __init__(self, factory: Callable[[], Any], size: int, seed: Any = None):
+        """
+        Initialize engine pool
+
+        Args:
+            factory: Callable creating a new engine instance
+            size: Maximum number of engine instances
+            seed: Optional already-initialized engine to hand out first
+        """
+        self.factory = factory
+        self.size = max(1, size)
+        self._idle: List[Any] = [seed] if seed is not None else []
+        self._created = len(self._idle)
+        self._cond = threading.Condition()
+
+    @contextmanager
+    def checkout(self):
+        """Borrow an engine instance for the duration of a job"""
+        engine = self._acquire()
+        try:
+            yield engine
+        finally:
+            with self._cond:
+                self._idle.append(engine)
+                self._cond.notify()
+
+    def _acquire(self) -> Any:
+        with self._cond:
+            while not self._idle and self._created >= self.size:
+                self._cond.wait()
+            if self._idle:
+                return self._idle.pop()
+            self._created += 1
+
+        try:
+            engine = self.factory()
+            logger.info(f"Created OCR engine instance {self._created}/{self.size}")
+            return engine
+        except Exception:
+            with self._cond:
+                self._created -= 1
+                self._cond.notify()
+            raise
+
+    @property
+    def created(self) -> int:
+        """Number of engine instances created so far"""
+        return self._created
+
+
+# How long a job run on every worker waits for the other workers to pick theirs up
+EVERY_WORKER_TIMEOUT = 300.0
+
+# Per-process engine used by process pool workers, and the barrier shared by
+# the pool processes for jobs run on every worker
+_process_engine: Any = None
+_process_barrier: Any = None
+
+
+def _init_process_worker(counter, workers: int, barrier):
+    """Pin each pool process to its share of OCR_CPU_AFFINITY and load its OCR engine"""
+    global _process_engine, _process_barrier
+    _process_barrier = barrier
+    with counter.get_lock():
+        index = counter.value
+        counter.value += 1
+    
+    cpus = split_cpus(settings.OCR_CPU_AFFINITY, workers)
+    own = cpus[index % len(cpus)]
+    if own:
+        configure_threading(cpus=own, concurrency=1)
+    else:
+        configure_threading()
+    
+    from app.services.ocr_service import OCREngine
+    _process_engine = OCREngine(languages=settings.OCR_LANGUAGES)
+
+
+def _run_in_process(func: Callable, args: tuple) -> Any:
+    return func(_process_engine, *args)
+
+
+def _run_held(barrier, func: Callable, engine: Any, *args) -> Any:
+    """Run a job, then keep the worker until every worker has picked up its copy"""
+    try:
+        return func(engine, *args)
+    finally:
+        try:
+            barrier.wait(timeout=EVERY_WORKER_TIMEOUT)
+        except threading.BrokenBarrierError:
+            logger.warning("Not every OCR worker picked up its job in time")
+
+
+def _run_held_in_process(func: Callable, engine: Any, *args) -> Any:
+    return _run_held(_process_barrier, func, engine, *args)
+
+
+class OCRWorkerPool:
+    """Bounded pool running CPU-bound OCR work off the asyncio event loop
+
+    Jobs are callables of the form ``func(engine, *args)``. In ``thread`` mode
+    each worker checks out its own engine from an :class:`EnginePool`; in
+    ``process`` mode each pool process owns one engine; in ``remote`` mode
+    engine jobs are sent to the local model server and no engine is loaded in
+    this process. In the last two modes ``func`` must be a picklable
+    module-level function.
+    """
+
+    MODES = ("thread", "process", "remote")
+
+    def __init__(
+        self,
+        engine_factory: Optional[Callable[[], Any]] = None,
+        seed_engine: Any = None,
+        workers: Optional[int] = None,
+        mode: Optional[str] = None
+    ):
+        """
+        Initialize worker pool
+
+        Args:
+            engine_factory: Callable creating an engine for a thread worker
+            seed_engine: Already-initialized engine reused by the first thread worker
+            workers: Number of concurrent workers (defaults to OCR_WORKERS)
+            mode: 'thread', 'process' or 'remote' (defaults to OCR_WORKER_MODE)
+        """
+        self.mode = mode or settings.OCR_WORKER_MODE
+        if self.mode not in self.MODES:
+            raise ValueError(f"Unsupported worker mode: {self.mode}")
+
+        self.workers = max(1, workers or settings.OCR_WORKERS)
+        self.engines: Optional[EnginePool] = None
+        self.client = None
+        self._executor: Optional[Executor] = None
+        self._barrier = None
+
+        if self.mode == "thread":
+            if engine_factory is None:
+                from app.services.ocr_service import OCREngine
+                engine_factory = lambda: OCREngine(languages=settings.OCR_LANGUAGES)
+            self.engines = EnginePool(engine_factory, self.workers, seed=seed_engine)
+        elif self.mode == "remote":
+            from app.services.model_server import ModelServerClient
+            self.client = ModelServerClient(max_connections=self.workers)
+
+        self._semaphore = asyncio.Semaphore(self.workers)
+        self._waiting = 0
+        self._busy = 0
+        self._completed = 0
+        self._failed = 0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.mode == "process":
+                self._barrier = multiprocessing.Barrier(self.workers)
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    initializer=_init_process_worker,
+                    initargs=(multiprocessing.Value("i", 0), self.workers, self._barrier)
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers,
+                    thread_name_prefix="ocr-worker"
+                )
+        return self._executor
+
+    def _run_with_engine(self, func: Callable, args: tuple) -> Any:
+        with self.engines.checkout() as engine:
+            return func(engine, *args)
+
+    async def run(self, func: Callable, *args, with_engine: bool = True, record: bool = True) -> Any:
+        """
+        Run a job in the pool and await its result
+
+        Args:
+            func: Job callable, called as func(engine, *args)
+            *args: Job arguments
+            with_engine: Whether the job needs an engine checked out; jobs
+                that do not (e.g. preprocessing) receive None
+            record: Whether the job counts towards the completed and failed
+                totals (False for warm-up jobs)
+
+        Returns:
+            Return value of func
+        """
+        loop = asyncio.get_running_loop()
+
+        self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+
+        self._busy += 1
+        try:
+            executor = self._get_executor()
+            if not with_engine:
+                result = await loop.run_in_executor(executor, func, None, *args)
+            elif self.mode == "process":
+                result = await loop.run_in_executor(executor, _run_in_process, func, args)
+            elif self.mode == "remote":
+                result = await loop.run_in_executor(executor, self.client.call, func, *args)
+            else:
+                result = await loop.run_in_executor(executor, self._run_with_engine, func, args)
+            if record:
+                self._completed += 1
+            return result
+        except Exception:
+            if record:
+                self._failed += 1
+            raise
+        finally:
+            self._busy -= 1
+            self._semaphore.release()
+
+    async def run_on_every_worker(self, func: Callable, *args, record: bool = True) -> List[Any]:
+        """
+        Run a job once per worker, concurrently
+
+        Each copy keeps its worker until every copy has started, so no worker
+        runs two of them: in thread mode every engine instance is created and
+        runs the job, in process mode every pool process does. In remote mode
+        the copies are spread over the model server connections; its
+        inference processes are warmed by the server itself.
+
+        Args:
+            func: Job callable, called as func(engine, *args)
+            *args: Job arguments
+            record: Whether the jobs count towards the completed and failed totals
+
+        Returns:
+            Return value or raised exception of every copy
+        """
+        if self.mode == "thread":
+            func = partial(_run_held, threading.Barrier(self.workers), func)
+        elif self.mode == "process":
+            self._get_executor()
+            func = partial(_run_held_in_process, func)
+        return await asyncio.gather(
+            *(self.run(func, *args, record=record) for _ in range(self.workers)),
+            return_exceptions=True
+        )
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of jobs waiting for a free worker"""
+        return self._waiting
+
+    @property
+    def busy_workers(self) -> int:
+        """Number of workers currently running a job"""
+        return self._busy
+
+    def stats(self) -> Dict[str, Any]:
+        """Get pool statistics"""
+        return {
+            "mode": self.mode,
+            "workers": self.workers,
+            "queue_depth": self.queue_depth,
+            "busy_workers": self.busy_workers,
+            "completed": self._completed,
+            "failed": self._failed,
+            "engine_instances": self.engines.created if self.engines else self.workers
+        }
+
+    def shutdown(self, wait: bool = True):
+        """Shut down the underlying executor"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+        if self.client is not None:
+            self.client.close()
@@ -0,0 +1,55 @@
+from typing import Dict, Optional
+
+
+# Characters each short slip field can contain; field reads restrict the
+# recognizer to them
+FIELD_CHARSETS = {
+    "amount": "0123456789.,",
+    "time": "0123456789:.",
+    "date": "0123456789/-.",
+    "account": "0123456789-xX",
+    "reference": "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+}
+
+# Look-alike characters recognizers confuse, mapped to the character they
+# most likely stand for when the look-alike is not allowed
+CONFUSABLES: Dict[str, str] = {
+    "O": "0", "o": "0", "D": "0", "Q": "0",
+    "l": "1", "I": "1", "i": "1", "|": "1", "!": "1",
+    "Z": "2",
+    "S": "5", "s": "5",
+    "b": "6",
+    "B": "8",
+    "g": "9",
+    ";": ":",
+    "0": "O", "1": "I", "5": "S", "8": "B",
+}
+
+
+def constrain_to_allowlist(text: str, allowlist: Optional[str]) -> str:
+    """
+    Restrict recognized text to an allowlist
+
+    Used for engines without a restricted decoder. Within words that contain
+    allowed characters, disallowed ones are replaced by their allowed
+    look-alike (O -> 0, l -> 1, ...) or dropped. Words without any allowed
+    character, such as a "THB" suffix, are dropped entirely.
+
+    Args:
+        text: Recognized text
+        allowlist: Allowed characters, or None for no restriction
+
+    Returns:
+        Text containing only allowed characters
+    """
+    if not allowlist:
+        return text
+
+    allowed = set(allowlist)
+    words = []
+    for word in text.split():
+        if not allowed.intersection(word):
+            continue
+        chars = [char if char in allowed else CONFUSABLES.get(char, "") for char in word]
+        words.append("".join(char for char in chars if char in allowed))
+    return (" " if " " in allowed else "").join(words)
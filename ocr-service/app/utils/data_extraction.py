@@ -82,6 +82,14 @@ class ThaiSlipPatterns:
         
         return None
     
+    @classmethod
+    def bank_by_code(cls, code: str) -> Optional[Dict[str, str]]:
+        """Get bank name and code from a bank code"""
+        for bank_info in cls.THAI_BANKS.values():
+            if bank_info["code"] == code:
+                return {"name": bank_info["name"], "code": bank_info["code"]}
+        return None
+    
     @classmethod
     def extract_amount(cls, text: str) -> Optional[float]:
         """Extract amount from text"""
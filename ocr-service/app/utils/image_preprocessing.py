@@ -2,34 +2,239 @@ import cv2
 import numpy as np
 from PIL import Image
 import io
-from typing import Union
+import inspect
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from app.core.config import settings
 
 
 class ImagePreprocessor:
     """Image preprocessing for OCR accuracy improvement"""
     
+    # Longest side of the thumbnail the page orientation is estimated on
+    ORIENTATION_SIDE = 400
+    
+    # Smallest baseline lean (see _line_skew) trusted to tell upright from
+    # upside-down text. Mixed-case lines lean by about 0.05-0.07, while
+    # all-uppercase and digit-only lines stay within +-0.012 with either sign.
+    ORIENTATION_MIN_SKEW = 0.025
+    
+    # Longest side of the thumbnail the skew angle is estimated on
+    DESKEW_SIDE = 800
+    
+    # Largest skew (degrees) searched, and the coarse and fine search steps
+    DESKEW_MAX_ANGLE = 10.0
+    DESKEW_STEPS = (1.0, 0.1)
+    
+    # Skews smaller than this (degrees) are left alone
+    DESKEW_MIN_ANGLE = 0.5
+    
+    # Rotations (clockwise, degrees) undone by correct_orientation
+    ORIENTATION_ROTATIONS = {
+        90: cv2.ROTATE_90_COUNTERCLOCKWISE,
+        180: cv2.ROTATE_180,
+        270: cv2.ROTATE_90_CLOCKWISE
+    }
+    
+    # Second-derivative kernel of the fast noise estimate (Immerkaer, 1996)
+    NOISE_KERNEL = np.array([[1, -2, 1], [-2, 4, -2], [1, -2, 1]], dtype=np.float32)
+    
+    # Pipeline step names and the method implementing each
+    STEPS = {
+        "limit_resolution": "limit_resolution",
+        "grayscale": "grayscale",
+        "denoise": "adaptive_denoise",
+        "deskew": "deskew",
+        "threshold": "threshold",
+        "remove_borders": "remove_borders",
+        "enhance_contrast": "enhance_contrast"
+    }
+    
+    # Steps that record their decisions in the preprocessing report
+    REPORTING_STEPS = {"limit_resolution", "denoise", "deskew"}
+    
+    # JPEG scale factors libjpeg decodes at directly, largest first, with
+    # the (grayscale, colour) imdecode flag of each
+    DECODE_REDUCTIONS = {
+        8: (cv2.IMREAD_REDUCED_GRAYSCALE_8, cv2.IMREAD_REDUCED_COLOR_8),
+        4: (cv2.IMREAD_REDUCED_GRAYSCALE_4, cv2.IMREAD_REDUCED_COLOR_4),
+        2: (cv2.IMREAD_REDUCED_GRAYSCALE_2, cv2.IMREAD_REDUCED_COLOR_2)
+    }
+    
     @staticmethod
-    def preprocess_image(image: Union[np.ndarray, bytes, Image.Image]) -> np.ndarray:
+    def resolve_steps(
+        profile: Optional[str] = None,
+        steps: Optional[Sequence[Union[str, Dict[str, Any]]]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Resolve and validate the preprocessing steps to run
+        
+        Args:
+            profile: Name of a profile in OCR_PREPROCESS_PROFILES
+                (OCR_PREPROCESS_PROFILE if None)
+            steps: Explicit steps overriding the profile, each a step name or
+                a ``{"step": name, **params}`` dictionary
+            
+        Returns:
+            List of ``{"step": name, **params}`` dictionaries in run order
+            
+        Raises:
+            ValueError: If the profile, a step or a step parameter is unknown
+        """
+        if steps is None:
+            profile = profile or settings.OCR_PREPROCESS_PROFILE
+            if profile not in settings.OCR_PREPROCESS_PROFILES:
+                raise ValueError(f"Unknown preprocessing profile: {profile}")
+            steps = settings.OCR_PREPROCESS_PROFILES[profile]
+        
+        resolved = []
+        for step in steps:
+            spec = {"step": step} if isinstance(step, str) else dict(step)
+            name = spec.pop("step", None)
+            if name not in ImagePreprocessor.STEPS:
+                raise ValueError(f"Unknown preprocessing step: {name}")
+            method = getattr(ImagePreprocessor, ImagePreprocessor.STEPS[name])
+            try:
+                inspect.signature(method).bind(None, **spec)
+            except TypeError as e:
+                raise ValueError(f"Invalid parameters for preprocessing step {name}: {e}")
+            resolved.append({"step": name, **spec})
+        return resolved
+    
+    @staticmethod
+    def grayscale_input(
+        profile: Optional[str] = None,
+        steps: Optional[Sequence[Union[str, Dict[str, Any]]]] = None
+    ) -> bool:
+        """
+        Check whether the steps convert to grayscale before any step uses colour
+        
+        Args:
+            profile: Preprocessing profile (OCR_PREPROCESS_PROFILE if None)
+            steps: Explicit steps overriding the profile
+            
+        Returns:
+            True if the image can be decoded straight to grayscale
+        """
+        for spec in ImagePreprocessor.resolve_steps(profile, steps):
+            if spec["step"] != "limit_resolution":
+                return spec["step"] == "grayscale"
+        return False
+    
+    @staticmethod
+    def decode(
+        image_data: bytes,
+        grayscale: bool = False,
+        report: Optional[Dict[str, Any]] = None
+    ) -> Optional[np.ndarray]:
+        """
+        Decode image bytes in the cheapest mode the pipeline can use
+        
+        Grayscale decoding skips chroma upsampling and colour conversion.
+        JPEGs larger than the resolution bound are decoded at the largest
+        DCT reduction (1/2, 1/4 or 1/8) that still leaves limit_resolution
+        at least as many pixels as it keeps, so libjpeg skips work without
+        changing the image OCR sees beyond the bound.
+        
+        Args:
+            image_data: Image bytes
+            grayscale: Decode to a single channel
+            report: Optional dictionary that receives the ``decode`` mode,
+                reduction, time and decoded size
+            
+        Returns:
+            Decoded image, or None if the bytes cannot be decoded
+        """
+        started = time.perf_counter()
+        reduction = 1
+        if settings.OCR_DECODE_REDUCED and image_data[:2] == b"\xff\xd8":
+            size = ImagePreprocessor._image_size(image_data)
+            if size is not None:
+                scale = ImagePreprocessor._limit_scale(*size)
+                reduction = next((factor for factor in ImagePreprocessor.DECODE_REDUCTIONS if factor * scale <= 1.0), 1)
+        
+        if reduction > 1:
+            flags = ImagePreprocessor.DECODE_REDUCTIONS[reduction][0 if grayscale else 1]
+        else:
+            flags = cv2.IMREAD_GRAYSCALE if grayscale else cv2.IMREAD_COLOR
+        image = cv2.imdecode(np.frombuffer(image_data, np.uint8), flags)
+        
+        if report is not None and image is not None:
+            report["decode"] = {
+                "mode": "grayscale" if grayscale else "color",
+                "reduction": reduction,
+                "ms": round((time.perf_counter() - started) * 1000, 2),
+                "bytes": int(image.nbytes)
+            }
+        return image
+    
+    @staticmethod
+    def _image_size(image_data: bytes) -> Optional[Tuple[int, int]]:
+        """(height, width) from the image header, without decoding pixels"""
+        try:
+            width, height = Image.open(io.BytesIO(image_data)).size
+        except Exception:
+            return None
+        return height, width
+    
+    @staticmethod
+    def preprocess_image(
+        image: Union[np.ndarray, bytes, Image.Image],
+        report: Optional[Dict[str, Any]] = None,
+        profile: Optional[str] = None,
+        steps: Optional[Sequence[Union[str, Dict[str, Any]]]] = None
+    ) -> np.ndarray:
         """
         Complete preprocessing pipeline
         
+        Runs the steps of a profile (see resolve_steps) in order and times
+        each one.
+        
         Args:
             image: Input image (numpy array, bytes, or PIL Image)
+            report: Optional dictionary that receives the path taken
+                (profile, resolution scale, denoise method, estimated noise
+                sigma, skew angle) and the time and memory of every step
+            profile: Preprocessing profile (OCR_PREPROCESS_PROFILE if None)
+            steps: Explicit steps overriding the profile
             
         Returns:
             Preprocessed image as numpy array
         """
+        resolved = ImagePreprocessor.resolve_steps(profile, steps)
+        trace_memory = settings.OCR_PREPROCESS_TRACE_MEMORY
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        
         # Convert to numpy array if needed
         img = ImagePreprocessor._to_numpy(image)
         
-        # Apply preprocessing steps
-        img = ImagePreprocessor.grayscale(img)
-        img = ImagePreprocessor.denoise(img)
-        img = ImagePreprocessor.deskew(img)
-        img = ImagePreprocessor.threshold(img)
-        img = ImagePreprocessor.remove_borders(img)
-        img = ImagePreprocessor.enhance_contrast(img)
+        timings = []
+        for spec in resolved:
+            params = {key: value for key, value in spec.items() if key != "step"}
+            if spec["step"] in ImagePreprocessor.REPORTING_STEPS:
+                params["report"] = report
+            method = getattr(ImagePreprocessor, ImagePreprocessor.STEPS[spec["step"]])
+            
+            if trace_memory:
+                tracemalloc.reset_peak()
+                baseline = tracemalloc.get_traced_memory()[0]
+            started = time.perf_counter()
+            img = method(img, **params)
+            timing = {
+                "step": spec["step"],
+                "ms": round((time.perf_counter() - started) * 1000, 2),
+                "bytes": int(img.nbytes)
+            }
+            if trace_memory:
+                timing["peak_bytes"] = max(0, tracemalloc.get_traced_memory()[1] - baseline)
+            timings.append(timing)
         
+        if report is not None:
+            report["profile"] = "custom" if steps is not None else profile or settings.OCR_PREPROCESS_PROFILE
+            report["steps"] = timings
         return img
     
     @staticmethod
@@ -53,39 +258,256 @@ class ImagePreprocessor:
         return image
     
     @staticmethod
-    def denoise(image: np.ndarray) -> np.ndarray:
-        """Apply noise reduction"""
+    def estimate_noise(image: np.ndarray) -> float:
+        """
+        Estimate the standard deviation of the image noise
+        
+        The image is filtered with a second-derivative kernel that cancels
+        smooth shading. The median absolute response then measures the
+        noise. Text edges are a minority of pixels and barely move the median.
+        
+        Args:
+            image: Grayscale image
+            
+        Returns:
+            Estimated noise sigma in grey levels (0 for clean screenshots)
+        """
+        response = cv2.filter2D(image.astype(np.float32), -1, ImagePreprocessor.NOISE_KERNEL)
+        # Every other pixel is plenty for the median and halves its cost
+        sample = np.abs(response[1:-1:2, 1:-1:2])
+        if not sample.size:
+            return 0.0
+        # The kernel's L2 norm is 6; 0.6745 converts a median to a Gaussian sigma
+        return float(np.median(sample)) / (0.6745 * 6)
+    
+    @staticmethod
+    def select_denoise(image: np.ndarray) -> Tuple[str, Optional[float]]:
+        """
+        Pick the denoising method for an image
+        
+        With OCR_DENOISE_MODE ``auto``, clean images (estimated sigma below
+        OCR_DENOISE_LIGHT_SIGMA) are not denoised, moderately noisy ones get
+        an edge-preserving bilateral filter and only images at or above
+        OCR_DENOISE_NLM_SIGMA get non-local means. Any other mode forces
+        that method.
+        
+        Args:
+            image: Grayscale image
+            
+        Returns:
+            Tuple of (method, estimated noise sigma or None if not estimated)
+        """
+        if settings.OCR_DENOISE_MODE != "auto":
+            return settings.OCR_DENOISE_MODE, None
+        
+        sigma = ImagePreprocessor.estimate_noise(image)
+        if sigma < settings.OCR_DENOISE_LIGHT_SIGMA:
+            return "none", sigma
+        if sigma < settings.OCR_DENOISE_NLM_SIGMA:
+            return "bilateral", sigma
+        return "nlm", sigma
+    
+    @staticmethod
+    def denoise(image: np.ndarray, method: str = "nlm") -> np.ndarray:
+        """
+        Apply noise reduction
+        
+        Args:
+            image: Grayscale image
+            method: 'none', 'bilateral' or 'nlm' (non-local means)
+            
+        Returns:
+            Denoised image
+        """
+        if method == "none":
+            return image
+        if method == "bilateral":
+            return cv2.bilateralFilter(image, 5, 30, 5)
         return cv2.fastNlMeansDenoising(image, None, 10, 7, 21)
     
     @staticmethod
-    def threshold(image: np.ndarray) -> np.ndarray:
+    def adaptive_denoise(
+        image: np.ndarray,
+        report: Optional[Dict[str, Any]] = None,
+        method: Optional[str] = None
+    ) -> np.ndarray:
+        """
+        Denoise with the method picked by select_denoise
+        
+        Args:
+            image: Grayscale image
+            report: Optional dictionary that receives the ``denoise`` method
+                and the estimated ``noise_sigma``
+            method: Method forced for this step, overriding select_denoise
+            
+        Returns:
+            Denoised image
+        """
+        sigma = None
+        if method is None:
+            method, sigma = ImagePreprocessor.select_denoise(image)
+        if report is not None:
+            report["denoise"] = method
+            report["noise_sigma"] = round(sigma, 2) if sigma is not None else None
+        return ImagePreprocessor.denoise(image, method)
+    
+    @staticmethod
+    def threshold(image: np.ndarray, block_size: int = 11, c: float = 2) -> np.ndarray:
         """Apply adaptive thresholding"""
         return cv2.adaptiveThreshold(
-            image,
+            ImagePreprocessor.grayscale(image),
             255,
             cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
             cv2.THRESH_BINARY,
-            11,
-            2
+            block_size,
+            c
         )
     
     @staticmethod
-    def deskew(image: np.ndarray) -> np.ndarray:
-        """Deskew image by detecting and correcting rotation"""
-        coords = np.column_stack(np.where(image > 0))
-        if len(coords) == 0:
+    def _ink_map(image: np.ndarray, side: int = ORIENTATION_SIDE) -> np.ndarray:
+        """Otsu-binarized ink (1) / paper (0) map of a copy downscaled to ``side``"""
+        gray = ImagePreprocessor.grayscale(image)
+        scale = side / max(gray.shape[:2])
+        if scale < 1.0:
+            gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        _, ink = cv2.threshold(gray, 0, 1, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+        # Light text on a dark page
+        if ink.mean() > 0.5:
+            ink = 1 - ink
+        return ink.astype(np.float32)
+    
+    @staticmethod
+    def _line_contrast(ink: np.ndarray) -> float:
+        """How sharply the row profile alternates between text lines and gaps"""
+        profile = ink.mean(axis=1)
+        return float(np.abs(np.diff(profile)).sum() / max(profile.sum(), 1e-6))
+    
+    @staticmethod
+    def _line_skew(ink: np.ndarray) -> float:
+        """
+        Mean offset of the ink centroid from the centre of each text line
+        
+        Lowercase Latin letters and Thai consonants sit on the baseline, so in
+        upright text most ink lies in the lower part of a line's band; the
+        offset is positive for upright and negative for upside-down text.
+        Bands much taller than the median line (logos, QR codes) and solid
+        rows (coloured header bars) are ignored.
+        """
+        profile = ink.mean(axis=1)
+        on = np.concatenate([[False], profile > 0.01, [False]])
+        edges = np.flatnonzero(np.diff(on.astype(np.int8)))
+        bands = [(start, end) for start, end in zip(edges[::2], edges[1::2]) if end - start >= 3]
+        if not bands:
+            return 0.0
+        
+        median = np.median([end - start for start, end in bands])
+        weighted, total = 0.0, 0.0
+        for start, end in bands:
+            rows = profile[start:end]
+            if end - start > 2 * median or rows.max() > 0.6:
+                continue
+            centroid = float((rows * np.arange(end - start)).sum() / rows.sum())
+            weighted += (centroid - (end - start - 1) / 2) / (end - start) * rows.sum()
+            total += rows.sum()
+        return weighted / total if total else 0.0
+    
+    @staticmethod
+    def detect_orientation(image: np.ndarray) -> int:
+        """
+        Estimate the page orientation from a thumbnail
+        
+        Text lines make the row profile of a page alternate sharply, so the
+        axis with the stronger alternation is the text direction (0/180 vs
+        90/270). The side the ink leans to within each line tells upright
+        from upside-down, but only when the lean exceeds
+        ORIENTATION_MIN_SKEW: all-uppercase or digit-only text has no
+        baseline lean to go by, and such pages are left as they are.
+        
+        Args:
+            image: Decoded image
+            
+        Returns:
+            Clockwise rotation of the page content: 0, 90, 180 or 270
+            (0 when the orientation is not clear)
+        """
+        ink = ImagePreprocessor._ink_map(image)
+        if not ink.any():
+            return 0
+        
+        margin = ImagePreprocessor.ORIENTATION_MIN_SKEW
+        if ImagePreprocessor._line_contrast(ink) >= ImagePreprocessor._line_contrast(ink.T):
+            return 180 if ImagePreprocessor._line_skew(ink) < -margin else 0
+        
+        # Turn the text lines horizontal (clockwise) and check which way up they are
+        skew = ImagePreprocessor._line_skew(np.rot90(ink, -1))
+        if abs(skew) < margin:
+            return 0
+        return 270 if skew > 0 else 90
+    
+    @staticmethod
+    def correct_orientation(image: np.ndarray, report: Optional[Dict[str, Any]] = None) -> np.ndarray:
+        """
+        Rotate a sideways or upside-down page upright (see detect_orientation)
+        
+        Args:
+            image: Decoded image
+            report: Optional dictionary that receives the detected ``orientation``
+            
+        Returns:
+            Upright image
+        """
+        angle = ImagePreprocessor.detect_orientation(image)
+        if report is not None:
+            report["orientation"] = angle
+        if angle == 0:
             return image
+        return cv2.rotate(image, ImagePreprocessor.ORIENTATION_ROTATIONS[angle])
+    
+    @staticmethod
+    def _profile_sharpness(ink: np.ndarray, angle: float) -> float:
+        """Sum of squared row-profile differences after rotating the ink map by ``angle``"""
+        h, w = ink.shape
+        matrix = cv2.getRotationMatrix2D((w / 2, h / 2), angle, 1.0)
+        rotated = cv2.warpAffine(ink, matrix, (w, h), flags=cv2.INTER_NEAREST)
+        return float(np.square(np.diff(rotated.sum(axis=1))).sum())
+    
+    @staticmethod
+    def estimate_skew(image: np.ndarray) -> float:
+        """
+        Estimate the skew angle from the projection profile of a thumbnail
+        
+        Text lines give the sharpest row profile when they are level, so the
+        angle that maximizes the profile's sharpness is searched in coarse
+        steps over +-DESKEW_MAX_ANGLE, then refined around the best one. Only
+        the binarized DESKEW_SIDE thumbnail is rotated, so memory stays
+        bounded whatever the image size.
+        
+        Args:
+            image: Grayscale or colour image
             
-        angle = cv2.minAreaRect(coords)[-1]
+        Returns:
+            Rotation in degrees (counter-clockwise) that levels the text
+        """
+        ink = ImagePreprocessor._ink_map(image, ImagePreprocessor.DESKEW_SIDE)
+        if not ink.any():
+            return 0.0
         
-        # Adjust angle
-        if angle < -45:
-            angle = -(90 + angle)
-        else:
-            angle = -angle
+        best, span = 0.0, ImagePreprocessor.DESKEW_MAX_ANGLE
+        for step in ImagePreprocessor.DESKEW_STEPS:
+            angles = np.arange(best - span, best + span + step / 2, step)
+            best = float(max(angles, key=lambda angle: ImagePreprocessor._profile_sharpness(ink, angle)))
+            span = step
+        return round(best, 2) or 0.0
+    
+    @staticmethod
+    def deskew(image: np.ndarray, report: Optional[Dict[str, Any]] = None) -> np.ndarray:
+        """Deskew image by detecting and correcting rotation"""
+        angle = ImagePreprocessor.estimate_skew(image)
+        if report is not None:
+            report["skew"] = angle
         
         # Rotate image only if angle is significant
-        if abs(angle) > 0.5:
+        if abs(angle) > ImagePreprocessor.DESKEW_MIN_ANGLE:
             (h, w) = image.shape[:2]
             center = (w // 2, h // 2)
             M = cv2.getRotationMatrix2D(center, angle, 1.0)
@@ -107,10 +529,47 @@ class ImagePreprocessor:
         return image[border_size:h-border_size, border_size:w-border_size]
     
     @staticmethod
-    def enhance_contrast(image: np.ndarray) -> np.ndarray:
+    def enhance_contrast(image: np.ndarray, clip_limit: float = 2.0, tile_size: int = 8) -> np.ndarray:
         """Enhance image contrast using CLAHE"""
-        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
-        return clahe.apply(image)
+        clahe = cv2.createCLAHE(clipLimit=clip_limit, tileGridSize=(tile_size, tile_size))
+        return clahe.apply(ImagePreprocessor.grayscale(image))
+    
+    @staticmethod
+    def limit_resolution(image: np.ndarray, report: Optional[Dict[str, Any]] = None) -> np.ndarray:
+        """
+        Downscale an image to OCR_MAX_LONG_EDGE and OCR_MAX_PIXELS
+        
+        Slip text stays legible far below phone camera resolution, and every
+        later step (and the OCR detector) scales with the pixel count. Area
+        interpolation averages the source pixels, so strokes do not alias.
+        
+        Args:
+            image: Decoded image
+            report: Optional dictionary that receives the applied ``scale``
+            
+        Returns:
+            Image within both limits (0 disables a limit), unchanged if it
+            already is
+        """
+        h, w = image.shape[:2]
+        scale = ImagePreprocessor._limit_scale(h, w)
+        
+        if report is not None:
+            report["scale"] = round(scale, 4)
+        if scale >= 1.0:
+            return image
+        size = (max(1, int(w * scale)), max(1, int(h * scale)))
+        return cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+    
+    @staticmethod
+    def _limit_scale(h: int, w: int) -> float:
+        """Scale that brings an image within OCR_MAX_LONG_EDGE and OCR_MAX_PIXELS (at most 1)"""
+        scale = 1.0
+        if settings.OCR_MAX_LONG_EDGE:
+            scale = min(scale, settings.OCR_MAX_LONG_EDGE / max(h, w))
+        if settings.OCR_MAX_PIXELS:
+            scale = min(scale, (settings.OCR_MAX_PIXELS / (h * w)) ** 0.5)
+        return scale
     
     @staticmethod
     def resize_if_needed(image: np.ndarray, max_width: int = 2000, max_height: int = 2000) -> np.ndarray:
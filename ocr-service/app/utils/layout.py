@@ -0,0 +1,102 @@
+import cv2
+import numpy as np
+from typing import List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+
+
+# Lines shorter than this share of the median line height are fine print
+MIN_LINE_HEIGHT_RATIO = 0.5
+
+# Side of the downscaled image searched for a QR code
+QR_SEARCH_SIDE = 800
+
+
+def find_qr_rect(image: np.ndarray) -> Optional[Tuple[float, float, float, float]]:
+    """
+    Locate the slip's verification QR code and its caption
+
+    Args:
+        image: Slip image
+
+    Returns:
+        (x0, y0, x1, y1) around the QR code, grown by a quarter of its size on
+        each side so the caption is included, or None if there is no QR code
+    """
+    scale = min(1.0, QR_SEARCH_SIDE / max(image.shape[:2]))
+    small = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA) if scale < 1.0 else image
+
+    try:
+        found, points = cv2.QRCodeDetector().detect(small)
+    except cv2.error:
+        return None
+    if not found or points is None:
+        return None
+
+    points = points.reshape(-1, 2) / scale
+    x0, y0 = points.min(axis=0)
+    x1, y1 = points.max(axis=0)
+    margin_x, margin_y = (x1 - x0) / 4, (y1 - y0) / 4
+    return x0 - margin_x, y0 - margin_y, x1 + margin_x, y1 + margin_y
+
+
+def decode_qr(image: np.ndarray) -> Optional[str]:
+    """
+    Detect and decode a QR code
+
+    Args:
+        image: Image at full resolution (slip QR codes are small)
+
+    Returns:
+        Decoded text, or None if no readable QR code was found
+    """
+    try:
+        text, _, _ = cv2.QRCodeDetector().detectAndDecode(image)
+    except cv2.error:
+        return None
+    return text or None
+
+
+def select_field_regions(
+    boxes: Sequence[np.ndarray],
+    image_shape: Tuple[int, ...],
+    exclude: Optional[Tuple[float, float, float, float]] = None
+) -> List[int]:
+    """
+    Pick the detected text lines that can hold slip fields
+
+    Uses layout cues only, so no line needs to be recognized first. Drops
+    lines in the footer band (OCR_REGION_FOOTER_FRACTION of the height),
+    promotional display type taller than OCR_REGION_MAX_HEIGHT_RATIO times
+    the median line height, fine print, and lines inside ``exclude``
+    (e.g. the QR code and its caption).
+
+    Args:
+        boxes: Detected text boxes, 4x2 corner points each
+        image_shape: Shape of the image the boxes were detected on
+        exclude: Optional (x0, y0, x1, y1) area whose lines are dropped
+
+    Returns:
+        Indices of the selected boxes
+    """
+    if not len(boxes):
+        return []
+
+    boxes = [np.asarray(box, dtype=np.float32).reshape(4, 2) for box in boxes]
+    heights = np.array([box[:, 1].max() - box[:, 1].min() for box in boxes])
+    median = float(np.median(heights)) or 1.0
+    footer_top = image_shape[0] * (1 - settings.OCR_REGION_FOOTER_FRACTION)
+
+    selected = []
+    for idx, (box, height) in enumerate(zip(boxes, heights)):
+        center_x, center_y = box.mean(axis=0)
+        if center_y > footer_top:
+            continue
+        if height > median * settings.OCR_REGION_MAX_HEIGHT_RATIO or height < median * MIN_LINE_HEIGHT_RATIO:
+            continue
+        if exclude is not None:
+            x0, y0, x1, y1 = exclude
+            if x0 <= center_x <= x1 and y0 <= center_y <= y1:
+                continue
+        selected.append(idx)
+    return selected
@@ -0,0 +1,55 @@
+import os
+import resource
+from typing import Dict, Union
+
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def current_rss_bytes() -> int:
+    """
+    Get the resident set size of the current process
+    
+    Returns:
+        RSS in bytes (peak RSS where /proc is not available)
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        # ru_maxrss is in kilobytes on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+
+def read_memory_usage(pid: Union[int, str] = "self") -> Dict[str, int]:
+    """
+    Read RSS, PSS and shared memory of a process from /proc/<pid>/smaps_rollup
+    
+    PSS (proportional set size) charges each shared page to the processes
+    sharing it, so it shows how much memory a forked worker really adds.
+    
+    Args:
+        pid: Process ID, or 'self'
+        
+    Returns:
+        Dictionary with rss, pss, shared and private sizes in bytes
+    """
+    fields = {
+        "Rss": "rss",
+        "Pss": "pss",
+        "Shared_Clean": "shared",
+        "Shared_Dirty": "shared",
+        "Private_Clean": "private",
+        "Private_Dirty": "private"
+    }
+    usage = {"rss": 0, "pss": 0, "shared": 0, "private": 0}
+    
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            key = parts[0].rstrip(":")
+            if key in fields and len(parts) >= 2:
+                usage[fields[key]] += int(parts[1]) * 1024
+    
+    return usage
@@ -0,0 +1,219 @@
+import re
+from typing import Any, Dict, Optional
+
+from app.utils.data_extraction import ThaiSlipPatterns
+
+
+# Thai bank codes (Bank of Thailand institution numbers) to THAI_BANKS codes
+BANK_IDS = {
+    "002": "BBL",
+    "004": "KBANK",
+    "006": "KTB",
+    "011": "TTB",
+    "014": "SCB",
+    "022": "CIMB",
+    "024": "UOB",
+    "025": "BAY",
+    "030": "GSB",
+    "034": "BAAC",
+}
+
+# Application ID of PromptPay credit transfers in EMVCo merchant info (tag 29)
+PROMPTPAY_AID = "A000000677010111"
+
+# DataExtractor.extract_all keys of the parsed QR fields
+EXTRACTED_KEYS = {
+    "reference_number": "reference_number",
+    "bank": "bank",
+    "amount": "amount",
+    "promptpay_id": "receiver_account"
+}
+
+# Payload kinds issued for a completed transfer. A PromptPay QR is a payment
+# request: it states what was asked for, not what was paid, so its fields are
+# only cross-checked against OCR
+TRUSTED_KINDS = {"slip_verification"}
+
+
+def parse_tlv(payload: str) -> Dict[str, str]:
+    """
+    Split an EMVCo-style payload of 2-digit tag, 2-digit length, value records
+
+    Args:
+        payload: Payload string
+
+    Returns:
+        Values by tag, in payload order
+
+    Raises:
+        ValueError: If a record is truncated or its length is not numeric
+    """
+    fields = {}
+    pos = 0
+    while pos < len(payload):
+        tag, length = payload[pos:pos + 2], payload[pos + 2:pos + 4]
+        if len(length) < 2 or not length.isdigit():
+            raise ValueError(f"Malformed TLV record at offset {pos}")
+        end = pos + 4 + int(length)
+        if end > len(payload):
+            raise ValueError(f"TLV record {tag} exceeds payload")
+        fields[tag] = payload[pos + 4:end]
+        pos = end
+    return fields
+
+
+def crc16_ccitt(data: str) -> str:
+    """
+    CRC-16/CCITT-FALSE (poly 0x1021, init 0xFFFF) used by EMVCo QR payloads
+
+    Args:
+        data: Payload up to and including the CRC tag and length
+
+    Returns:
+        Four uppercase hex digits
+    """
+    crc = 0xFFFF
+    for byte in data.encode("utf-8"):
+        crc ^= byte << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x1021) if crc & 0x8000 else crc << 1
+            crc &= 0xFFFF
+    return f"{crc:04X}"
+
+
+def _crc_valid(payload: str, tag: str) -> bool:
+    """Check the trailing CRC record (tag + "04" + 4 hex digits) of a payload"""
+    if len(payload) < 8 or payload[-8:-4] != f"{tag}04":
+        return False
+    return crc16_ccitt(payload[:-4]) == payload[-4:].upper()
+
+
+def _bank(bank_id: Optional[str]) -> Optional[Dict[str, str]]:
+    code = BANK_IDS.get(bank_id or "")
+    return ThaiSlipPatterns.bank_by_code(code) if code else None
+
+
+def parse_slip_qr(payload: str) -> Optional[Dict[str, Any]]:
+    """
+    Parse the QR code printed on a Thai bank e-slip
+
+    Supports the slip verification mini QR (tag 00 with API ID, sending bank
+    and transaction reference, country tag 51, CRC tag 91) and PromptPay
+    EMVCo payment QR codes (merchant info tag 29, amount tag 54, CRC tag 63).
+
+    Args:
+        payload: Decoded QR text
+
+    Returns:
+        Dictionary with the payload kind, CRC status and the fields it
+        supplies (reference_number and bank, or amount and promptpay_id), or
+        None if the payload is not a known slip format
+    """
+    try:
+        fields = parse_tlv(payload)
+    except ValueError:
+        return None
+
+    if "91" in fields and "00" in fields:
+        try:
+            header = parse_tlv(fields["00"])
+        except ValueError:
+            return None
+        if "02" not in header:
+            return None
+        return {
+            "kind": "slip_verification",
+            "crc_valid": _crc_valid(payload, "91"),
+            "reference_number": header["02"],
+            "bank": _bank(header.get("01")),
+            "sending_bank_id": header.get("01"),
+            "country": fields.get("51")
+        }
+
+    if "63" in fields and "29" in fields:
+        try:
+            merchant = parse_tlv(fields["29"])
+        except ValueError:
+            return None
+        if merchant.get("00") != PROMPTPAY_AID:
+            return None
+        promptpay_id = merchant.get("01") or merchant.get("02") or merchant.get("03")
+        try:
+            amount = float(fields["54"]) if "54" in fields else None
+        except ValueError:
+            amount = None
+        return {
+            "kind": "promptpay",
+            "crc_valid": _crc_valid(payload, "63"),
+            "amount": amount,
+            "promptpay_id": promptpay_id,
+            "currency": fields.get("53"),
+            "country": fields.get("58")
+        }
+
+    return None
+
+
+def extracted_fields(parsed: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Map a parsed slip QR onto DataExtractor.extract_all keys
+
+    Args:
+        parsed: Output of parse_slip_qr
+
+    Returns:
+        The fields the QR supplies, without empty values
+    """
+    return {
+        key: parsed[name]
+        for name, key in EXTRACTED_KEYS.items()
+        if parsed.get(name) is not None
+    }
+
+
+def trusted_fields(parsed: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Fields of a parsed slip QR that may replace OCR
+
+    Args:
+        parsed: Output of parse_slip_qr
+
+    Returns:
+        extracted_fields for payload kinds in TRUSTED_KINDS, else empty
+    """
+    return extracted_fields(parsed) if parsed["kind"] in TRUSTED_KINDS else {}
+
+
+def _account_matches(shown: str, account: str) -> bool:
+    """Whether an account read from the slip, possibly masked with x, fits the QR account"""
+    pattern = "".join(r"\d" if char in "xX*" else char for char in shown if char.isdigit() or char in "xX*")
+    # PromptPay phone numbers are stored as 0066 + the number without its leading 0
+    digits = re.sub(r"^0066", "0", re.sub(r"\D", "", account))
+    return bool(pattern) and re.search(pattern + "$", digits) is not None
+
+
+def cross_check(parsed: Dict[str, Any], extracted: Dict[str, Any]) -> Dict[str, bool]:
+    """
+    Compare the fields of a parsed slip QR with the ones read by OCR
+
+    Args:
+        parsed: Output of parse_slip_qr
+        extracted: Fields extracted from the OCR text
+
+    Returns:
+        Whether each QR field matches its OCR reading, for the fields OCR read
+    """
+    checks = {}
+    for key, value in extracted_fields(parsed).items():
+        shown = extracted.get(key)
+        if shown is None:
+            continue
+        if key == "amount":
+            checks[key] = abs(float(shown) - float(value)) < 0.005
+        elif key == "receiver_account":
+            checks[key] = _account_matches(str(shown), str(value))
+        elif key == "bank":
+            checks[key] = shown.get("code") == value.get("code")
+        else:
+            checks[key] = str(shown) == str(value)
+    return checks
@@ -0,0 +1,103 @@
+import threading
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+
+class RollingWindow:
+    """Thread-safe window over the most recent numeric samples"""
+    
+    def __init__(self, maxlen: int = 500):
+        """
+        Initialize rolling window
+        
+        Args:
+            maxlen: Number of most recent samples to keep
+        """
+        self._values = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+        self.total = 0
+    
+    def add(self, value: float):
+        """Add a sample"""
+        with self._lock:
+            self._values.append(value)
+            self.total += 1
+    
+    def clear(self):
+        """Drop all samples in the window"""
+        with self._lock:
+            self._values.clear()
+    
+    def __len__(self) -> int:
+        return len(self._values)
+    
+    def mean(self) -> Optional[float]:
+        """Mean of the samples in the window"""
+        with self._lock:
+            if not self._values:
+                return None
+            return sum(self._values) / len(self._values)
+    
+    def max(self) -> Optional[float]:
+        """Largest sample in the window"""
+        with self._lock:
+            return max(self._values) if self._values else None
+    
+    def percentile(self, p: float) -> Optional[float]:
+        """
+        Nearest-rank percentile of the samples in the window
+        
+        Args:
+            p: Percentile between 0 and 100
+            
+        Returns:
+            Percentile value, or None if the window is empty
+        """
+        with self._lock:
+            if not self._values:
+                return None
+            ordered = sorted(self._values)
+        rank = min(len(ordered) - 1, max(0, int(round(p / 100 * len(ordered))) - 1))
+        return ordered[rank]
+    
+    def summary(self, scale: float = 1.0) -> Dict[str, Optional[float]]:
+        """
+        Summary statistics of the window
+        
+        Args:
+            scale: Multiplier applied to every statistic (e.g. 1000 for ms)
+            
+        Returns:
+            Dictionary with count, mean, p50, p95 and max
+        """
+        def scaled(value):
+            return round(value * scale, 3) if value is not None else None
+        
+        return {
+            "count": self.total,
+            "mean": scaled(self.mean()),
+            "p50": scaled(self.percentile(50)),
+            "p95": scaled(self.percentile(95)),
+            "max": scaled(self.max())
+        }
+
+
+# Cleared while warm-up jobs run, so synthetic calls stay out of the service statistics
+_recording: ContextVar[bool] = ContextVar("recording", default=True)
+
+
+def recording() -> bool:
+    """Whether calls made in the current context count towards the service statistics"""
+    return _recording.get()
+
+
+@contextmanager
+def unrecorded():
+    """Leave every call made inside the block out of the service statistics"""
+    token = _recording.set(False)
+    try:
+        yield
+    finally:
+        _recording.reset(token)
@@ -0,0 +1,96 @@
+"""
+Time and memory per decode: full colour vs grayscale vs reduced grayscale
+
+For each slip, measures the previous decode (IMREAD_COLOR, then conversion
+to grayscale) against decoding straight to grayscale and against
+ImagePreprocessor.decode, which also picks a JPEG DCT reduction when the
+resolution bound allows one. Reports the mean time, the mean peak of Python
+allocations and the reductions chosen.
+
+Usage:
+    python -m benchmarks.bench_decode --synthetic 10
+    python -m benchmarks.bench_decode --images path/to/slips [--long-edge 2400]
+"""
+import argparse
+import json
+import time
+import tracemalloc
+from collections import Counter
+from typing import Callable, Dict, List
+
+import cv2
+import numpy as np
+
+from app.core.config import settings
+from app.utils.image_preprocessing import ImagePreprocessor
+from benchmarks.harness import load_dataset
+
+
+def synthetic_photos(count: int) -> List[bytes]:
+    """12 megapixel JPEGs of slip-like text with camera noise"""
+    rng = np.random.default_rng(0)
+    photos = []
+    for idx in range(count):
+        page = np.full((4000, 3000, 3), 225, dtype=np.uint8)
+        for row in range(70):
+            line = f"Transfer {idx:03d} amount {rng.integers(1, 99999):,}.00 THB ref {rng.integers(10**9):010d}"
+            cv2.putText(page, line, (80, 120 + 54 * row), cv2.FONT_HERSHEY_SIMPLEX, 1.4, (30, 30, 30), 3)
+        noisy = np.clip(page + rng.normal(0, 4, page.shape), 0, 255).astype(np.uint8)
+        photos.append(cv2.imencode(".jpg", noisy, [cv2.IMWRITE_JPEG_QUALITY, 90])[1].tobytes())
+    return photos
+
+
+def profile(decode: Callable[[bytes], np.ndarray], images: List[bytes]) -> Dict[str, float]:
+    """Mean milliseconds and peak kilobytes allocated per decode"""
+    seconds, peak = 0.0, 0
+    for data in images:
+        started = time.perf_counter()
+        decode(data)
+        seconds += time.perf_counter() - started
+
+        tracemalloc.start()
+        decode(data)
+        peak += tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    count = max(len(images), 1)
+    return {"mean_ms": round(seconds / count * 1000, 2), "peak_kb": round(peak / count / 1024)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--images", help="Directory of slip images")
+    source.add_argument("--synthetic", type=int, help="Number of synthetic 12 MP photos")
+    parser.add_argument("--long-edge", type=int, default=settings.OCR_MAX_LONG_EDGE)
+    parser.add_argument("--max-pixels", type=int, default=settings.OCR_MAX_PIXELS)
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    images = [data for _, data, _ in load_dataset(args.images)] if args.images else synthetic_photos(args.synthetic)
+    settings.OCR_MAX_LONG_EDGE, settings.OCR_MAX_PIXELS = args.long_edge, args.max_pixels
+    print(f"{len(images)} images")
+
+    modes = {
+        "color+convert": lambda data: ImagePreprocessor.grayscale(ImagePreprocessor._to_numpy(data)),
+        "grayscale": lambda data: cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_GRAYSCALE),
+        "reduced": lambda data: ImagePreprocessor.decode(data, grayscale=True)
+    }
+    results = {name: profile(decode, images) for name, decode in modes.items()}
+
+    reductions = Counter()
+    for data in images:
+        report = {}
+        ImagePreprocessor.decode(data, grayscale=True, report=report)
+        reductions[report["decode"]["reduction"]] += 1
+
+    print(f"{'mode':<16}{'mean ms':>10}{'peak KB':>12}")
+    for name, result in results.items():
+        print(f"{name:<16}{result['mean_ms']:>10.1f}{result['peak_kb']:>12}")
+    print(f"Reductions chosen: {dict(reductions)}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"modes": results, "reductions": dict(reductions)}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
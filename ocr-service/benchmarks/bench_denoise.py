@@ -0,0 +1,92 @@
+"""
+Preprocessing time per image class with adaptive vs unconditional denoising
+
+For each image class, times ImagePreprocessor.preprocess_image with
+OCR_DENOISE_MODE=nlm (the previous behaviour) and with ``auto``, and reports
+which denoising method ``auto`` chose.
+
+Usage:
+    python -m benchmarks.bench_denoise --synthetic 20
+    python -m benchmarks.bench_denoise --images path/to/classes
+
+An images directory holds one subdirectory per class (e.g. ``screenshot``,
+``photo``), each with slip images.
+"""
+import argparse
+import json
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import cv2
+import numpy as np
+
+from app.core.config import settings
+from app.utils.image_preprocessing import ImagePreprocessor
+from benchmarks.bench_qr_path import synthetic_slips
+from benchmarks.harness import load_dataset, measure, print_table
+
+
+def synthetic_classes(count: int) -> Dict[str, List[Tuple[str, np.ndarray, dict]]]:
+    """Clean screenshots, recompressed screenshots and camera-like photos"""
+    rng = np.random.default_rng(0)
+    classes = {"screenshot": [], "recompressed": [], "photo": [], "noisy-photo": []}
+    for name, data, _ in synthetic_slips(count):
+        clean = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+        jpeg = cv2.imdecode(cv2.imencode(".jpg", clean, [cv2.IMWRITE_JPEG_QUALITY, 75])[1], cv2.IMREAD_COLOR)
+        classes["screenshot"].append((name, clean, {}))
+        classes["recompressed"].append((name, jpeg, {}))
+        for label, sigma in (("photo", 6), ("noisy-photo", 20)):
+            noisy = cv2.GaussianBlur(clean, (3, 3), 0) + rng.normal(0, sigma, clean.shape)
+            classes[label].append((name, np.clip(noisy, 0, 255).astype(np.uint8), {}))
+    return classes
+
+
+def load_classes(directory: str) -> Dict[str, List[Tuple[str, np.ndarray, dict]]]:
+    """Decoded images of every class subdirectory"""
+    return {
+        path.name: [(name, ImagePreprocessor._to_numpy(data), {}) for name, data, _ in load_dataset(str(path))]
+        for path in sorted(Path(directory).iterdir()) if path.is_dir()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--images", help="Directory with one subdirectory of slips per class")
+    source.add_argument("--synthetic", type=int, help="Number of synthetic slips per class")
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    classes = load_classes(args.images) if args.images else synthetic_classes(args.synthetic)
+
+    results = []
+    chosen = {}
+    for label, samples in classes.items():
+        for mode in ("nlm", "auto"):
+            settings.OCR_DENOISE_MODE = mode
+            results.append(measure(
+                f"{label}/{mode}",
+                ImagePreprocessor.preprocess_image,
+                samples,
+                warmup=0,
+                score=lambda *_: None
+            ))
+
+        methods = Counter()
+        for _, image, _ in samples:
+            report = {}
+            ImagePreprocessor.preprocess_image(image, report)
+            methods[report["denoise"]] += 1
+        chosen[label] = dict(methods)
+
+    print_table(results)
+    for label, methods in chosen.items():
+        print(f"{label}: auto chose {methods}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"variants": results, "methods": chosen}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Compare OCR engines on the same slip images
+
+Measures latency, batched throughput and field extraction accuracy of every
+installed engine, including the ONNX Runtime engine in FP32 and INT8.
+
+Usage:
+    python -m benchmarks.bench_engines path/to/slips [--engines paddleocr easyocr onnx onnx-int8]
+"""
+import argparse
+import json
+
+from app.core.config import settings
+from app.services.ocr_service import OCREngine
+from app.utils.image_preprocessing import ImagePreprocessor
+from benchmarks.harness import load_dataset, measure, print_table
+
+
+VARIANTS = ["paddleocr", "easyocr", "onnx", "onnx-int8"]
+
+
+def build_engine(variant: str) -> OCREngine:
+    """Create an engine with only the variant's backend loaded"""
+    name = "onnx" if variant.startswith("onnx") else variant
+    settings.OCR_ONNX_QUANTIZE = variant == "onnx-int8"
+    engine = OCREngine(languages=settings.OCR_LANGUAGES, engines=[name])
+    if not engine.is_available():
+        raise RuntimeError(f"{variant} could not be loaded")
+    return engine
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("images", help="Directory of slip images with optional ground_truth.json")
+    parser.add_argument("--engines", nargs="+", default=VARIANTS, choices=VARIANTS)
+    parser.add_argument("--no-preprocess", action="store_true", help="Skip image preprocessing")
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    decode = ImagePreprocessor._to_numpy if args.no_preprocess else ImagePreprocessor.preprocess_image
+    samples = [(name, decode(data), expected) for name, data, expected in load_dataset(args.images)]
+    print(f"{len(samples)} images")
+
+    results = []
+    for variant in args.engines:
+        try:
+            engine = build_engine(variant)
+        except Exception as e:
+            print(f"Skipping {variant}: {e}")
+            continue
+
+        name = engine.engines[0]
+        results.append(measure(
+            variant,
+            lambda image: engine.process(image, engine=name)["text"],
+            samples,
+            run_batch=lambda images: [r["text"] for r in engine.process_batch(images, engine=name)],
+            batch_size=settings.OCR_REC_BATCH_SIZE
+        ))
+
+    print_table(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
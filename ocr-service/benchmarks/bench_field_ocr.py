@@ -0,0 +1,127 @@
+"""
+Compare field reads with and without a character allowlist
+
+Reads the same amount/time/account/reference crops with every engine, once
+restricted to the field's allowlist (FIELD_CHARSETS) and once with the full
+charset, and reports latency, exact-match rate and character accuracy.
+
+Usage:
+    python -m benchmarks.bench_field_ocr --synthetic 200 [--engines tesseract easyocr onnx paddleocr]
+    python -m benchmarks.bench_field_ocr --crops path/to/crops
+
+A crops directory holds images plus a labels.json such as
+``{"amount_01.png": {"field": "amount", "text": "1,500.00"}}``.
+"""
+import argparse
+import json
+import random
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import cv2
+import numpy as np
+
+from app.core.config import settings
+from app.services.ocr_service import OCREngine
+from app.utils.charset import constrain_to_allowlist
+from benchmarks.harness import char_accuracy, measure, print_table
+
+
+ENGINES = ["tesseract", "easyocr", "onnx", "paddleocr"]
+
+
+def _random_field(field: str, rng: random.Random) -> str:
+    if field == "amount":
+        return f"{rng.randint(1, 99999):,}.{rng.randint(0, 99):02d}"
+    if field == "time":
+        return f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}"
+    if field == "account":
+        return f"xxx-x-x{rng.randint(0, 9999):04d}-x"
+    return "".join(rng.choice("0123456789ABCDEF") for _ in range(rng.randint(12, 20)))
+
+
+def render_crop(text: str, height: int = 32) -> np.ndarray:
+    """Render a single text line the way it appears cropped from a slip"""
+    scale = height / 32
+    (width, _), _ = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, scale, 2)
+    crop = np.full((height + 16, width + 16, 3), 255, dtype=np.uint8)
+    cv2.putText(crop, text, (8, height + 4), cv2.FONT_HERSHEY_SIMPLEX, scale, (20, 20, 20), 2, cv2.LINE_AA)
+    return crop
+
+
+def synthetic_crops(count: int, seed: int = 0) -> List[Tuple[str, Dict[str, Any], Dict[str, str]]]:
+    """Random field crops with their labels"""
+    rng = random.Random(seed)
+    fields = ["amount", "time", "account", "reference"]
+    samples = []
+    for idx in range(count):
+        field = fields[idx % len(fields)]
+        text = _random_field(field, rng)
+        samples.append((f"{field}_{idx}", {"crop": render_crop(text), "field": field}, {"text": text}))
+    return samples
+
+
+def load_crops(directory: str) -> List[Tuple[str, Dict[str, Any], Dict[str, str]]]:
+    """Labelled crops from a directory with labels.json"""
+    root = Path(directory)
+    labels = json.loads((root / "labels.json").read_text())
+    return [
+        (name, {"crop": cv2.imread(str(root / name)), "field": label["field"]}, {"text": label["text"]})
+        for name, label in sorted(labels.items())
+    ]
+
+
+def field_char_accuracy(text: str, expected: Dict[str, str]) -> float:
+    """Character accuracy ignoring spaces"""
+    return char_accuracy(text.replace(" ", ""), expected["text"].replace(" ", ""))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--crops", help="Directory of labelled field crops")
+    source.add_argument("--synthetic", type=int, help="Number of synthetic crops to render")
+    parser.add_argument("--engines", nargs="+", default=ENGINES, choices=ENGINES)
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    samples = load_crops(args.crops) if args.crops else synthetic_crops(args.synthetic)
+    print(f"{len(samples)} crops")
+
+    engine = OCREngine(languages=settings.OCR_LANGUAGES, engines=args.engines)
+    reads = engine._read_funcs()
+
+    def variant(name: str, restricted: bool):
+        def read(sample: Dict[str, Any]) -> str:
+            allowlist = engine.FIELD_CHARSETS[sample["field"]] if restricted else None
+            return constrain_to_allowlist(reads[name](sample["crop"], allowlist)[0], allowlist)
+        return read
+
+    variants = {}
+    for name in args.engines:
+        variants[f"{name}-allowlist"] = variant(name, True)
+        variants[f"{name}-full"] = variant(name, False)
+
+    results = []
+    for name, read in variants.items():
+        try:
+            read(samples[0][1])
+        except Exception as e:
+            print(f"Skipping {name}: {e}")
+            continue
+
+        result = measure(name, read, samples, score=field_char_accuracy)
+        exact = [read(sample).replace(" ", "") == expected["text"].replace(" ", "") for _, sample, expected in samples]
+        result["exact_match"] = round(sum(exact) / len(exact), 3)
+        results.append(result)
+
+    print_table(results)
+    for result in results:
+        print(f"{result['variant']}: exact match {result['exact_match']:.1%}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Compare PaddleOCR's per-line angle classifier with the page orientation check
+
+Measures latency, throughput and field accuracy of PaddleOCR with
+``use_angle_cls`` on every text line against a single thumbnail orientation
+check per page (OCR_ORIENTATION_CHECK) with the line classifier off. Also
+reports how often the orientation check recovers slips rotated by 90, 180 and
+270 degrees, and how long it takes.
+
+Usage:
+    python -m benchmarks.bench_orientation path/to/upright/slips [--no-preprocess]
+"""
+import argparse
+import json
+import time
+
+import cv2
+import numpy as np
+
+from app.core.config import settings
+from app.services.ocr_service import OCREngine
+from app.utils.image_preprocessing import ImagePreprocessor
+from benchmarks.harness import load_dataset, measure, print_table
+
+
+ROTATIONS = {90: cv2.ROTATE_90_CLOCKWISE, 180: cv2.ROTATE_180, 270: cv2.ROTATE_90_COUNTERCLOCKWISE}
+
+
+def orientation_accuracy(images) -> dict:
+    """Detection accuracy and mean time over every image at every rotation"""
+    correct, total, seconds = 0, 0, 0.0
+    for image in images:
+        for angle in (0, *ROTATIONS):
+            rotated = image if angle == 0 else cv2.rotate(image, ROTATIONS[angle])
+            started = time.perf_counter()
+            detected = ImagePreprocessor.detect_orientation(rotated)
+            seconds += time.perf_counter() - started
+            correct += detected == angle
+            total += 1
+    return {
+        "accuracy": round(correct / max(total, 1), 3),
+        "mean_ms": round(seconds / max(total, 1) * 1000, 2)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("images", help="Directory of upright slip images with optional ground_truth.json")
+    parser.add_argument("--no-preprocess", action="store_true", help="Skip image preprocessing")
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    samples = load_dataset(args.images)
+    decoded = [ImagePreprocessor._to_numpy(data) for _, data, _ in samples]
+    print(f"{len(samples)} slips")
+
+    orientation = orientation_accuracy(decoded)
+    print(f"Orientation check: {orientation['accuracy']:.1%} correct, {orientation['mean_ms']} ms per page")
+
+    def prepare(image: np.ndarray, check: bool) -> np.ndarray:
+        if check:
+            image = ImagePreprocessor.correct_orientation(image)
+        return image if args.no_preprocess else ImagePreprocessor.preprocess_image(image)
+
+    results = []
+    for name, angle_cls in (("angle-cls", True), ("orientation-check", False)):
+        settings.OCR_ANGLE_CLS = angle_cls
+        engine = OCREngine(languages=settings.OCR_LANGUAGES, engines=["paddleocr"])
+        if not engine.is_available():
+            print("PaddleOCR is not available")
+            return
+
+        inputs = [(file_name, image, expected) for (file_name, _, expected), image in zip(samples, decoded)]
+        results.append(measure(
+            name,
+            lambda image: engine.process_with_paddle(prepare(image, not angle_cls))[0],
+            inputs
+        ))
+
+    print_table(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"orientation": orientation, "variants": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
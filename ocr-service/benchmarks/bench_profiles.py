@@ -0,0 +1,92 @@
+"""
+Per-step cost of each preprocessing profile, and what each step is worth
+
+Runs every profile in OCR_PREPROCESS_PROFILES, plus the default profile with
+each of its steps left out in turn, over the same slips. Reports the mean
+time and peak Python allocations of every step. With an OCR engine available
+it also reports OCR latency and field accuracy per variant, so steps whose
+removal costs no accuracy can be dropped from the profile.
+
+Usage:
+    python -m benchmarks.bench_profiles path/to/slips [--engines paddleocr] [--no-ablation]
+"""
+import argparse
+import json
+from collections import defaultdict
+from typing import Any, Dict, List
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.ocr_service import OCREngine
+from app.utils.image_preprocessing import ImagePreprocessor
+from benchmarks.harness import load_dataset, measure, print_table
+
+
+def variants(ablation: bool) -> Dict[str, List[Dict[str, Any]]]:
+    """Every configured profile, and the default profile without each of its steps"""
+    found = {name: ImagePreprocessor.resolve_steps(name) for name in settings.OCR_PREPROCESS_PROFILES}
+    if ablation:
+        default = ImagePreprocessor.resolve_steps(settings.OCR_PREPROCESS_PROFILE)
+        for idx, spec in enumerate(default):
+            found[f"-{spec['step']}"] = default[:idx] + default[idx + 1:]
+    return found
+
+
+def step_costs(images: List[np.ndarray], steps: List[Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+    """Mean milliseconds and peak kilobytes allocated per step"""
+    totals: Dict[str, Dict[str, float]] = defaultdict(lambda: {"ms": 0.0, "peak_kb": 0.0})
+    for image in images:
+        report = {}
+        ImagePreprocessor.preprocess_image(image, report, steps=steps)
+        for timing in report["steps"]:
+            totals[timing["step"]]["ms"] += timing["ms"]
+            totals[timing["step"]]["peak_kb"] += timing["peak_bytes"] / 1024
+    count = max(len(images), 1)
+    return {
+        step: {key: round(value / count, 2) for key, value in total.items()}
+        for step, total in totals.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("images", help="Directory of slip images with optional ground_truth.json")
+    parser.add_argument("--engines", nargs="+", default=settings.OCR_ENGINES)
+    parser.add_argument("--no-ablation", action="store_true", help="Only run the configured profiles")
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    samples = load_dataset(args.images)
+    decoded = [(name, ImagePreprocessor._to_numpy(data), expected) for name, data, expected in samples]
+    print(f"{len(samples)} slips")
+
+    engine = OCREngine(languages=settings.OCR_LANGUAGES, engines=args.engines)
+    has_engine = engine.is_available()
+    if not has_engine:
+        print(f"No OCR engine available from {args.engines}, reporting step costs only")
+
+    settings.OCR_PREPROCESS_TRACE_MEMORY = True
+    costs, results = {}, []
+    for name, steps in variants(not args.no_ablation).items():
+        costs[name] = step_costs([image for _, image, _ in decoded], steps)
+        print(f"\n{name}")
+        print(f"  {'step':<20}{'ms':>10}{'peak KB':>12}")
+        for step, cost in costs[name].items():
+            print(f"  {step:<20}{cost['ms']:>10.1f}{cost['peak_kb']:>12.0f}")
+        if has_engine:
+            results.append(measure(
+                name,
+                lambda image: engine.process(ImagePreprocessor.preprocess_image(image, steps=steps))["text"],
+                decoded
+            ))
+
+    if results:
+        print_table(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"step_costs": costs, "variants": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Compare the QR fast path with full-image OCR on the same slips
+
+Reads every slip once through the QR code only (decode, parse, CRC check)
+and once through preprocessing and full-image OCR, and reports the latency
+of each, the share of slips whose QR code was usable and the latency saved
+per slip.
+
+Usage:
+    python -m benchmarks.bench_qr_path --synthetic 50 [--engines paddleocr]
+    python -m benchmarks.bench_qr_path --images path/to/slips
+
+Slip directories may hold a ``ground_truth.json`` (see benchmarks.harness);
+fields are compared with the ones each path extracts.
+"""
+import argparse
+import json
+import random
+from typing import Any, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from app.core.config import settings
+from app.services.ocr_service import OCREngine
+from app.services.pipeline import read_slip_qr
+from app.utils.data_extraction import DataExtractor
+from app.utils.image_preprocessing import ImagePreprocessor
+from app.utils.qr_payload import crc16_ccitt, trusted_fields
+from benchmarks.harness import load_dataset, measure, print_table
+
+
+def slip_qr_payload(bank_id: str, reference: str) -> str:
+    """Slip verification mini QR payload with a valid CRC"""
+    header = f"0006000001" f"0103{bank_id}" f"02{len(reference):02d}{reference}"
+    body = f"00{len(header):02d}{header}" "5102TH" "9104"
+    return body + crc16_ccitt(body)
+
+
+def synthetic_slips(count: int, seed: int = 0) -> List[Tuple[str, bytes, Dict[str, Any]]]:
+    """Rendered slips with amount and reference lines and a slip QR code"""
+    rng = random.Random(seed)
+    encoder = cv2.QRCodeEncoder.create()
+    samples = []
+    for idx in range(count):
+        amount = f"{rng.randint(1, 99999):,}.{rng.randint(0, 99):02d}"
+        reference = "".join(rng.choice("0123456789ABCDEF") for _ in range(20))
+        slip = np.full((1400, 700, 3), 255, dtype=np.uint8)
+        slip[:120] = (80, 160, 0)
+        for row, line in enumerate([f"Amount: {amount} THB", f"Ref: {reference}", "Transfer completed"]):
+            cv2.putText(slip, line, (40, 260 + 70 * row), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (20, 20, 20), 2, cv2.LINE_AA)
+
+        qr = encoder.encode(slip_qr_payload(rng.choice(["004", "014", "002"]), reference))
+        qr = cv2.resize(qr, None, fx=6, fy=6, interpolation=cv2.INTER_NEAREST)
+        top, left = 900, (700 - qr.shape[1]) // 2
+        slip[top:top + qr.shape[0], left:left + qr.shape[1]] = qr[:, :, None]
+
+        samples.append((f"slip_{idx}", cv2.imencode(".png", slip)[1].tobytes(), {"reference_number": reference}))
+    return samples
+
+
+def fields_accuracy(fields: Optional[Dict[str, Any]], expected: Dict[str, Any]) -> Optional[float]:
+    """Share of expected fields matching the extracted ones"""
+    if not expected:
+        return None
+    fields = fields or {}
+    correct = 0
+    for field, value in expected.items():
+        actual = fields.get(field)
+        if isinstance(actual, dict):
+            actual = actual.get("code")
+        if isinstance(value, float) and actual is not None:
+            correct += abs(float(actual) - value) < 0.005
+        else:
+            correct += actual == value
+    return correct / len(expected)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--images", help="Directory of slip images with optional ground_truth.json")
+    source.add_argument("--synthetic", type=int, help="Number of synthetic slips to render")
+    parser.add_argument("--engines", nargs="+", default=settings.OCR_ENGINES)
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    samples = load_dataset(args.images) if args.images else synthetic_slips(args.synthetic)
+    print(f"{len(samples)} slips")
+
+    def qr_path(image_data: bytes) -> Optional[Dict[str, Any]]:
+        parsed = read_slip_qr(None, image_data)
+        if not parsed or not parsed["crc_valid"]:
+            return None
+        return trusted_fields(parsed) or None
+
+    results = [measure("qr", qr_path, samples, score=fields_accuracy)]
+    usable = [qr_path(image_data) is not None for _, image_data, _ in samples]
+
+    engine = OCREngine(languages=settings.OCR_LANGUAGES, engines=args.engines)
+    if engine.is_available():
+        def full_ocr(image_data: bytes) -> Dict[str, Any]:
+            text = engine.process(ImagePreprocessor.preprocess_image(image_data))["text"]
+            return DataExtractor.extract_all(text)
+
+        results.append(measure("full-ocr", full_ocr, samples, score=fields_accuracy))
+    else:
+        print(f"No OCR engine available from {args.engines}, skipping full-image OCR")
+
+    print_table(results)
+    print(f"QR code usable on {sum(usable) / max(len(usable), 1):.1%} of slips")
+    if len(results) == 2:
+        saved = results[1]["latency_ms"]["p50"] - results[0]["latency_ms"]["p50"]
+        print(f"Latency saved per slip answered from its QR code: {saved:.1f} ms (p50)")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
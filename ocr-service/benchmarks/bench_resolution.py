@@ -0,0 +1,90 @@
+"""
+Stage timings and OCR accuracy with and without the resolution bound
+
+Runs every preprocessing stage on each slip, once at its original size and
+once bounded by OCR_MAX_LONG_EDGE / OCR_MAX_PIXELS, and reports the mean time
+per stage. With an OCR engine available it also reports end-to-end latency
+and field accuracy for both.
+
+Usage:
+    python -m benchmarks.bench_resolution path/to/slips [--engines paddleocr] [--long-edge 2400]
+"""
+import argparse
+import json
+import time
+from collections import defaultdict
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.ocr_service import OCREngine
+from app.utils.image_preprocessing import ImagePreprocessor
+from benchmarks.harness import load_dataset, measure, print_table
+
+
+# Preprocessing stages in pipeline order (see ImagePreprocessor.preprocess_image)
+STAGES: List[Tuple[str, Callable[[np.ndarray], np.ndarray]]] = [
+    ("limit_resolution", ImagePreprocessor.limit_resolution),
+    ("grayscale", ImagePreprocessor.grayscale),
+    ("denoise", lambda image: ImagePreprocessor.denoise(image, ImagePreprocessor.select_denoise(image)[0])),
+    ("deskew", ImagePreprocessor.deskew),
+    ("threshold", ImagePreprocessor.threshold),
+    ("remove_borders", ImagePreprocessor.remove_borders),
+    ("enhance_contrast", ImagePreprocessor.enhance_contrast),
+]
+
+
+def stage_timings(images: List[np.ndarray]) -> Dict[str, float]:
+    """Mean milliseconds per preprocessing stage"""
+    totals: Dict[str, float] = defaultdict(float)
+    for image in images:
+        for name, stage in STAGES:
+            started = time.perf_counter()
+            image = stage(image)
+            totals[name] += time.perf_counter() - started
+    return {name: round(total / max(len(images), 1) * 1000, 2) for name, total in totals.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("images", help="Directory of slip images with optional ground_truth.json")
+    parser.add_argument("--engines", nargs="+", default=settings.OCR_ENGINES)
+    parser.add_argument("--long-edge", type=int, default=settings.OCR_MAX_LONG_EDGE)
+    parser.add_argument("--max-pixels", type=int, default=settings.OCR_MAX_PIXELS)
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    samples = load_dataset(args.images)
+    decoded = [(name, ImagePreprocessor._to_numpy(data), expected) for name, data, expected in samples]
+    print(f"{len(samples)} slips")
+
+    bounds = {"full": (0, 0), "bounded": (args.long_edge, args.max_pixels)}
+    engine = OCREngine(languages=settings.OCR_LANGUAGES, engines=args.engines)
+    has_engine = engine.is_available()
+    if not has_engine:
+        print(f"No OCR engine available from {args.engines}, reporting stage timings only")
+
+    timings, results = {}, []
+    for name, (long_edge, max_pixels) in bounds.items():
+        settings.OCR_MAX_LONG_EDGE, settings.OCR_MAX_PIXELS = long_edge, max_pixels
+        timings[name] = stage_timings([image for _, image, _ in decoded])
+        if has_engine:
+            results.append(measure(
+                name,
+                lambda image: engine.process(ImagePreprocessor.preprocess_image(image))["text"],
+                decoded
+            ))
+
+    print(f"{'stage':<20}{'full ms':>12}{'bounded ms':>12}")
+    for stage, _ in STAGES:
+        print(f"{stage:<20}{timings['full'][stage]:>12.1f}{timings['bounded'][stage]:>12.1f}")
+    if results:
+        print_table(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"stage_ms": timings, "variants": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Shared harness for OCR benchmarks
+
+A benchmark dataset is a directory of slip images plus an optional
+``ground_truth.json`` mapping each file name to the expected extracted
+fields, e.g.::
+
+    {"slip_001.jpg": {"amount": 1500.0, "reference_number": "0123456789"}}
+"""
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.utils.data_extraction import DataExtractor
+from app.utils.rolling_stats import RollingWindow
+
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png"}
+
+
+def load_dataset(directory: str) -> List[Tuple[str, bytes, Dict[str, Any]]]:
+    """
+    Load benchmark images and their expected fields
+
+    Args:
+        directory: Dataset directory
+
+    Returns:
+        List of (file name, image bytes, expected fields)
+    """
+    root = Path(directory)
+    truth_path = root / "ground_truth.json"
+    truth = json.loads(truth_path.read_text()) if truth_path.exists() else {}
+
+    return [
+        (path.name, path.read_bytes(), truth.get(path.name, {}))
+        for path in sorted(root.iterdir())
+        if path.suffix.lower() in IMAGE_EXTENSIONS
+    ]
+
+
+def field_accuracy(text: str, expected: Dict[str, Any]) -> Optional[float]:
+    """
+    Share of expected fields extracted correctly from OCR text
+
+    Args:
+        text: Recognized text
+        expected: Expected field values
+
+    Returns:
+        Fraction of matching fields, or None without ground truth
+    """
+    if not expected:
+        return None
+
+    extracted = DataExtractor.extract_all(text)
+    correct = 0
+    for field, value in expected.items():
+        actual = extracted.get(field)
+        if isinstance(actual, dict):
+            actual = actual.get("code")
+        if isinstance(value, float) and actual is not None:
+            correct += abs(float(actual) - value) < 0.005
+        else:
+            correct += actual == value
+    return correct / len(expected)
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Levenshtein distance between two strings"""
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b)
+            ))
+        previous = current
+    return previous[-1]
+
+
+def char_accuracy(text: str, expected: str) -> float:
+    """Character accuracy, 1 - edit distance / expected length"""
+    if not expected:
+        return float(not text)
+    return max(0.0, 1 - edit_distance(text, expected) / len(expected))
+
+
+def measure(
+    name: str,
+    run: Callable[[Any], str],
+    samples: List[Tuple[str, Any, Dict[str, Any]]],
+    warmup: int = 1,
+    concurrency: int = 1,
+    run_batch: Optional[Callable[[List[Any]], List[str]]] = None,
+    batch_size: int = 8,
+    score: Callable[[str, Any], Optional[float]] = field_accuracy
+) -> Dict[str, Any]:
+    """
+    Benchmark one variant over the samples
+
+    Latency and accuracy come from a sequential pass; throughput from a
+    second pass, batched through ``run_batch`` if given, otherwise with
+    ``concurrency`` parallel callers.
+
+    Args:
+        name: Variant name
+        run: Callable taking a sample input and returning recognized text
+        samples: List of (file name, input, expected output)
+        warmup: Number of untimed calls before measuring
+        concurrency: Parallel callers in the throughput pass
+        run_batch: Optional callable recognizing a list of inputs at once
+        batch_size: Inputs per run_batch call
+        score: Accuracy of recognized text against the expected output
+            (defaults to field extraction accuracy)
+
+    Returns:
+        Dictionary with latency summary (ms), throughput and accuracy
+    """
+    for _, sample, _ in samples[:warmup]:
+        run(sample)
+
+    latencies = RollingWindow(maxlen=max(len(samples), 1))
+    accuracies = []
+    for _, sample, expected in samples:
+        started = time.perf_counter()
+        text = run(sample)
+        latencies.add(time.perf_counter() - started)
+        accuracy = score(text, expected)
+        if accuracy is not None:
+            accuracies.append(accuracy)
+
+    inputs = [sample for _, sample, _ in samples]
+    started = time.perf_counter()
+    if run_batch is not None:
+        for start in range(0, len(inputs), batch_size):
+            run_batch(inputs[start:start + batch_size])
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(run, inputs))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "variant": name,
+        "latency_ms": latencies.summary(scale=1000),
+        "throughput_per_s": round(len(samples) / elapsed, 2) if elapsed > 0 else None,
+        "field_accuracy": round(float(np.mean(accuracies)), 3) if accuracies else None
+    }
+
+
+def print_table(results: List[Dict[str, Any]]):
+    """Print benchmark results as an aligned table"""
+    header = f"{'variant':<24}{'p50 ms':>10}{'p95 ms':>10}{'img/s':>10}{'accuracy':>10}"
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        latency = result["latency_ms"]
+        accuracy = result["field_accuracy"]
+        print(
+            f"{result['variant']:<24}"
+            f"{latency['p50']:>10.1f}{latency['p95']:>10.1f}"
+            f"{result['throughput_per_s'] or 0:>10.2f}"
+            f"{accuracy if accuracy is not None else '-':>10}"
+        )
@@ -0,0 +1,11 @@
+import pytest
+
+from app.services.engine_router import engine_router
+
+
+@pytest.fixture(autouse=True)
+def reset_engine_router():
+    """Start every test with closed circuits and no engine statistics"""
+    engine_router.reset()
+    yield
+    engine_router.reset()
@@ -0,0 +1,145 @@
+import cv2
+import numpy as np
+import pytest
+from unittest.mock import MagicMock, patch
+
+from app.core.config import settings
+from app.services.bank_classifier import BankClassifier, color_features
+from app.services.pipeline import classify_slip
+from app.services.processing_service import ProcessingService
+
+
+def render_slip(header_rgb, width=540, height=960) -> np.ndarray:
+    """White slip with a coloured header band and a few text lines"""
+    image = np.full((height, width, 3), 255, dtype=np.uint8)
+    image[:height // 10] = header_rgb[::-1]
+    for y in range(height // 4, height * 3 // 4, 60):
+        cv2.putText(image, "Amount 1,500.00", (40, y), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (30, 30, 30), 2)
+    return image
+
+
+KBANK_GREEN = (0x00, 0xA9, 0x50)
+SCB_PURPLE = (0x4E, 0x2A, 0x84)
+
+
+@pytest.fixture
+def classifier(tmp_path):
+    cv2.imwrite(str(tmp_path / "KBANK_2023_01.png"), render_slip(KBANK_GREEN))
+    cv2.imwrite(str(tmp_path / "SCB_2023_01.png"), render_slip(SCB_PURPLE))
+    cv2.imwrite(str(tmp_path / "unlabelled.png"), render_slip((0, 0, 0)))
+    return BankClassifier(str(tmp_path), use_templates=False)
+
+
+class TestBankClassifier:
+    """Test thumbnail colour-histogram classification"""
+    
+    def test_features_are_normalized(self):
+        """Test that every band histogram sums to 1"""
+        features = color_features(render_slip(KBANK_GREEN))
+        assert features.shape[0] == 3
+        assert np.allclose(features.sum(axis=1), 1.0)
+    
+    def test_references_loaded_by_name(self, classifier):
+        """Test that reference slips are labelled from their file names"""
+        assert sorted((p.bank, p.layout) for p in classifier.prototypes) == [("KBANK", "2023"), ("SCB", "2023")]
+    
+    def test_identifies_bank(self, classifier):
+        """Test that slips are classified confidently, also at another resolution"""
+        prediction = classifier.classify(cv2.resize(render_slip(SCB_PURPLE), (135, 240)))
+        
+        assert (prediction.bank, prediction.layout) == ("SCB", "2023")
+        assert prediction.confidence > 0.9
+    
+    def test_unknown_bank_low_confidence(self, classifier):
+        """Test that an unfamiliar colour scheme gets a low confidence"""
+        prediction = classifier.classify(render_slip((0xE0, 0x20, 0x20)))
+        assert prediction.confidence < settings.OCR_CLASSIFIER_MIN_CONFIDENCE
+    
+    def test_template_prototypes(self, tmp_path):
+        """Test that slip templates provide prototypes without reference images"""
+        classifier = BankClassifier(str(tmp_path / "missing"))
+        
+        prediction = classifier.classify(render_slip(KBANK_GREEN))
+        
+        assert prediction.bank == "KBANK"
+        assert prediction.confidence > settings.OCR_CLASSIFIER_MIN_CONFIDENCE
+    
+    def test_classify_slip_job(self, classifier):
+        """Test the worker job on encoded bytes decoded at reduced resolution"""
+        _, encoded = cv2.imencode(".jpg", render_slip(KBANK_GREEN))
+        
+        with patch("app.services.pipeline.get_bank_classifier", return_value=classifier):
+            prediction = classify_slip(None, encoded.tobytes())
+        
+        assert prediction["bank"] == "KBANK"
+        assert classify_slip(None, b"not an image") is None
+
+
+class TestProcessingServiceClassifier:
+    """Test how the classification is used by the processing service"""
+    
+    @pytest.mark.asyncio
+    @patch('app.services.processing_service.classify_slip')
+    @patch('app.services.processing_service.get_ocr_engine')
+    async def test_confident_prediction_fills_missing_bank(self, mock_get_engine, mock_classify):
+        """Test that a confident prediction sets the bank when the text names none"""
+        mock_engine = MagicMock()
+        mock_engine.process.return_value = {
+            "text": "โอนเงินสำเร็จ\nจำนวนเงิน 100.00 บาท", "confidence": 0.9,
+            "engine": "paddleocr", "processing_time": 0.5
+        }
+        mock_get_engine.return_value = mock_engine
+        mock_classify.return_value = {"bank": "SCB", "layout": "2023", "confidence": 0.95, "similarity": 0.97}
+        
+        with patch.object(settings, "OCR_CLASSIFIER_ENABLED", True), \
+                patch('app.services.pipeline.ImagePreprocessor') as mock_preprocessor:
+            mock_preprocessor.preprocess_image.return_value = np.ones((100, 100), dtype=np.uint8)
+            result = await ProcessingService().process_image(image_data=b"slip")
+        
+        assert result.extracted_data.bank.code == "SCB"
+        assert result.classification["bank_source"] == "classifier"
+        assert result.classification["bank_agrees"] is None
+    
+    @pytest.mark.asyncio
+    @patch('app.services.processing_service.classify_slip')
+    @patch('app.services.processing_service.get_ocr_engine')
+    async def test_text_bank_wins_over_disagreeing_prediction(self, mock_get_engine, mock_classify):
+        """Test that a confident prediction does not override the bank named in the text"""
+        mock_engine = MagicMock()
+        mock_engine.process.return_value = {
+            "text": "Bangkok Bank\nจำนวนเงิน 100.00 บาท", "confidence": 0.9,
+            "engine": "paddleocr", "processing_time": 0.5
+        }
+        mock_get_engine.return_value = mock_engine
+        mock_classify.return_value = {"bank": "KBANK", "layout": "2023", "confidence": 0.98, "similarity": 0.99}
+        
+        with patch.object(settings, "OCR_CLASSIFIER_ENABLED", True), \
+                patch('app.services.pipeline.ImagePreprocessor') as mock_preprocessor:
+            mock_preprocessor.preprocess_image.return_value = np.ones((100, 100), dtype=np.uint8)
+            result = await ProcessingService().process_image(image_data=b"slip")
+        
+        assert result.extracted_data.bank.code == "BBL"
+        assert result.classification["bank_source"] == "text"
+        assert result.classification["bank_agrees"] is False
+    
+    @pytest.mark.asyncio
+    @patch('app.services.processing_service.classify_slip')
+    @patch('app.services.processing_service.get_ocr_engine')
+    async def test_low_confidence_falls_back_to_text(self, mock_get_engine, mock_classify):
+        """Test that the OCR text decides the bank when the classifier is unsure"""
+        mock_engine = MagicMock()
+        mock_engine.process.return_value = {
+            "text": "Bangkok Bank\nจำนวนเงิน 100.00 บาท", "confidence": 0.9,
+            "engine": "paddleocr", "processing_time": 0.5
+        }
+        mock_get_engine.return_value = mock_engine
+        mock_classify.return_value = {"bank": "SCB", "layout": "2023", "confidence": 0.3, "similarity": 0.7}
+        
+        with patch.object(settings, "OCR_CLASSIFIER_ENABLED", True), \
+                patch('app.services.pipeline.ImagePreprocessor') as mock_preprocessor:
+            mock_preprocessor.preprocess_image.return_value = np.ones((100, 100), dtype=np.uint8)
+            result = await ProcessingService().process_image(image_data=b"slip")
+        
+        assert result.extracted_data.bank.code == "BBL"
+        assert result.classification["bank_source"] == "text"
+        assert result.classification["confidence"] == 0.3
@@ -0,0 +1,110 @@
+import pytest
+import asyncio
+import numpy as np
+from unittest.mock import MagicMock
+
+from app.services.batch_scheduler import MicroBatchScheduler
+from app.services.worker_pool import OCRWorkerPool
+from app.utils.rolling_stats import RollingWindow
+
+
+def _make_engine():
+    """Create a mock engine echoing each image's marker pixel"""
+    engine = MagicMock()
+    engine.process.side_effect = lambda image, **kwargs: {
+        "text": str(image[0, 0]), "confidence": 0.9, "engine": "paddleocr", "processing_time": 0.0
+    }
+    engine.process_batch.side_effect = lambda images, **kwargs: [
+        {"text": str(image[0, 0]), "confidence": 0.9, "engine": "paddleocr", "processing_time": 0.0}
+        for image in images
+    ]
+    return engine
+
+
+class TestMicroBatchScheduler:
+    """Test cross-request micro-batching"""
+    
+    @pytest.fixture
+    def engine(self):
+        return _make_engine()
+    
+    @pytest.fixture
+    def pool(self, engine):
+        pool = OCRWorkerPool(engine_factory=lambda: engine, workers=1, mode="thread")
+        yield pool
+        pool.shutdown()
+    
+    @staticmethod
+    def _image(marker):
+        return np.full((10, 10), marker, dtype=np.uint8)
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_batched(self, pool, engine):
+        """Test that concurrent requests run as one batch and results are routed back"""
+        scheduler = MicroBatchScheduler(pool, window_ms=50, max_batch=8)
+        
+        results = await asyncio.gather(*[scheduler.submit(self._image(i)) for i in range(3)])
+        
+        assert [result["text"] for result in results] == ["0", "1", "2"]
+        engine.process_batch.assert_called_once()
+        assert scheduler.stats()["batch_size_histogram"] == {3: 1}
+    
+    @pytest.mark.asyncio
+    async def test_max_batch_flushes_immediately(self, pool, engine):
+        """Test that a full batch is dispatched without waiting for the window"""
+        scheduler = MicroBatchScheduler(pool, window_ms=10_000, max_batch=2)
+        
+        results = await asyncio.wait_for(
+            asyncio.gather(scheduler.submit(self._image(1)), scheduler.submit(self._image(2))),
+            timeout=5
+        )
+        
+        assert [result["text"] for result in results] == ["1", "2"]
+    
+    @pytest.mark.asyncio
+    async def test_single_request_uses_single_path(self, pool, engine):
+        """Test that a lone request skips the batched engine call"""
+        scheduler = MicroBatchScheduler(pool, window_ms=1, max_batch=8)
+        
+        result = await scheduler.submit(self._image(7))
+        
+        assert result["text"] == "7"
+        engine.process.assert_called_once()
+        engine.process_batch.assert_not_called()
+        assert scheduler.stats()["queue_wait_ms"]["count"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_failure_propagates_to_all_requests(self, pool, engine):
+        """Test that a failed batch fails every awaiting request"""
+        engine.process_batch.side_effect = RuntimeError("boom")
+        scheduler = MicroBatchScheduler(pool, window_ms=20, max_batch=8)
+        
+        results = await asyncio.gather(
+            scheduler.submit(self._image(1)),
+            scheduler.submit(self._image(2)),
+            return_exceptions=True
+        )
+        
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+
+class TestRollingWindow:
+    """Test rolling statistics window"""
+    
+    def test_summary(self):
+        """Test summary statistics"""
+        window = RollingWindow(maxlen=10)
+        for value in range(1, 11):
+            window.add(value)
+        
+        summary = window.summary()
+        assert summary["count"] == 10
+        assert summary["mean"] == 5.5
+        assert summary["p50"] == 5
+        assert summary["max"] == 10
+    
+    def test_empty(self):
+        """Test empty window"""
+        window = RollingWindow()
+        assert window.percentile(95) is None
+        assert window.summary()["mean"] is None
@@ -0,0 +1,21 @@
+from app.utils.charset import FIELD_CHARSETS, constrain_to_allowlist
+
+
+class TestConstrainToAllowlist:
+    """Test mapping recognized text onto a character allowlist"""
+    
+    def test_maps_look_alikes(self):
+        """Test that O/0 and l/1 confusions are corrected in numeric fields"""
+        assert constrain_to_allowlist("l4;3O", FIELD_CHARSETS["time"]) == "14:30"
+    
+    def test_drops_other_characters(self):
+        """Test that characters without an allowed look-alike are removed"""
+        assert constrain_to_allowlist("฿ 1,500.00 บาท", FIELD_CHARSETS["amount"]) == "1,500.00"
+    
+    def test_allowed_characters_kept(self):
+        """Test that allowed letters are not mapped to digits"""
+        assert constrain_to_allowlist("AB0O12", FIELD_CHARSETS["reference"]) == "AB0O12"
+    
+    def test_no_allowlist(self):
+        """Test that text is unchanged without an allowlist"""
+        assert constrain_to_allowlist("Ref: l0O", None) == "Ref: l0O"
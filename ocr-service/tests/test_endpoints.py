@@ -117,6 +117,37 @@ class TestProcessEndpoint:
         )
         
         assert response.status_code == 200
+    
+    @patch('app.api.endpoints.get_processing_service')
+    def test_process_with_preprocess_steps(self, mock_get_service, sample_image_bytes):
+        """Test that requested preprocessing steps are passed to the service"""
+        mock_service = MagicMock()
+        mock_result = MagicMock()
+        mock_result.job_id = "test-job-789"
+        mock_result.status = ProcessingStatus.COMPLETED
+        
+        mock_service.process_image = AsyncMock(return_value=mock_result)
+        mock_get_service.return_value = mock_service
+        
+        response = client.post(
+            "/api/ocr/process",
+            files={"file": ("test.jpg", sample_image_bytes, "image/jpeg")},
+            data={"preprocess_steps": "limit_resolution, grayscale"}
+        )
+        
+        assert response.status_code == 200
+        kwargs = mock_service.process_image.call_args.kwargs
+        assert kwargs["preprocess_steps"] == ["limit_resolution", "grayscale"]
+    
+    @pytest.mark.parametrize("data", [{"preprocess_profile": "missing"}, {"preprocess_steps": "grayscale,sharpen"}])
+    def test_process_unknown_preprocessing(self, data, sample_image_bytes):
+        """Test that unknown preprocessing profiles and steps are rejected"""
+        response = client.post(
+            "/api/ocr/process",
+            files={"file": ("test.jpg", sample_image_bytes, "image/jpeg")},
+            data=data
+        )
+        assert response.status_code == 400
 
 
 class TestStatusEndpoint:
@@ -247,3 +278,57 @@ class TestBatchEndpoint:
         assert "batch_id" in data
         assert "job_ids" in data
         assert data["total"] == 3
+
+
+class TestMetricsEndpoint:
+    """Test /api/ocr/metrics endpoint"""
+    
+    def test_metrics_worker_pool(self):
+        """Test metrics endpoint reports worker pool state"""
+        response = client.get("/api/ocr/metrics")
+        assert response.status_code == 200
+        
+        data = response.json()
+        assert "queue_depth" in data["worker_pool"]
+        assert "busy_workers" in data["worker_pool"]
+
+
+class TestDiagnosticsEndpoint:
+    """Test /api/ocr/diagnostics endpoint"""
+    
+    def test_diagnostics_threading(self):
+        """Test diagnostics endpoint reports effective thread settings"""
+        response = client.get("/api/ocr/diagnostics")
+        assert response.status_code == 200
+        
+        threading_info = response.json()["threading"]
+        assert threading_info["threads"] >= 1
+        assert threading_info["cpu_limit"] > 0
+        assert threading_info["libraries"]["opencv"] == threading_info["threads"]
+        assert "OMP_NUM_THREADS" in threading_info["environment"]
+
+
+class TestReadinessProbe:
+    """Test /health/ready gating on warm-up"""
+    
+    @patch('app.api.health._ocr_available', return_value=True)
+    def test_not_ready_during_warmup(self, mock_available):
+        """Test readiness is 503 until warm-up finishes, then 200"""
+        from app.services.warmup import WarmupState
+        
+        state = WarmupState()
+        with patch('app.api.health.warmup_state', state):
+            response = client.get("/health/ready")
+            assert response.status_code == 503
+            assert response.json()["status"] == "not_ready"
+            
+            state.start()
+            state.finish()
+            response = client.get("/health/ready")
+            assert response.status_code == 200
+            assert response.json()["status"] == "ready"
+    
+    def test_liveness(self):
+        """Test liveness does not depend on warm-up"""
+        response = client.get("/health/live")
+        assert response.status_code == 200
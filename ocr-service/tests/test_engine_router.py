@@ -0,0 +1,126 @@
+import pytest
+import numpy as np
+from unittest.mock import MagicMock
+
+from app.services import engine_router as router_module
+from app.services.engine_router import EngineRouter, engine_router
+from app.services.ocr_service import OCREngine
+
+
+@pytest.fixture
+def router(monkeypatch):
+    """Router with small windows and a controllable clock"""
+    monkeypatch.setattr(router_module.settings, "OCR_CIRCUIT_WINDOW", 10)
+    monkeypatch.setattr(router_module.settings, "OCR_CIRCUIT_MIN_CALLS", 5)
+    monkeypatch.setattr(router_module.settings, "OCR_CIRCUIT_ERROR_RATE", 0.5)
+    monkeypatch.setattr(router_module.settings, "OCR_CIRCUIT_SLOW_RATIO", 3.0)
+    monkeypatch.setattr(router_module.settings, "OCR_CIRCUIT_COOLDOWN", 30)
+    monkeypatch.setattr(router_module.settings, "OCR_ROUTER_STRATEGY", "priority")
+    
+    clock = {"now": 1000.0}
+    router = EngineRouter(clock=lambda: clock["now"])
+    router.clock = clock
+    return router
+
+
+class TestCircuitBreaker:
+    """Test circuit state transitions"""
+    
+    def test_opens_on_error_rate(self, router):
+        """Test that a mostly failing engine is taken out of rotation"""
+        for _ in range(5):
+            router.record_failure("paddleocr")
+        
+        assert router.stats()["engines"]["paddleocr"]["state"] == "open"
+        assert router.order(["paddleocr", "easyocr"]) == ["easyocr"]
+    
+    def test_stays_closed_below_min_calls(self, router):
+        """Test that a few early failures do not trip the circuit"""
+        for _ in range(4):
+            router.record_failure("paddleocr")
+        assert router.available("paddleocr")
+    
+    def test_opens_when_far_slower_than_usual(self, router):
+        """Test that a sudden slowdown trips the circuit"""
+        for _ in range(20):
+            router.record_success("paddleocr", 0.1, 0.9)
+        for _ in range(10):
+            router.record_success("paddleocr", 1.0, 0.9)
+        
+        stats = router.stats()["engines"]["paddleocr"]
+        assert stats["state"] == "open"
+        assert "slower" in stats["open_reason"]
+    
+    def test_probe_after_cooldown_closes(self, router):
+        """Test that one probe is let through after the cooldown and closes on success"""
+        for _ in range(5):
+            router.record_failure("paddleocr")
+        
+        router.clock["now"] += 31
+        assert router.acquire("paddleocr")
+        # Only one probe at a time
+        assert not router.acquire("paddleocr")
+        
+        router.record_success("paddleocr", 0.1, 0.9)
+        assert router.stats()["engines"]["paddleocr"]["state"] == "closed"
+        assert router.acquire("paddleocr")
+    
+    def test_failed_probe_reopens(self, router):
+        """Test that a failed probe restarts the cooldown"""
+        for _ in range(5):
+            router.record_failure("paddleocr")
+        
+        router.clock["now"] += 31
+        assert router.acquire("paddleocr")
+        router.record_failure("paddleocr")
+        
+        assert not router.available("paddleocr")
+        assert router.stats()["engines"]["paddleocr"]["trips"] == 2
+
+
+class TestRouting:
+    """Test engine ordering"""
+    
+    def test_preferred_first(self, router):
+        """Test that the requested engine is tried first"""
+        assert router.order(["paddleocr", "easyocr"], preferred="easyocr") == ["easyocr", "paddleocr"]
+    
+    def test_fastest_strategy(self, router, monkeypatch):
+        """Test that the fastest strategy orders by recent median latency"""
+        monkeypatch.setattr(router_module.settings, "OCR_ROUTER_STRATEGY", "fastest")
+        router.record_success("paddleocr", 0.5, 0.9)
+        router.record_success("easyocr", 0.2, 0.8)
+        
+        assert router.order(["paddleocr", "easyocr"]) == ["easyocr", "paddleocr"]
+    
+    def test_stats(self, router):
+        """Test that rolling statistics are exposed"""
+        router.record_success("easyocr", 0.2, 0.8)
+        router.record_failure("easyocr")
+        
+        stats = router.stats()["engines"]["easyocr"]
+        assert stats["error_rate"] == pytest.approx(0.5)
+        assert stats["mean_confidence"] == pytest.approx(0.8)
+        assert stats["latency_ms"]["p50"] == pytest.approx(200)
+
+
+class TestOCREngineRouting:
+    """Test OCREngine calls going through the router"""
+    
+    def test_failing_engine_skipped(self, monkeypatch):
+        """Test that an engine with an open circuit is not called"""
+        monkeypatch.setattr(router_module.settings, "OCR_CIRCUIT_MIN_CALLS", 3)
+        engine = OCREngine(languages=['en'], engines=[])
+        engine.paddle_ocr = MagicMock()
+        engine.paddle_ocr.ocr.side_effect = RuntimeError("Paddle failed")
+        engine.easy_ocr = MagicMock()
+        engine.easy_ocr.readtext.return_value = [([[0, 0]], "text", 0.9)]
+        image = np.ones((50, 50, 3), dtype=np.uint8)
+        
+        for _ in range(3):
+            assert engine.process(image)["engine"] == "easyocr"
+        assert engine.paddle_ocr.ocr.call_count == 3
+        
+        assert engine.process(image)["engine"] == "easyocr"
+        assert engine.paddle_ocr.ocr.call_count == 3
+        assert engine_router.stats()["engines"]["paddleocr"]["state"] == "open"
@@ -2,6 +2,9 @@ import pytest
 import numpy as np
 import cv2
 from PIL import Image
+from unittest.mock import patch
+
+from app.core.config import settings
 from app.utils.image_preprocessing import ImagePreprocessor
 
 
@@ -109,3 +112,315 @@ class TestImagePreprocessor:
         cv2.rectangle(straight_image, (20, 20), (80, 80), 0, -1)
         result = ImagePreprocessor.deskew(straight_image)
         assert result.shape == straight_image.shape
+
+
+SLIP_LINES = [
+    "Transfer successful", "12 Oct 2024 14:30", "From", "Mr. Somchai Jaidee",
+    "xxx-x-x1234-x", "To", "Ms. Malee Rakdee", "Amount", "1,500.00 THB", "Reference"
+]
+
+DIGIT_LINES = [
+    "2024-10-12 14:30", "1,500.00", "0123456789", "015123143000", "987-6-54321-0",
+    "1,234,567.89", "20241012", "100.00", "555", "31/12/2024"
+]
+
+
+def render_slip(lines=SLIP_LINES, font=cv2.FONT_HERSHEY_SIMPLEX) -> np.ndarray:
+    """Slip-like page: coloured header bar and left-aligned text lines"""
+    slip = np.full((1400, 700, 3), 255, dtype=np.uint8)
+    slip[:120] = (80, 160, 0)
+    for idx, line in enumerate(lines):
+        cv2.putText(slip, line, (40, 200 + 60 * idx), font, 0.9, (30, 30, 30), 2, cv2.LINE_AA)
+    return slip
+
+
+class TestOrientation:
+    """Test whole-page orientation detection on a thumbnail"""
+    
+    ROTATIONS = {90: cv2.ROTATE_90_CLOCKWISE, 180: cv2.ROTATE_180, 270: cv2.ROTATE_90_COUNTERCLOCKWISE}
+    
+    def test_upright_page(self):
+        """Test that an upright slip is left alone"""
+        slip = render_slip()
+        assert ImagePreprocessor.detect_orientation(slip) == 0
+        assert ImagePreprocessor.correct_orientation(slip) is slip
+    
+    @pytest.mark.parametrize("angle", [90, 180, 270])
+    def test_rotated_page(self, angle):
+        """Test that sideways and upside-down slips are detected and rotated back"""
+        slip = render_slip()
+        rotated = cv2.rotate(slip, self.ROTATIONS[angle])
+        
+        assert ImagePreprocessor.detect_orientation(rotated) == angle
+        assert np.array_equal(ImagePreprocessor.correct_orientation(rotated), slip)
+    
+    def test_grayscale_page(self):
+        """Test that preprocessed grayscale pages work too"""
+        gray = cv2.cvtColor(cv2.rotate(render_slip(), cv2.ROTATE_180), cv2.COLOR_BGR2GRAY)
+        assert ImagePreprocessor.detect_orientation(gray) == 180
+    
+    @pytest.mark.parametrize("font", [
+        cv2.FONT_HERSHEY_SIMPLEX, cv2.FONT_HERSHEY_DUPLEX, cv2.FONT_HERSHEY_COMPLEX, cv2.FONT_HERSHEY_TRIPLEX
+    ])
+    @pytest.mark.parametrize("lines", [[line.upper() for line in SLIP_LINES], DIGIT_LINES], ids=["uppercase", "digits"])
+    def test_ambiguous_page_left_alone(self, lines, font):
+        """Test that upright uppercase and digit-only slips are never turned upside down"""
+        slip = render_slip(lines, font)
+        assert ImagePreprocessor.detect_orientation(slip) == 0
+        assert ImagePreprocessor.correct_orientation(slip) is slip
+    
+    def test_blank_page(self):
+        """Test that a page without ink counts as upright"""
+        assert ImagePreprocessor.detect_orientation(np.full((300, 200), 255, dtype=np.uint8)) == 0
+
+
+def add_noise(image: np.ndarray, sigma: float) -> np.ndarray:
+    """Add Gaussian sensor noise"""
+    rng = np.random.default_rng(0)
+    return np.clip(image + rng.normal(0, sigma, image.shape), 0, 255).astype(np.uint8)
+
+
+class TestAdaptiveDenoise:
+    """Test noise estimation and the choice of denoising method"""
+    
+    @pytest.fixture
+    def page(self):
+        return cv2.cvtColor(render_slip(), cv2.COLOR_BGR2GRAY)
+    
+    def test_clean_screenshot_has_no_noise(self, page):
+        """Test that text edges alone do not count as noise"""
+        assert ImagePreprocessor.estimate_noise(page) < 0.5
+    
+    def test_estimate_tracks_noise_level(self, page):
+        """Test that the estimate grows with the added noise"""
+        estimates = [ImagePreprocessor.estimate_noise(add_noise(page, sigma)) for sigma in (4, 10, 20)]
+        assert estimates == sorted(estimates)
+        assert 4 < estimates[1] < 14
+    
+    @pytest.mark.parametrize("sigma, method", [(0, "none"), (5, "bilateral"), (20, "nlm")])
+    def test_selects_method_by_noise(self, page, sigma, method):
+        """Test the none / bilateral / non-local means thresholds"""
+        image = add_noise(page, sigma) if sigma else page
+        assert ImagePreprocessor.select_denoise(image)[0] == method
+    
+    def test_forced_mode(self, page):
+        """Test that a fixed OCR_DENOISE_MODE skips the estimate"""
+        with patch.object(settings, "OCR_DENOISE_MODE", "nlm"):
+            assert ImagePreprocessor.select_denoise(page) == ("nlm", None)
+    
+    def test_preprocess_reports_path(self, page):
+        """Test that preprocess_image records the method and the estimate"""
+        report = {}
+        ImagePreprocessor.preprocess_image(page, report)
+        assert report["denoise"] == "none"
+        assert report["noise_sigma"] < 0.5
+
+
+class TestLimitResolution:
+    """Test the resolution bound at the start of preprocessing"""
+    
+    def test_long_edge_limit(self):
+        """Test that the long edge is scaled down to OCR_MAX_LONG_EDGE"""
+        photo = np.zeros((4000, 3000, 3), dtype=np.uint8)
+        with patch.object(settings, "OCR_MAX_LONG_EDGE", 2000), patch.object(settings, "OCR_MAX_PIXELS", 0):
+            report = {}
+            result = ImagePreprocessor.limit_resolution(photo, report)
+        assert result.shape[:2] == (2000, 1500)
+        assert report["scale"] == 0.5
+    
+    def test_pixel_budget(self):
+        """Test that the pixel count is kept within OCR_MAX_PIXELS"""
+        photo = np.zeros((4000, 3000), dtype=np.uint8)
+        with patch.object(settings, "OCR_MAX_LONG_EDGE", 0), patch.object(settings, "OCR_MAX_PIXELS", 3_000_000):
+            result = ImagePreprocessor.limit_resolution(photo)
+        assert result.shape[0] * result.shape[1] <= 3_000_000
+        assert result.shape == (2000, 1500)
+    
+    def test_small_images_untouched(self):
+        """Test that images within the limits are never upscaled or copied"""
+        screenshot = np.zeros((1600, 720, 3), dtype=np.uint8)
+        assert ImagePreprocessor.limit_resolution(screenshot) is screenshot
+    
+    def test_preprocess_starts_with_bound(self):
+        """Test that preprocess_image works on the bounded image"""
+        photo = cv2.resize(render_slip(), None, fx=3, fy=3)
+        report = {}
+        with patch.object(settings, "OCR_MAX_LONG_EDGE", 1400), patch.object(settings, "OCR_MAX_PIXELS", 0):
+            result = ImagePreprocessor.preprocess_image(photo, report)
+        assert report["scale"] == pytest.approx(1 / 3, abs=1e-3)
+        assert max(result.shape) <= 1400
+
+
+def rotate(image: np.ndarray, angle: float) -> np.ndarray:
+    """Rotate counter-clockwise by ``angle`` degrees on a white background"""
+    h, w = image.shape[:2]
+    matrix = cv2.getRotationMatrix2D((w / 2, h / 2), angle, 1.0)
+    return cv2.warpAffine(image, matrix, (w, h), borderValue=255)
+
+
+class TestDeskew:
+    """Test projection-profile skew estimation on a thumbnail"""
+    
+    @pytest.fixture
+    def page(self):
+        return cv2.cvtColor(render_slip(), cv2.COLOR_BGR2GRAY)
+    
+    @pytest.mark.parametrize("angle", [-6.0, -2.0, 1.5, 4.0])
+    def test_estimates_skew(self, page, angle):
+        """Test that the estimated correction undoes the skew"""
+        assert ImagePreprocessor.estimate_skew(rotate(page, angle)) == pytest.approx(-angle, abs=0.4)
+    
+    def test_level_page_untouched(self, page):
+        """Test that a level page is returned as is, without a rotation"""
+        assert ImagePreprocessor.estimate_skew(page) == 0.0
+        assert ImagePreprocessor.deskew(page) is page
+    
+    def test_deskew_levels_page(self, page):
+        """Test that deskewing a skewed page brings its skew below the threshold"""
+        deskewed = ImagePreprocessor.deskew(rotate(page, 3.0))
+        assert deskewed.shape == page.shape
+        assert abs(ImagePreprocessor.estimate_skew(deskewed)) <= ImagePreprocessor.DESKEW_MIN_ANGLE
+    
+    def test_memory_bounded_by_thumbnail(self, page):
+        """Test that estimating the skew of a large image allocates far less than the image"""
+        import tracemalloc
+        
+        photo = cv2.resize(page, None, fx=3, fy=3)
+        tracemalloc.start()
+        try:
+            ImagePreprocessor.estimate_skew(photo)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        assert peak < photo.nbytes / 2
+
+
+class TestPreprocessingSteps:
+    """Test the declarative preprocessing pipeline"""
+    
+    @pytest.fixture
+    def page(self):
+        return render_slip()
+    
+    def test_default_profile(self):
+        """Test that the default profile resolves to the configured steps"""
+        steps = ImagePreprocessor.resolve_steps()
+        assert [spec["step"] for spec in steps] == [
+            "limit_resolution", "grayscale", "denoise", "deskew", "threshold", "remove_borders", "enhance_contrast"
+        ]
+        assert steps[5] == {"step": "remove_borders", "border_size": 10}
+    
+    @pytest.mark.parametrize("profile, steps", [
+        ("missing", None),
+        (None, ["grayscale", "sharpen"]),
+        (None, [{"step": "threshold", "radius": 3}])
+    ])
+    def test_invalid_steps(self, profile, steps):
+        """Test that unknown profiles, steps and parameters are rejected"""
+        with pytest.raises(ValueError):
+            ImagePreprocessor.resolve_steps(profile, steps)
+    
+    def test_records_every_step(self, page):
+        """Test that the time and output size of every step is reported"""
+        report = {}
+        result = ImagePreprocessor.preprocess_image(page, report)
+        
+        assert report["profile"] == "default"
+        assert [timing["step"] for timing in report["steps"]] == [
+            spec["step"] for spec in ImagePreprocessor.resolve_steps()
+        ]
+        assert all(timing["ms"] >= 0 for timing in report["steps"])
+        assert report["steps"][-1]["bytes"] == result.nbytes
+        assert "skew" in report
+    
+    def test_explicit_steps(self, page):
+        """Test that explicit steps with parameters override the profile"""
+        report = {}
+        result = ImagePreprocessor.preprocess_image(
+            page, report, steps=["grayscale", {"step": "remove_borders", "border_size": 20}]
+        )
+        
+        assert report["profile"] == "custom"
+        assert result.shape == (page.shape[0] - 40, page.shape[1] - 40)
+        assert "denoise" not in report
+    
+    def test_light_profile(self, page):
+        """Test that a named profile runs only its own steps"""
+        report = {}
+        ImagePreprocessor.preprocess_image(page, report, profile="light")
+        assert [timing["step"] for timing in report["steps"]] == ["limit_resolution", "grayscale", "deskew"]
+    
+    def test_trace_memory(self, page):
+        """Test that peak allocations are reported when tracing is on"""
+        import tracemalloc
+        
+        report = {}
+        was_tracing = tracemalloc.is_tracing()
+        try:
+            with patch.object(settings, "OCR_PREPROCESS_TRACE_MEMORY", True):
+                ImagePreprocessor.preprocess_image(page, report, steps=["grayscale"])
+        finally:
+            if not was_tracing:
+                tracemalloc.stop()
+        
+        assert report["steps"][0]["peak_bytes"] >= page.shape[0] * page.shape[1]
+
+
+class TestDecode:
+    """Test decoding in the cheapest mode the pipeline can use"""
+    
+    @pytest.fixture
+    def jpeg(self):
+        return cv2.imencode(".jpg", cv2.resize(render_slip(), (1000, 2000)))[1].tobytes()
+    
+    def test_grayscale(self, jpeg):
+        """Test that grayscale decoding gives a single channel at full size"""
+        report = {}
+        image = ImagePreprocessor.decode(jpeg, grayscale=True, report=report)
+        assert image.shape == (2000, 1000)
+        assert report["decode"]["mode"] == "grayscale"
+        assert report["decode"]["reduction"] == 1
+        assert report["decode"]["bytes"] == image.nbytes
+    
+    @pytest.mark.parametrize("long_edge, reduction", [(250, 8), (500, 4), (900, 2), (1200, 1)])
+    def test_reduction_within_bound(self, jpeg, long_edge, reduction):
+        """Test that the largest reduction not undershooting the bound is used"""
+        report = {}
+        with patch.object(settings, "OCR_MAX_LONG_EDGE", long_edge), patch.object(settings, "OCR_MAX_PIXELS", 0):
+            image = ImagePreprocessor.decode(jpeg, report=report)
+        
+        assert report["decode"]["reduction"] == reduction
+        assert image.shape == (2000 // reduction, 1000 // reduction, 3)
+        assert max(image.shape) >= long_edge
+    
+    def test_reduction_disabled(self, jpeg):
+        """Test that OCR_DECODE_REDUCED turns reduced decoding off"""
+        with patch.object(settings, "OCR_MAX_LONG_EDGE", 250), patch.object(settings, "OCR_DECODE_REDUCED", False):
+            assert ImagePreprocessor.decode(jpeg, grayscale=True).shape == (2000, 1000)
+    
+    def test_png_not_reduced(self):
+        """Test that only JPEGs are decoded at a reduced scale"""
+        png = cv2.imencode(".png", cv2.resize(render_slip(), (1000, 2000)))[1].tobytes()
+        with patch.object(settings, "OCR_MAX_LONG_EDGE", 250):
+            assert ImagePreprocessor.decode(png).shape == (2000, 1000, 3)
+    
+    def test_invalid_bytes(self):
+        """Test that undecodable bytes give None"""
+        assert ImagePreprocessor.decode(b"\xff\xd8 not a jpeg", grayscale=True) is None
+    
+    def test_grayscale_input(self):
+        """Test which step lists allow decoding straight to grayscale"""
+        assert ImagePreprocessor.grayscale_input()
+        assert ImagePreprocessor.grayscale_input(profile="light")
+        assert not ImagePreprocessor.grayscale_input(steps=["limit_resolution", "deskew", "grayscale"])
+        assert not ImagePreprocessor.grayscale_input(steps=["limit_resolution"])
+    
+    def test_prepare_image_decode_mode(self, jpeg):
+        """Test that the decode mode follows the preprocessing setting"""
+        from app.services.pipeline import prepare_image
+        
+        image, report = prepare_image(None, jpeg, True)
+        assert report["decode"]["mode"] == "grayscale"
+        image, report = prepare_image(None, jpeg, False)
+        assert report["decode"]["mode"] == "color"
+        assert image.ndim == 3
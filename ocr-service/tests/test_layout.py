@@ -0,0 +1,61 @@
+import cv2
+import numpy as np
+
+from app.utils.layout import find_qr_rect, select_field_regions
+
+
+def line_box(x: float, y: float, width: float = 200, height: float = 20) -> np.ndarray:
+    """Axis-aligned text line box"""
+    return np.float32([[x, y], [x + width, y], [x + width, y + height], [x, y + height]])
+
+
+class TestSelectFieldRegions:
+    """Test layout-based selection of text lines"""
+    
+    def test_keeps_regular_lines(self):
+        """Test that ordinary slip lines are selected"""
+        boxes = [line_box(20, 100 + 40 * i) for i in range(5)]
+        assert select_field_regions(boxes, (1000, 600)) == [0, 1, 2, 3, 4]
+    
+    def test_drops_footer_banner_and_fine_print(self):
+        """Test that footer lines, oversized banner text and fine print are dropped"""
+        boxes = [
+            line_box(20, 100),
+            line_box(20, 140),
+            line_box(20, 200, height=90),  # promotional headline
+            line_box(20, 320, height=6),  # disclaimer
+            line_box(20, 950),  # footer
+            line_box(20, 360),
+        ]
+        assert select_field_regions(boxes, (1000, 600)) == [0, 1, 5]
+    
+    def test_drops_excluded_area(self):
+        """Test that lines inside the excluded area (QR code caption) are dropped"""
+        boxes = [line_box(20, 100), line_box(320, 500, width=100)]
+        assert select_field_regions(boxes, (1000, 600), exclude=(300, 400, 500, 600)) == [0]
+    
+    def test_no_boxes(self):
+        """Test that an image without text yields no regions"""
+        assert select_field_regions([], (100, 100)) == []
+
+
+class TestFindQRRect:
+    """Test QR code localisation"""
+    
+    def test_finds_qr_code_with_margin(self):
+        """Test that the QR code area is found and grown for its caption"""
+        qr = cv2.QRCodeEncoder.create().encode("0041000600000101030040220014")
+        qr = cv2.resize(qr, None, fx=8, fy=8, interpolation=cv2.INTER_NEAREST)
+        image = np.full((1200, 700), 255, dtype=np.uint8)
+        image[700:700 + qr.shape[0], 200:200 + qr.shape[1]] = qr
+        
+        rect = find_qr_rect(image)
+        
+        assert rect is not None
+        x0, y0, x1, y1 = rect
+        assert x0 < 200 + 32 and y0 < 700 + 32
+        assert x1 > 200 + qr.shape[1] - 32 and y1 > 700 + qr.shape[0] - 32
+    
+    def test_no_qr_code(self):
+        """Test that a blank image has no QR code"""
+        assert find_qr_rect(np.full((400, 300), 255, dtype=np.uint8)) is None
@@ -0,0 +1,64 @@
+import cv2
+import numpy as np
+
+from app.utils.line_cache import RecognitionCache, crop_fingerprint
+
+
+def render_line(text: str) -> np.ndarray:
+    """Render a text line crop"""
+    crop = np.full((40, 260, 3), 255, dtype=np.uint8)
+    cv2.putText(crop, text, (6, 30), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (20, 20, 20), 2, cv2.LINE_AA)
+    return crop
+
+
+class TestCropFingerprint:
+    """Test fingerprints of text line crops"""
+    
+    def test_same_label_matches_across_slips(self):
+        """Test that the same label re-encoded as JPEG gets the same fingerprint"""
+        clean = render_line("Amount")
+        recompressed = cv2.imdecode(cv2.imencode(".jpg", clean, [cv2.IMWRITE_JPEG_QUALITY, 90])[1], cv2.IMREAD_COLOR)
+        assert crop_fingerprint(clean) == crop_fingerprint(recompressed)
+    
+    def test_different_text_differs(self):
+        """Test that variable values are not confused with each other"""
+        assert crop_fingerprint(render_line("1,500.00")) != crop_fingerprint(render_line("1,800.00"))
+    
+    def test_grayscale_and_colour_agree(self):
+        """Test that grayscale and colour crops of the same line match"""
+        crop = render_line("Ref No.")
+        assert crop_fingerprint(crop) == crop_fingerprint(cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY))
+
+
+class TestRecognitionCache:
+    """Test the line recognition LRU"""
+    
+    def test_hit_and_miss_counts(self):
+        """Test that lookups are counted and CPU saved is estimated from misses"""
+        cache = RecognitionCache()
+        assert cache.get(("paddleocr", "a")) is None
+        cache.record_recognition(0.2)
+        cache.put(("paddleocr", "a"), ("Amount", 0.9))
+        
+        assert cache.get(("paddleocr", "a")) == ("Amount", 0.9)
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+        assert stats["cpu_seconds_saved"] == 0.2
+    
+    def test_engine_is_part_of_key(self):
+        """Test that one engine's recognition is not reused for another"""
+        cache = RecognitionCache()
+        cache.put(("paddleocr", "a"), ("Amount", 0.9))
+        assert cache.get(("onnx", "a")) is None
+    
+    def test_evicts_least_recently_used(self):
+        """Test that the cache stays bounded and keeps recently used lines"""
+        cache = RecognitionCache(maxsize=2)
+        cache.put(("paddleocr", "a"), ("a", 0.9))
+        cache.put(("paddleocr", "b"), ("b", 0.9))
+        cache.get(("paddleocr", "a"))
+        cache.put(("paddleocr", "c"), ("c", 0.9))
+        
+        assert cache.get(("paddleocr", "b")) is None
+        assert cache.get(("paddleocr", "a")) == ("a", 0.9)
+        assert cache.stats()["entries"] == 2
@@ -0,0 +1,130 @@
+import pytest
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.services.model_server import ModelServer, ModelServerClient
+from app.services.worker_pool import OCRWorkerPool
+
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="requires fork()")
+
+
+class FakeEngine:
+    """Engine stand-in recording the serving process"""
+
+    engines = ["fake"]
+
+    def process(self, image, engine=None, accept=None):
+        return {"text": "ok", "pid": os.getpid(), "engine": engine}
+
+
+def _engine_pid(engine, delay=0.0):
+    time.sleep(delay)
+    return os.getpid()
+
+
+def _process(engine, image, ocr_engine=None):
+    return engine.process(image, engine=ocr_engine)
+
+
+def _fail(engine):
+    raise ValueError("bad image")
+
+
+@pytest.fixture
+def server(tmp_path):
+    server = ModelServer(
+        address=str(tmp_path / "model.sock"),
+        processes=2,
+        cpus=[],
+        engine_factory=FakeEngine,
+        preload=False
+    )
+    server.start()
+    yield server
+    server.stop()
+    server.join()
+
+
+@pytest.fixture
+def single_server(tmp_path):
+    server = ModelServer(
+        address=str(tmp_path / "single.sock"),
+        processes=1,
+        cpus=[],
+        engine_factory=FakeEngine,
+        preload=False
+    )
+    server.start()
+    yield server
+    server.stop()
+    server.join()
+
+
+class TestModelServer:
+    """Test inference processes serving jobs over the Unix socket"""
+
+    def test_job_runs_in_inference_process(self, server):
+        """Test that jobs run in a server process with its engine"""
+        client = ModelServerClient(server.address, max_connections=1)
+        result = client.call(_process, "image", "paddleocr")
+        client.close()
+
+        assert result["text"] == "ok"
+        assert result["engine"] == "paddleocr"
+        assert result["pid"] != os.getpid()
+
+    def test_job_error_raised_in_client(self, server):
+        """Test that job exceptions are reported to the caller"""
+        client = ModelServerClient(server.address, max_connections=1)
+        with pytest.raises(RuntimeError, match="bad image"):
+            client.call(_fail)
+        # The connection stays usable after a failed job
+        assert client.call(_engine_pid) != os.getpid()
+        client.close()
+
+    @pytest.mark.asyncio
+    async def test_remote_worker_pool(self, server, monkeypatch):
+        """Test that remote mode spreads concurrent jobs over the inference processes"""
+        monkeypatch.setattr("app.core.config.settings.OCR_MODEL_SERVER_SOCKET", server.address)
+
+        pool = OCRWorkerPool(workers=2, mode="remote")
+        assert pool.engines is None
+
+        pids = await asyncio.gather(*[pool.run(_engine_pid, 0.2) for _ in range(2)])
+        pool.shutdown()
+
+        assert len(set(pids)) == 2
+        assert os.getpid() not in pids
+
+    def test_more_clients_than_processes(self, single_server):
+        """Test that one inference process serves several concurrent clients"""
+        clients = [ModelServerClient(single_server.address, max_connections=2) for _ in range(3)]
+
+        def run(client):
+            return [client.call(_engine_pid, 0.05) for _ in range(2)]
+
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            futures = [executor.submit(run, client) for client in clients for _ in range(2)]
+            pids = {pid for future in futures for pid in future.result(timeout=10)}
+        for client in clients:
+            client.close()
+
+        assert len(pids) == 1
+        assert os.getpid() not in pids
+
+    @pytest.mark.asyncio
+    async def test_remote_worker_pool_single_process(self, single_server, monkeypatch):
+        """Test that the default of one inference process serves a pool of two workers"""
+        monkeypatch.setattr("app.core.config.settings.OCR_MODEL_SERVER_SOCKET", single_server.address)
+
+        pool = OCRWorkerPool(workers=2, mode="remote")
+        pids = await asyncio.wait_for(
+            asyncio.gather(*[pool.run(_engine_pid, 0.05) for _ in range(6)]),
+            timeout=10
+        )
+        pool.shutdown()
+
+        assert len(set(pids)) == 1
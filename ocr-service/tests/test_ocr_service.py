@@ -1,7 +1,15 @@
 import pytest
 import numpy as np
 from unittest.mock import Mock, patch, MagicMock
-from app.services.ocr_service import OCREngine, get_ocr_engine, PADDLE_AVAILABLE, EASYOCR_AVAILABLE
+import time
+from app.services.ocr_service import OCREngine, HedgePolicy, get_ocr_engine, PADDLE_AVAILABLE, EASYOCR_AVAILABLE
+from app.core.config import settings
+from app.utils.line_cache import RecognitionCache
+
+
+def make_engine() -> OCREngine:
+    """Create an OCR engine without loading any backend"""
+    return OCREngine(languages=['en'], engines=[])
 
 
 class TestOCREngine:
@@ -37,6 +45,18 @@ class TestOCREngine:
         if not PADDLE_AVAILABLE and not EASYOCR_AVAILABLE:
             assert result is False
     
+    def test_is_available_does_not_load(self):
+        """Test that the availability check reports installed engines without loading them"""
+        engine = make_engine()
+        assert engine.is_available() is False
+        
+        engine.engines = ["easyocr"]
+        with patch('app.services.ocr_service.EASYOCR_AVAILABLE', True), \
+                patch.object(engine, "_create_backend") as create:
+            assert engine.is_available() is True
+        create.assert_not_called()
+        assert engine._loaded_engines() == []
+    
     def test_process_returns_dict(self, ocr_engine, sample_image):
         """Test that process returns correct structure"""
         result = ocr_engine.process(sample_image)
@@ -49,18 +69,13 @@ class TestOCREngine:
     
     def test_process_with_no_engine(self, sample_image):
         """Test processing when no engine is available"""
-        with patch.object(OCREngine, '__init__', lambda x, **kwargs: None):
-            engine = OCREngine.__new__(OCREngine)
-            engine.paddle_ocr = None
-            engine.easy_ocr = None
-            engine.languages = ['en']
-            engine.use_gpu = False
-            
-            result = engine.process(sample_image)
-            
-            assert result["text"] == ""
-            assert result["confidence"] == 0.0
-            assert result["engine"] == "none"
+        engine = make_engine()
+        
+        result = engine.process(sample_image)
+        
+        assert result["text"] == ""
+        assert result["confidence"] == 0.0
+        assert result["engine"] == "none"
     
     def test_process_specific_engine_paddle(self, ocr_engine, sample_image):
         """Test processing with specific engine (paddleocr)"""
@@ -90,7 +105,7 @@ class TestOCREngineMocked:
     
     def test_paddle_extraction(self, sample_image):
         """Test PaddleOCR text extraction with mock"""
-        engine = OCREngine.__new__(OCREngine)
+        engine = make_engine()
         engine.languages = ['en']
         engine.use_gpu = False
         engine.easy_ocr = None
@@ -108,10 +123,12 @@ class TestOCREngineMocked:
         assert "Test text" in text
         assert "More text" in text
         assert confidence > 0.9
+        # Orientation is fixed once per page, not per line
+        mock_paddle.ocr.assert_called_once_with(sample_image, cls=False)
     
     def test_easyocr_extraction(self, sample_image):
         """Test EasyOCR text extraction with mock"""
-        engine = OCREngine.__new__(OCREngine)
+        engine = make_engine()
         engine.languages = ['en']
         engine.use_gpu = False
         engine.paddle_ocr = None
@@ -132,7 +149,7 @@ class TestOCREngineMocked:
     
     def test_fallback_behavior(self, sample_image):
         """Test fallback when first engine fails"""
-        engine = OCREngine.__new__(OCREngine)
+        engine = make_engine()
         engine.languages = ['en']
         engine.use_gpu = False
         
@@ -154,6 +171,589 @@ class TestOCREngineMocked:
         assert "Fallback text" in result["text"]
 
 
+class TestOCREngineLoading:
+    """Test config-driven lazy engine loading"""
+    
+    @pytest.fixture
+    def created(self):
+        """Patch backend construction to record which engines get loaded"""
+        created = []
+        
+        def fake_create(engine, name):
+            created.append(name)
+            return MagicMock()
+        
+        with patch.object(OCREngine, '_create_backend', fake_create), \
+                patch.object(OCREngine, '_is_installed', lambda engine, name: True):
+            yield created
+    
+    def test_only_primary_loaded_eagerly(self, created):
+        """Test that secondaries are not loaded at startup"""
+        engine = OCREngine(engines=["easyocr", "paddleocr"])
+        
+        assert created == ["easyocr"]
+        assert engine.easy_ocr is not None
+        assert engine.paddle_ocr is None
+    
+    def test_unlisted_engine_never_loaded(self, created):
+        """Test that engines missing from OCR_ENGINES are ignored"""
+        engine = OCREngine(engines=["easyocr"])
+        
+        with pytest.raises(RuntimeError):
+            engine.process_with_paddle(np.ones((10, 10), dtype=np.uint8))
+        assert created == ["easyocr"]
+    
+    def test_secondary_loaded_on_first_use(self, created):
+        """Test lazy loading of a secondary engine"""
+        engine = OCREngine(engines=["paddleocr", "easyocr"])
+        engine.paddle_ocr.ocr.side_effect = RuntimeError("Paddle failed")
+        
+        result = engine.process(np.ones((10, 10), dtype=np.uint8))
+        
+        assert created == ["paddleocr", "easyocr"]
+        assert result["engine"] == "easyocr"
+    
+    def test_memory_budget_unloads_lru_secondary(self, created):
+        """Test that the least recently used secondary is unloaded over budget"""
+        engine = OCREngine(engines=["paddleocr", "easyocr"])
+        engine.engine_memory = {"paddleocr": 300 * 1024 * 1024}
+        engine.easy_ocr = MagicMock()
+        engine.engine_memory["easyocr"] = 300 * 1024 * 1024
+        
+        with patch.object(settings, "OCR_MEMORY_BUDGET_MB", 400):
+            engine._enforce_memory_budget(keep="paddleocr")
+        
+        assert engine.easy_ocr is None
+        assert engine.paddle_ocr is not None
+        report = engine.memory_report()
+        assert report["easyocr"]["loaded"] is False
+        assert report["paddleocr"]["primary"] is True
+    
+    def test_memory_budget_skips_engine_in_use(self, created):
+        """Test that a secondary engine is not unloaded while a call is using it"""
+        import threading
+        engine = OCREngine(engines=["paddleocr", "easyocr", "onnx"])
+        engine.easy_ocr = MagicMock()
+        engine.engine_memory = {"paddleocr": 300 * 1024 * 1024, "easyocr": 300 * 1024 * 1024}
+        
+        running, release = threading.Event(), threading.Event()
+        
+        def slow_readtext(image):
+            running.set()
+            release.wait(5)
+            return [([[0, 0], [1, 0], [1, 1], [0, 1]], "easy text", 0.9)]
+        
+        engine.easy_ocr.readtext.side_effect = slow_readtext
+        results = []
+        worker = threading.Thread(
+            target=lambda: results.append(engine.process_with_easyocr(np.ones((10, 10), dtype=np.uint8)))
+        )
+        
+        with patch.object(settings, "OCR_MEMORY_BUDGET_MB", 400):
+            worker.start()
+            assert running.wait(5)
+            # Loading another secondary must neither unload nor wait for the busy engine
+            assert engine._ensure_loaded("onnx")
+            assert engine.easy_ocr is not None
+            
+            release.set()
+            worker.join(5)
+            assert results == [("easy text", 0.9)]
+            
+            engine._enforce_memory_budget(keep="onnx")
+        
+        assert engine.easy_ocr is None
+
+
+class TestOCREngineTesseract:
+    """Test the Tesseract engine and field fast path with a mocked pytesseract"""
+    
+    DATA = {
+        "text": ["", "Amount", "1,500.00", "Ref", "ABC123"],
+        "conf": ["-1", "90", "80", "70", "60"],
+        "block_num": [0, 1, 1, 1, 1],
+        "par_num": [0, 1, 1, 1, 1],
+        "line_num": [0, 1, 1, 2, 2]
+    }
+    
+    @pytest.fixture
+    def engine(self):
+        engine = make_engine()
+        engine.tesseract_ocr = MagicMock()
+        engine.tesseract_ocr.image_to_data.return_value = self.DATA
+        engine.engines = ["tesseract"]
+        with patch('app.services.ocr_service.pytesseract', MagicMock(), create=True):
+            yield engine
+    
+    def test_lines_and_confidence(self, engine):
+        """Test that words are grouped into lines and confidence scaled to 0-1"""
+        text, confidence = engine.process_with_tesseract(np.ones((50, 50), dtype=np.uint8))
+        
+        assert text == "Amount 1,500.00\nRef ABC123"
+        assert confidence == pytest.approx(0.75)
+        assert engine.tesseract_ocr.image_to_data.call_args.kwargs["lang"] == "eng"
+    
+    def test_field_read_uses_whitelist(self, engine):
+        """Test that field reads restrict Tesseract to the field's characters"""
+        engine.read_with_tesseract(np.ones((20, 80), dtype=np.uint8), engine.FIELD_CHARSETS["amount"])
+        
+        config = engine.tesseract_ocr.image_to_data.call_args.kwargs["config"]
+        assert "--psm 7" in config
+        assert "tessedit_char_whitelist=0123456789.," in config
+    
+    def test_recognize_field_prefers_tesseract(self, engine):
+        """Test the Tesseract fast path for numeric fields"""
+        engine.paddle_ocr = MagicMock()
+        
+        result = engine.recognize_field(np.ones((20, 80, 3), dtype=np.uint8), "amount")
+        
+        assert result["engine"] == "tesseract"
+        engine.paddle_ocr.ocr.assert_not_called()
+    
+    def test_recognize_field_falls_back_to_paddle(self, engine):
+        """Test that Paddle reads the crop when Tesseract fails"""
+        engine.tesseract_ocr.image_to_data.side_effect = RuntimeError("tesseract crashed")
+        engine.paddle_ocr = MagicMock()
+        engine.paddle_ocr.ocr.return_value = [[("1,500.00", 0.95)]]
+        
+        result = engine.recognize_field(np.ones((20, 80, 3), dtype=np.uint8), "amount")
+        
+        assert result["engine"] == "paddleocr"
+        assert result["text"] == "1,500.00"
+
+
+    def test_field_engine_loads_with_default_engines(self):
+        """Test that the field engine is loaded on demand with the default OCR_ENGINES"""
+        assert settings.OCR_FIELD_ENGINE not in settings.OCR_ENGINES
+        engine = make_engine()
+        engine.engines = list(settings.OCR_ENGINES)
+        engine.paddle_ocr = MagicMock()
+        tesseract = MagicMock()
+        tesseract.image_to_data.return_value = self.DATA
+        
+        with patch.object(engine, "_create_backend", return_value=tesseract) as create, \
+                patch('app.services.ocr_service.pytesseract', MagicMock(), create=True):
+            result = engine.recognize_field(np.ones((20, 80, 3), dtype=np.uint8), "amount")
+        
+        create.assert_called_once_with("tesseract")
+        assert result["engine"] == "tesseract"
+        engine.paddle_ocr.ocr.assert_not_called()
+        assert engine.memory_report()["tesseract"]["loaded"] is True
+
+
+class TestOCREngineAllowlist:
+    """Test charset-constrained single-line recognition"""
+    
+    def test_easyocr_allowlist_skips_detection(self):
+        """Test that EasyOCR recognizes the whole crop with the allowlist"""
+        engine = make_engine()
+        engine.engines = ["easyocr"]
+        engine.easy_ocr = MagicMock()
+        engine.easy_ocr.recognize.return_value = [([[0, 0]], "14:30", 0.9)]
+        
+        result = engine.recognize(np.ones((20, 80, 3), dtype=np.uint8), allowlist="0123456789:", engine="easyocr")
+        
+        assert result == {**result, "text": "14:30", "engine": "easyocr"}
+        call = engine.easy_ocr.recognize.call_args
+        assert call.args[0].ndim == 2
+        assert call.kwargs["allowlist"] == "0123456789:"
+        engine.easy_ocr.readtext.assert_not_called()
+    
+    def test_paddle_output_mapped_onto_allowlist(self):
+        """Test that Paddle look-alike confusions are corrected for numeric fields"""
+        engine = make_engine()
+        engine.engines = ["paddleocr"]
+        engine.paddle_ocr = MagicMock()
+        engine.paddle_ocr.ocr.return_value = [[("l,5OO.0O THB", 0.9)]]
+        
+        result = engine.recognize_field(np.ones((20, 80, 3), dtype=np.uint8), "amount")
+        
+        assert result["engine"] == "paddleocr"
+        assert result["text"] == "1,500.00"
+    
+    def test_no_allowlist_keeps_text(self):
+        """Test that unrestricted reads return the recognizer output unchanged"""
+        engine = make_engine()
+        engine.engines = ["paddleocr"]
+        engine.paddle_ocr = MagicMock()
+        engine.paddle_ocr.ocr.return_value = [[("Ref No. ABC", 0.9)]]
+        
+        assert engine.recognize(np.ones((20, 80, 3), dtype=np.uint8))["text"] == "Ref No. ABC"
+    
+    def test_text_emptied_by_allowlist_has_no_confidence(self):
+        """Test that a read with nothing left after the allowlist reports zero confidence"""
+        engine = make_engine()
+        engine.engines = ["paddleocr"]
+        engine.paddle_ocr = MagicMock()
+        engine.paddle_ocr.ocr.return_value = [[("THB", 0.95)]]
+        
+        result = engine.recognize(np.ones((20, 80, 3), dtype=np.uint8), allowlist="0123456789")
+        
+        assert result["text"] == ""
+        assert result["confidence"] == 0.0
+
+
+class TestOCREngineRegions:
+    """Test region mode: detect once, recognize only field lines"""
+    
+    BOXES = [
+        [[20, 100], [220, 100], [220, 120], [20, 120]],
+        [[20, 140], [220, 140], [220, 160], [20, 160]],
+        [[20, 950], [220, 950], [220, 970], [20, 970]],  # footer
+    ]
+    
+    @pytest.fixture
+    def engine(self):
+        engine = make_engine()
+        engine.engines = ["paddleocr"]
+        engine.paddle_ocr = MagicMock()
+        
+        def fake_ocr(img, det=True, rec=True, cls=True):
+            if det and not rec:
+                return [self.BOXES]
+            return [[(f"line{len(img)}", 0.9) for _ in img]]
+        
+        engine.paddle_ocr.ocr.side_effect = fake_ocr
+        return engine
+    
+    @staticmethod
+    def rec_batches(engine):
+        return [len(c.args[0]) for c in engine.paddle_ocr.ocr.call_args_list if c.kwargs.get("rec")]
+    
+    def test_only_selected_lines_recognized(self, engine):
+        """Test that footer lines are never sent to the recognizer"""
+        image = np.full((1000, 600, 3), 255, dtype=np.uint8)
+        
+        (text, confidence), = engine.process_regions("paddleocr", [image])
+        
+        assert text == "line2\nline2"
+        assert confidence == pytest.approx(0.9)
+        assert self.rec_batches(engine) == [2]
+    
+    def test_rejected_selection_recognizes_rest(self, engine):
+        """Test that the remaining lines are recognized when accept fails"""
+        image = np.full((1000, 600, 3), 255, dtype=np.uint8)
+        
+        (text, _), = engine.process_regions("paddleocr", [image], accept=lambda text: "line1" in text)
+        
+        assert text == "line2\nline2\nline1"
+        assert self.rec_batches(engine) == [2, 1]
+    
+    def test_region_mode_used_by_process(self, engine):
+        """Test that process() goes through region selection when enabled"""
+        image = np.full((1000, 600, 3), 255, dtype=np.uint8)
+        
+        with patch.object(settings, "OCR_REGION_MODE", True):
+            result = engine.process(image, engine="paddleocr")
+        
+        assert result["engine"] == "paddleocr"
+        assert result["text"] == "line2\nline2"
+        engine.paddle_ocr.ocr.assert_any_call(image, det=True, rec=False, cls=False)
+
+
+class TestOCREngineLineCache:
+    """Test reuse of line recognitions across slips"""
+    
+    BOXES = TestOCREngineRegions.BOXES[:2]
+    
+    @pytest.fixture
+    def engine(self):
+        engine = make_engine()
+        engine.engines = ["paddleocr"]
+        engine.paddle_ocr = MagicMock()
+        
+        def fake_ocr(img, det=True, rec=True, cls=True):
+            if det and not rec:
+                return [self.BOXES]
+            return [[("จำนวนเงิน", 0.9) for _ in img]]
+        
+        engine.paddle_ocr.ocr.side_effect = fake_ocr
+        return engine
+    
+    def test_repeated_lines_skip_recognizer(self, engine):
+        """Test that lines seen on an earlier slip are answered from the cache"""
+        image = np.full((1000, 600, 3), 255, dtype=np.uint8)
+        cache = RecognitionCache()
+        
+        with patch.object(settings, "OCR_LINE_CACHE_ENABLED", True), \
+                patch('app.services.ocr_service.recognition_cache', cache):
+            first = engine.batch_with_paddle([image])
+            second = engine.batch_with_paddle([image])
+        
+        assert first == second
+        assert TestOCREngineRegions.rec_batches(engine) == [2]
+        assert cache.stats()["hits"] == 2
+    
+    def test_disabled_cache_recognizes_every_line(self, engine):
+        """Test that every line reaches the recognizer with the cache disabled"""
+        image = np.full((1000, 600, 3), 255, dtype=np.uint8)
+        
+        engine.batch_with_paddle([image])
+        engine.batch_with_paddle([image])
+        
+        assert TestOCREngineRegions.rec_batches(engine) == [2, 2]
+
+
+class TestOCREngineBatch:
+    """Test batched OCR inference with mocked backends"""
+    
+    @pytest.fixture
+    def sample_images(self):
+        """Create sample test images of different sizes"""
+        return [
+            np.ones((100, 100, 3), dtype=np.uint8) * 255,
+            np.ones((80, 120), dtype=np.uint8) * 255
+        ]
+    
+    def test_paddle_batch_recognizes_all_crops_together(self, sample_images):
+        """Test that line crops of all images go to one recognizer call"""
+        engine = make_engine()
+        engine.easy_ocr = None
+        
+        box = [[0, 0], [50, 0], [50, 20], [0, 20]]
+        
+        def fake_ocr(img, det=True, rec=True, cls=True):
+            if det and not rec:
+                return [[box, box]]
+            return [[("line", 0.9) for _ in img]]
+        
+        mock_paddle = MagicMock()
+        mock_paddle.ocr.side_effect = fake_ocr
+        engine.paddle_ocr = mock_paddle
+        
+        outputs = engine.batch_with_paddle(sample_images)
+        
+        assert len(outputs) == 2
+        assert outputs[0] == ("line\nline", pytest.approx(0.9))
+        rec_calls = [c for c in mock_paddle.ocr.call_args_list if c.kwargs.get("rec")]
+        assert len(rec_calls) == 1
+        assert len(rec_calls[0].args[0]) == 4
+    
+    def test_easyocr_batch_pads_to_common_size(self, sample_images):
+        """Test that EasyOCR receives equally sized canvases"""
+        engine = make_engine()
+        engine.paddle_ocr = None
+        
+        mock_easy = MagicMock()
+        mock_easy.readtext_batched.return_value = [
+            [([[0, 0], [1, 0], [1, 1], [0, 1]], "first", 0.8)],
+            []
+        ]
+        engine.easy_ocr = mock_easy
+        
+        outputs = engine.batch_with_easyocr(sample_images)
+        
+        canvases = mock_easy.readtext_batched.call_args[0][0]
+        assert canvases[0].shape == canvases[1].shape == (100, 120, 3)
+        assert outputs == [("first", 0.8), ("", 0.0)]
+    
+    def test_process_batch_fallback(self, sample_images):
+        """Test batch fallback when the first engine fails"""
+        engine = make_engine()
+        
+        mock_paddle = MagicMock()
+        mock_paddle.ocr.side_effect = RuntimeError("Paddle failed")
+        engine.paddle_ocr = mock_paddle
+        
+        mock_easy = MagicMock()
+        mock_easy.readtext_batched.return_value = [[], []]
+        engine.easy_ocr = mock_easy
+        
+        results = engine.process_batch(sample_images)
+        
+        assert len(results) == 2
+        assert all(result["engine"] == "easyocr" for result in results)
+    
+    def test_process_batch_empty(self):
+        """Test batch with no images"""
+        engine = make_engine()
+        engine.paddle_ocr = None
+        engine.easy_ocr = None
+        assert engine.process_batch([]) == []
+
+
+class TestOCREngineCascade:
+    """Test confidence-driven engine cascade"""
+    
+    @pytest.fixture
+    def sample_image(self):
+        """Create a sample test image"""
+        return np.ones((100, 100, 3), dtype=np.uint8) * 255
+    
+    @pytest.fixture
+    def engine(self):
+        """Create engine with mocked paddle and easyocr backends"""
+        engine = make_engine()
+        engine.paddle_ocr = MagicMock()
+        engine.easy_ocr = MagicMock()
+        engine.easy_ocr.readtext.return_value = [
+            ([[0, 0], [1, 0], [1, 1], [0, 1]], "จำนวนเงิน 100.00 บาท", 0.9)
+        ]
+        return engine
+    
+    @pytest.fixture(autouse=True)
+    def cascade_enabled(self):
+        with patch.object(settings, "OCR_CASCADE_ENABLED", True), \
+                patch.object(settings, "OCR_CASCADE_ORDER", ["paddleocr", "easyocr"]):
+            yield
+    
+    def test_fast_path_accepted(self, engine, sample_image):
+        """Test that a confident first stage stops the cascade"""
+        engine.paddle_ocr.ocr.return_value = [[
+            [[[0, 0], [1, 0], [1, 1], [0, 1]], ("Amount 100.00", 0.95)]
+        ]]
+        
+        result = engine.process(sample_image)
+        
+        assert result["cascade_stage"] == "paddleocr"
+        assert result["accepted"] is True
+        engine.easy_ocr.readtext.assert_not_called()
+    
+    def test_low_confidence_escalates(self, engine, sample_image):
+        """Test that a low-confidence result escalates to the next engine"""
+        engine.paddle_ocr.ocr.return_value = [[
+            [[[0, 0], [1, 0], [1, 1], [0, 1]], ("garbage", 0.2)]
+        ]]
+        
+        result = engine.process(sample_image)
+        
+        assert result["cascade_stage"] == "easyocr"
+        assert result["accepted"] is True
+    
+    def test_missing_fields_escalate(self, engine, sample_image):
+        """Test that a confident result without required fields escalates"""
+        engine.paddle_ocr.ocr.return_value = [[
+            [[[0, 0], [1, 0], [1, 1], [0, 1]], ("no amount here", 0.99)]
+        ]]
+        
+        result = engine.process(sample_image, accept=lambda text: "100.00" in text)
+        
+        assert result["cascade_stage"] == "easyocr"
+    
+    def test_best_result_when_nothing_accepted(self, engine, sample_image):
+        """Test that the most confident output is kept when no stage is accepted"""
+        engine.paddle_ocr.ocr.return_value = [[
+            [[[0, 0], [1, 0], [1, 1], [0, 1]], ("paddle text", 0.5)]
+        ]]
+        engine.easy_ocr.readtext.return_value = [
+            ([[0, 0], [1, 0], [1, 1], [0, 1]], "easy text", 0.3)
+        ]
+        
+        result = engine.process(sample_image)
+        
+        assert result["engine"] == "paddleocr"
+        assert result["accepted"] is False
+    
+    def test_failed_batch_stage_not_rerun(self, engine, sample_image):
+        """Test that images of a failed batched stage escalate past that stage"""
+        engine.batch_with_paddle = MagicMock(side_effect=RuntimeError("Paddle failed"))
+        
+        results = engine.process_batch([sample_image, sample_image])
+        
+        assert [result["cascade_stage"] for result in results] == ["easyocr", "easyocr"]
+        engine.paddle_ocr.ocr.assert_not_called()
+    
+    def test_explicit_engine_bypasses_cascade(self, engine, sample_image):
+        """Test that requesting an engine skips the cascade"""
+        result = engine.process(sample_image, engine="easyocr")
+        assert "cascade_stage" not in result
+        engine.paddle_ocr.ocr.assert_not_called()
+
+
+class TestOCREngineHedging:
+    """Test hedged engine execution"""
+    
+    @pytest.fixture
+    def sample_image(self):
+        """Create a sample test image"""
+        return np.ones((100, 100, 3), dtype=np.uint8) * 255
+    
+    @pytest.fixture
+    def policy(self):
+        """Fresh hedge policy with a warm 10 ms paddle latency history"""
+        policy = HedgePolicy()
+        for _ in range(settings.OCR_HEDGE_MIN_SAMPLES):
+            policy.record_latency("paddleocr", 0.01)
+        with patch('app.services.ocr_service.hedge_policy', policy), \
+                patch.object(settings, "OCR_HEDGING_ENABLED", True):
+            yield policy
+    
+    @pytest.fixture
+    def engine(self):
+        """Create engine with a stalling paddle and a fast easyocr"""
+        engine = make_engine()
+        
+        def slow_ocr(image, cls=True):
+            time.sleep(0.5)
+            return [[[[[0, 0], [1, 0], [1, 1], [0, 1]], ("slow text", 0.9)]]]
+        
+        engine.paddle_ocr = MagicMock()
+        engine.paddle_ocr.ocr.side_effect = slow_ocr
+        engine.easy_ocr = MagicMock()
+        engine.easy_ocr.readtext.return_value = [
+            ([[0, 0], [1, 0], [1, 1], [0, 1]], "fast text", 0.9)
+        ]
+        return engine
+    
+    def test_stalled_primary_is_hedged(self, engine, policy, sample_image):
+        """Test that the secondary answers when the primary stalls"""
+        started = time.time()
+        result = engine.process(sample_image)
+        
+        assert result["engine"] == "easyocr"
+        assert result["hedged"] is True
+        assert time.time() - started < 0.4
+        assert policy.secondary_wins == 1
+    
+    def test_hedge_rate_cap(self, engine, policy, sample_image):
+        """Test that hedging is refused once the rate cap is reached"""
+        with patch.object(settings, "OCR_HEDGE_MAX_RATIO", 0.0):
+            result = engine.process(sample_image)
+        
+        assert result["engine"] == "paddleocr"
+        assert result["hedged"] is False
+        engine.easy_ocr.readtext.assert_not_called()
+    
+    def test_no_hedge_without_latency_history(self, engine, sample_image):
+        """Test that hedging waits for enough latency samples"""
+        with patch('app.services.ocr_service.hedge_policy', HedgePolicy()), \
+                patch.object(settings, "OCR_HEDGING_ENABLED", True):
+            result = engine.process(sample_image)
+        
+        assert result["engine"] == "paddleocr"
+        assert result["hedged"] is False
+    
+    def test_primary_failure_falls_back(self, engine, policy, sample_image):
+        """Test that a failing primary falls back to the secondary"""
+        engine.paddle_ocr.ocr.side_effect = RuntimeError("Paddle failed")
+        
+        result = engine.process(sample_image)
+        
+        assert result["engine"] == "easyocr"
+    
+    def test_circuit_opening_between_routing_calls(self, engine, policy, sample_image):
+        """Test that an engine dropped by the router mid-request does not break hedging"""
+        from app.services.ocr_service import engine_router
+        order = engine_router.order
+        calls = []
+        
+        def flaky_order(engines, preferred=None):
+            # paddleocr's circuit opens after the first routing decision
+            calls.append(engines)
+            routed = order(engines, preferred)
+            return routed if len(calls) == 1 else [name for name in routed if name != "paddleocr"]
+        
+        with patch.object(engine_router, "order", side_effect=flaky_order):
+            result = engine.process(sample_image)
+            assert result["engine"] == "easyocr"
+            assert result["hedged"] is True
+            
+            single = engine.process_hedged(sample_image)
+        
+        assert single["engine"] == "easyocr"
+        assert single["hedged"] is False
+
+
 class TestGetOcrEngine:
     """Test get_ocr_engine singleton function"""
     
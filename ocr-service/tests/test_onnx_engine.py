@@ -0,0 +1,162 @@
+import pytest
+import numpy as np
+from unittest.mock import MagicMock
+
+from app.services.onnx_engine import OnnxOCR, charset_mask, ctc_greedy_decode, load_charset
+from app.services.ocr_service import OCREngine
+
+
+def make_reader(det_output=None, rec_output=None) -> OnnxOCR:
+    """Create an ONNX reader with fake inference sessions"""
+    reader = OnnxOCR.__new__(OnnxOCR)
+    reader.det_session = MagicMock()
+    reader.det_session.run.return_value = [det_output]
+    reader.rec_session = MagicMock()
+    reader.rec_session.run.return_value = [rec_output]
+    reader.det_input = "x"
+    reader.rec_input = "x"
+    reader.charset = ["<blank>", "1", "2", "3", " "]
+    reader.det_limit_side = 960
+    reader.det_threshold = 0.3
+    reader.box_threshold = 0.6
+    reader.unclip_ratio = 1.5
+    reader.rec_height = 48
+    return reader
+
+
+class TestCTCDecode:
+    """Test CTC greedy decoding"""
+
+    def test_collapses_repeats_and_blanks(self):
+        """Test that repeats merge and blanks separate characters"""
+        charset = ["<blank>", "1", "2"]
+        # 1 1 _ 1 2 2 _  ->  "112"
+        path = [1, 1, 0, 1, 2, 2, 0]
+        probs = np.full((1, len(path), 3), 0.05, dtype=np.float32)
+        for t, c in enumerate(path):
+            probs[0, t, c] = 0.9
+
+        (text, confidence), = ctc_greedy_decode(probs, charset)
+
+        assert text == "112"
+        assert confidence == pytest.approx(0.9)
+
+    def test_all_blank(self):
+        """Test that an all-blank sequence decodes to empty text"""
+        probs = np.zeros((1, 4, 3), dtype=np.float32)
+        probs[0, :, 0] = 1.0
+        assert ctc_greedy_decode(probs, ["<blank>", "a", "b"]) == [("", 0.0)]
+
+    def test_mask_restricts_best_path(self):
+        """Test that masked classes are never emitted"""
+        charset = ["<blank>", "0", "O"]
+        probs = np.array([[[0.1, 0.3, 0.6], [0.9, 0.05, 0.05]]], dtype=np.float32)
+        
+        assert ctc_greedy_decode(probs, charset)[0][0] == "O"
+        (text, confidence), = ctc_greedy_decode(probs, charset, charset_mask(charset, "0123456789"))
+        assert text == "0"
+        assert confidence == pytest.approx(0.3)
+
+    def test_load_charset(self, tmp_path):
+        """Test that the blank is prepended and the space appended"""
+        path = tmp_path / "dict.txt"
+        path.write_text("a\nb\n", encoding="utf-8")
+        assert load_charset(str(path)) == ["<blank>", "a", "b", " "]
+
+
+class TestOnnxOCR:
+    """Test ONNX reader pre/postprocessing with fake sessions"""
+
+    def test_detect_scales_boxes_to_image(self):
+        """Test that DB mask regions become boxes in image coordinates"""
+        image = np.full((200, 400, 3), 255, dtype=np.uint8)
+        probs = np.zeros((1, 1, 192, 384), dtype=np.float32)
+        probs[0, 0, 40:60, 50:250] = 0.9
+        reader = make_reader(det_output=probs)
+
+        boxes = reader.detect(image)
+
+        assert len(boxes) == 1
+        box = boxes[0]
+        assert box.shape == (4, 2)
+        # Top-left corner first, expanded beyond the shrunk region
+        assert box[0, 0] < 50 * 400 / 384 and box[0, 1] < 40 * 200 / 192
+        assert box[2, 0] > 250 * 400 / 384 and box[2, 1] > 60 * 200 / 192
+
+    def test_detect_drops_low_score_regions(self):
+        """Test that regions below the box threshold are discarded"""
+        probs = np.zeros((1, 1, 96, 96), dtype=np.float32)
+        probs[0, 0, 10:30, 10:60] = 0.4
+        reader = make_reader(det_output=probs)
+
+        assert reader.detect(np.zeros((96, 96), dtype=np.uint8)) == []
+
+    def test_recognize_keeps_input_order(self):
+        """Test that crops sorted for batching are returned in input order"""
+        reader = make_reader()
+
+        def fake_rec(_, feed):
+            # Decode wide inputs as "1" and narrow ones as "2"
+            batch = feed["x"]
+            probs = np.zeros((len(batch), 2, 5), dtype=np.float32)
+            probs[:, 0, 1 if batch.shape[3] >= 480 else 2] = 1.0
+            probs[:, 1, 0] = 1.0
+            return [probs]
+
+        reader.rec_session.run.side_effect = fake_rec
+        crops = [np.zeros((20, 200, 3), dtype=np.uint8), np.zeros((20, 40, 3), dtype=np.uint8)]
+
+        results = reader.recognize(crops, batch_size=1)
+
+        assert [text for text, _ in results] == ["1", "2"]
+        # The narrow crop is recognized first
+        first_batch = reader.rec_session.run.call_args_list[0][0][1]["x"]
+        assert first_batch.shape == (1, 3, 48, 96)
+
+
+class TestOCREngineOnnx:
+    """Test the ONNX engine inside OCREngine"""
+
+    def test_process_with_onnx(self):
+        """Test that detected lines are recognized and joined"""
+        engine = OCREngine(languages=['en'], engines=[])
+        reader = MagicMock()
+        reader.detect.return_value = [
+            np.float32([[0, 30], [50, 30], [50, 50], [0, 50]]),
+            np.float32([[0, 0], [50, 0], [50, 20], [0, 20]])
+        ]
+        reader.recognize.return_value = [("first", 0.9), ("second", 0.7)]
+        engine.onnx_ocr = reader
+
+        text, confidence = engine.process_with_onnx(np.full((60, 60, 3), 255, dtype=np.uint8))
+
+        assert text == "first\nsecond"
+        assert confidence == pytest.approx(0.8)
+        crops = reader.recognize.call_args[0][0]
+        assert crops[0].shape[:2] == (20, 50)
+
+    def test_selectable_by_name(self):
+        """Test that the ocr_engine name 'onnx' routes to the ONNX engine"""
+        engine = OCREngine(languages=['en'], engines=[])
+        engine.paddle_ocr = MagicMock()
+        engine.onnx_ocr = MagicMock()
+        engine.onnx_ocr.detect.return_value = []
+
+        result = engine.process(np.zeros((10, 10, 3), dtype=np.uint8), engine="onnx")
+
+        assert result["engine"] == "onnx"
+        engine.paddle_ocr.ocr.assert_not_called()
+
+    def test_batch_with_onnx(self):
+        """Test that crops of all images go to one recognize call"""
+        engine = OCREngine(languages=['en'], engines=[])
+        reader = MagicMock()
+        reader.detect.return_value = [np.float32([[0, 0], [50, 0], [50, 20], [0, 20]])]
+        reader.recognize.side_effect = lambda crops, batch_size: [("line", 0.9)] * len(crops)
+        engine.onnx_ocr = reader
+
+        images = [np.full((60, 60, 3), 255, dtype=np.uint8), np.full((40, 80), 255, dtype=np.uint8)]
+        outputs = engine.batch_with_onnx(images)
+
+        assert outputs == [("line", 0.9), ("line", 0.9)]
+        assert reader.recognize.call_count == 1
@@ -0,0 +1,118 @@
+import pytest
+import asyncio
+import gc
+import json
+import os
+import numpy as np
+from unittest.mock import MagicMock, patch
+
+from app.core.config import settings
+from app.prefork import fork_workers, freeze_heap, preload_models
+from app.services import ocr_service, warmup
+from app.services.worker_pool import OCRWorkerPool
+from app.utils.memory import read_memory_usage
+
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(os, "fork") or not os.path.exists("/proc/self/smaps_rollup"),
+    reason="requires fork() and /proc/<pid>/smaps_rollup"
+)
+
+
+class TestPreforkMemorySharing:
+    """Test that forked workers share preloaded data copy-on-write"""
+    
+    MODEL_BYTES = 128 * 1024 * 1024
+    
+    def test_workers_share_preloaded_weights(self):
+        """Test PSS/RSS per worker after preloading 128 MB of 'model weights'"""
+        # Stand-in for loaded model weights; every page is touched
+        weights = np.ones(self.MODEL_BYTES, dtype=np.uint8)
+        freeze_heap()
+        
+        read_fd, write_fd = os.pipe()
+        
+        def report(index):
+            # Read-only use of the weights, as inference does
+            checksum = int(weights[::4096].sum())
+            usage = read_memory_usage()
+            os.write(write_fd, (json.dumps({"checksum": checksum, **usage}) + "\n").encode())
+        
+        pids = fork_workers(2, report)
+        os.close(write_fd)
+        
+        for pid in pids:
+            _, status = os.waitpid(pid, 0)
+            assert status == 0
+        
+        with os.fdopen(read_fd) as f:
+            reports = [json.loads(line) for line in f]
+        
+        assert len(reports) == 2
+        for usage in reports:
+            # The weights are resident in every worker...
+            assert usage["rss"] >= self.MODEL_BYTES
+            assert usage["shared"] >= self.MODEL_BYTES * 0.9
+            # ...but each worker is charged only its share of them
+            assert usage["pss"] < usage["rss"] - self.MODEL_BYTES / 2
+        
+        gc.unfreeze()
+        del weights
+
+
+def _engine_id(engine):
+    return id(engine)
+
+
+class TestPreloadModels:
+    """Test that workers use the engine preloaded by the master"""
+    
+    @pytest.fixture
+    def backend(self):
+        """Fake paddle backend and fresh process-wide engine and warm-up state"""
+        with patch.object(settings, "OCR_ENGINES", ["paddleocr"]), \
+                patch.object(settings, "OCR_WARMUP_ENABLED", False), \
+                patch.object(ocr_service, "PADDLE_AVAILABLE", True), \
+                patch.object(ocr_service, "_ocr_engine", None), \
+                patch.object(warmup, "warmup_state", warmup.WarmupState()), \
+                patch.object(ocr_service.OCREngine, "_create_backend", return_value=MagicMock()) as create:
+            yield create
+    
+    def test_workers_reuse_preloaded_engine(self, backend):
+        """Test that forked workers run jobs on the master's engine without reloading it"""
+        with patch.object(settings, "OCR_WORKERS", 1):
+            engine = preload_models()
+        loads = backend.call_count
+        assert loads >= 1
+        assert warmup.warmup_state.ready
+        
+        read_fd, write_fd = os.pipe()
+        
+        def report(index):
+            # As ProcessingService does in each worker
+            pool = OCRWorkerPool(seed_engine=ocr_service.get_ocr_engine(), workers=1, mode="thread")
+            used = asyncio.run(pool.run(_engine_id))
+            pool.shutdown()
+            os.write(write_fd, (json.dumps({
+                "reused": used == id(engine),
+                "loads": backend.call_count,
+                "ready": warmup.warmup_state.ready
+            }) + "\n").encode())
+        
+        pids = fork_workers(2, report)
+        os.close(write_fd)
+        for pid in pids:
+            _, status = os.waitpid(pid, 0)
+            assert status == 0
+        
+        with os.fdopen(read_fd) as f:
+            reports = [json.loads(line) for line in f]
+        
+        assert reports == [{"reused": True, "loads": loads, "ready": True}] * 2
+    
+    def test_several_thread_workers_warm_up_in_each_worker(self, backend):
+        """Test that warm-up is left to the workers when they create more engines"""
+        with patch.object(settings, "OCR_WORKERS", 2):
+            preload_models()
+        
+        assert not warmup.warmup_state.ready
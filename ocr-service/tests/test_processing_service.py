@@ -3,7 +3,7 @@ from unittest.mock import patch, MagicMock, AsyncMock
 import numpy as np
 from datetime import datetime
 
-from app.services.processing_service import ProcessingService, get_processing_service
+from app.services.processing_service import PreprocessStats, ProcessingService, get_processing_service
 from app.models.schemas import ProcessingStatus
 
 
@@ -30,7 +30,7 @@ class TestProcessingService:
     
     @pytest.mark.asyncio
     @patch('app.services.processing_service.get_ocr_engine')
-    @patch('app.services.processing_service.ImagePreprocessor')
+    @patch('app.services.pipeline.ImagePreprocessor')
     async def test_process_image_success(self, mock_preprocessor, mock_get_engine, sample_image_bytes):
         """Test successful image processing"""
         # Mock OCR engine
@@ -80,6 +80,52 @@ class TestProcessingService:
         assert result is not None
         assert result.status == ProcessingStatus.COMPLETED
     
+    @pytest.mark.asyncio
+    @patch('app.services.processing_service.get_ocr_engine')
+    async def test_process_image_records_preprocessing_path(self, mock_get_engine, sample_image_bytes):
+        """Test that the denoise method chosen for the image is reported"""
+        mock_engine = MagicMock()
+        mock_engine.process.return_value = {
+            "text": "Test text",
+            "confidence": 0.8,
+            "engine": "paddleocr",
+            "processing_time": 1.0
+        }
+        mock_get_engine.return_value = mock_engine
+        
+        service = ProcessingService()
+        result = await service.process_image(image_data=sample_image_bytes, preprocess=True)
+        
+        assert result.status == ProcessingStatus.COMPLETED
+        assert result.preprocessing["denoise"] == "none"
+        assert result.preprocessing["orientation"] == 0
+    
+    @pytest.mark.asyncio
+    @patch('app.services.processing_service.get_ocr_engine')
+    async def test_process_image_with_preprocess_steps(self, mock_get_engine, sample_image_bytes):
+        """Test that requested preprocessing steps are run, timed and aggregated"""
+        mock_engine = MagicMock()
+        mock_engine.process.return_value = {
+            "text": "Test text",
+            "confidence": 0.8,
+            "engine": "paddleocr",
+            "processing_time": 1.0
+        }
+        mock_get_engine.return_value = mock_engine
+        
+        service = ProcessingService()
+        with patch("app.services.processing_service.preprocess_stats", PreprocessStats()) as stats:
+            result = await service.process_image(
+                image_data=sample_image_bytes,
+                preprocess_steps=["grayscale", "enhance_contrast"]
+            )
+        
+        assert result.status == ProcessingStatus.COMPLETED
+        assert result.preprocessing["profile"] == "custom"
+        assert [timing["step"] for timing in result.preprocessing["steps"]] == ["grayscale", "enhance_contrast"]
+        assert stats.stats()["jobs_by_profile"] == {"custom": 1}
+        assert stats.stats()["steps"]["grayscale"]["ms"]["count"] == 1
+    
     @pytest.mark.asyncio
     @patch('app.services.processing_service.get_ocr_engine')
     async def test_process_image_failure(self, mock_get_engine, sample_image_bytes):
@@ -104,12 +150,15 @@ class TestProcessingService:
     async def test_process_batch(self, mock_get_engine, sample_image_bytes):
         """Test batch processing"""
         mock_engine = MagicMock()
-        mock_engine.process.return_value = {
-            "text": "Batch test",
-            "confidence": 0.85,
-            "engine": "paddleocr",
-            "processing_time": 1.0
-        }
+        mock_engine.process_batch.side_effect = lambda images, **kwargs: [
+            {
+                "text": "Batch test",
+                "confidence": 0.85,
+                "engine": "paddleocr",
+                "processing_time": 1.0
+            }
+            for _ in images
+        ]
         mock_get_engine.return_value = mock_engine
         
         service = ProcessingService()
@@ -125,6 +174,275 @@ class TestProcessingService:
         assert len(results) == 3
         for result in results:
             assert result.job_id.startswith("test-batch-123")
+            assert result.status == ProcessingStatus.COMPLETED
+        
+        # All images are recognized in a single batched call
+        mock_engine.process_batch.assert_called_once()
+        assert len(mock_engine.process_batch.call_args[0][0]) == 3
+    
+    @pytest.mark.asyncio
+    @patch('app.services.processing_service.get_ocr_engine')
+    async def test_process_batch_undecodable_image(self, mock_get_engine, sample_image_bytes):
+        """Test that an undecodable image fails without failing the batch"""
+        mock_engine = MagicMock()
+        mock_engine.process_batch.side_effect = lambda images, **kwargs: [
+            {"text": "Batch test", "confidence": 0.85, "engine": "paddleocr", "processing_time": 1.0}
+            for _ in images
+        ]
+        mock_get_engine.return_value = mock_engine
+        
+        service = ProcessingService()
+        results = await service.process_batch(
+            images=[sample_image_bytes, b"not an image"],
+            batch_id="test-batch-456",
+            preprocess=False
+        )
+        
+        assert results[0].status == ProcessingStatus.COMPLETED
+        assert results[1].status == ProcessingStatus.FAILED
+
+    
+    @patch('app.services.processing_service.get_ocr_engine')
+    def test_process_mode_builds_no_engine_here(self, mock_get_engine):
+        """Test that the parent process loads no OCR engine when pool processes own them"""
+        with patch('app.services.processing_service.settings.OCR_WORKER_MODE', "process"):
+            service = ProcessingService()
+        
+        mock_get_engine.assert_not_called()
+        assert service.ocr_engine is None
+        assert service.worker_pool.mode == "process"
+        service.worker_pool.shutdown()
+
+
+class TestProcessingServiceCascade:
+    """Test the preprocessing stage of the engine cascade"""
+    
+    @pytest.fixture
+    def sample_image_bytes(self):
+        """Create sample image bytes"""
+        import io
+        from PIL import Image
+        
+        img = Image.new('RGB', (100, 100), color='white')
+        img_byte_arr = io.BytesIO()
+        img.save(img_byte_arr, format='JPEG')
+        return img_byte_arr.getvalue()
+    
+    @pytest.mark.asyncio
+    @patch('app.services.processing_service.get_ocr_engine')
+    async def test_escalates_to_preprocessed_image(self, mock_get_engine, sample_image_bytes):
+        """Test that a rejected raw-image result is retried on the preprocessed image"""
+        from app.core.config import settings
+        
+        mock_engine = MagicMock()
+        mock_engine.process.side_effect = [
+            {"text": "noise", "confidence": 0.3, "engine": "easyocr",
+             "cascade_stage": "easyocr", "accepted": False, "processing_time": 1.0},
+            {"text": "จำนวนเงิน 100.00 บาท", "confidence": 0.9, "engine": "paddleocr",
+             "cascade_stage": "paddleocr", "accepted": True, "processing_time": 0.5},
+        ]
+        mock_get_engine.return_value = mock_engine
+        
+        with patch.object(settings, "OCR_CASCADE_ENABLED", True):
+            service = ProcessingService()
+            result = await service.process_image(image_data=sample_image_bytes, preprocess=False)
+        
+        assert result.status == ProcessingStatus.COMPLETED
+        assert result.cascade_stage == "paddleocr+preprocess"
+        assert result.extracted_data.amount == 100.0
+
+
+class TestProcessingServiceTemplates:
+    """Test the slip template fast path"""
+    
+    TEMPLATE_RESULT = {
+        "text": "1,500.00\n14:30",
+        "confidence": 0.9,
+        "engine": "tesseract",
+        "template": "KBANK/2023",
+        "template_score": 0.97,
+        "fields": {"amount": 1500.0, "transaction_time": "14:30", "bank": {"name": "Kasikorn Bank", "code": "KBANK"}},
+        "processing_time": 0.05
+    }
+    
+    @pytest.mark.asyncio
+    @patch('app.services.processing_service.run_template_ocr')
+    @patch('app.services.processing_service.get_ocr_engine')
+    async def test_matched_template_skips_full_pipeline(self, mock_get_engine, mock_template_ocr):
+        """Test that a template match completes the job without full-image OCR"""
+        from app.core.config import settings
+        
+        mock_engine = MagicMock()
+        mock_get_engine.return_value = mock_engine
+        mock_template_ocr.return_value = self.TEMPLATE_RESULT
+        
+        with patch.object(settings, "OCR_TEMPLATES_ENABLED", True):
+            service = ProcessingService()
+            result = await service.process_image(image_data=b"slip")
+        
+        assert result.status == ProcessingStatus.COMPLETED
+        assert result.template == "KBANK/2023"
+        assert result.extracted_data.amount == 1500.0
+        assert result.extracted_data.bank.code == "KBANK"
+        mock_engine.process.assert_not_called()
+    
+    @pytest.mark.asyncio
+    @patch('app.services.processing_service.run_template_ocr')
+    @patch('app.services.processing_service.get_ocr_engine')
+    async def test_batch_mixes_template_and_full_pipeline(self, mock_get_engine, mock_template_ocr):
+        """Test that unmatched images in a batch go through batched OCR"""
+        from app.core.config import settings
+        
+        mock_engine = MagicMock()
+        mock_engine.process_batch.return_value = [
+            {"text": "จำนวนเงิน 100.00 บาท", "confidence": 0.9, "engine": "paddleocr", "processing_time": 0.5}
+        ]
+        mock_get_engine.return_value = mock_engine
+        mock_template_ocr.side_effect = lambda engine, data, *_: self.TEMPLATE_RESULT if data == b"kbank" else None
+        
+        with patch.object(settings, "OCR_TEMPLATES_ENABLED", True), \
+                patch('app.services.pipeline.ImagePreprocessor') as mock_preprocessor:
+            mock_preprocessor.preprocess_image.return_value = np.ones((100, 100), dtype=np.uint8)
+            service = ProcessingService()
+            results = await service.process_batch([b"kbank", b"other"], batch_id="batch")
+        
+        assert [r.template for r in results] == ["KBANK/2023", None]
+        assert results[1].extracted_data.amount == 100.0
+        assert len(mock_engine.process_batch.call_args.args[0]) == 1
+
+
+class TestProcessingServiceQr:
+    """Test the QR code fast path"""
+    
+    SLIP_QR = {
+        "kind": "slip_verification",
+        "crc_valid": True,
+        "reference_number": "015123143000BPM06312",
+        "bank": {"name": "Siam Commercial Bank", "code": "SCB"},
+        "payload": "0041000600000101030140220015123143000BPM063125102TH91049C3F",
+        "processing_time": 0.01
+    }
+    
+    @pytest.mark.asyncio
+    @patch('app.services.processing_service.read_slip_qr')
+    @patch('app.services.processing_service.get_ocr_engine')
+    async def test_qr_with_required_fields_skips_ocr(self, mock_get_engine, mock_read_qr):
+        """Test that a QR code carrying every required field completes the job without OCR"""
+        from app.core.config import settings
+        
+        mock_engine = MagicMock()
+        mock_get_engine.return_value = mock_engine
+        mock_read_qr.return_value = self.SLIP_QR
+        
+        with patch.object(settings, "OCR_QR_ENABLED", True), \
+                patch.object(settings, "OCR_CASCADE_REQUIRED_FIELDS", ["reference_number"]):
+            service = ProcessingService()
+            result = await service.process_image(image_data=b"slip")
+        
+        assert result.status == ProcessingStatus.COMPLETED
+        assert result.qr_used
+        assert result.qr_kind == "slip_verification"
+        assert result.ocr_engine == "qr"
+        assert result.extracted_data.reference_number == "015123143000BPM06312"
+        mock_engine.process.assert_not_called()
+    
+    @pytest.mark.asyncio
+    @patch('app.services.processing_service.read_slip_qr')
+    @patch('app.services.processing_service.get_ocr_engine')
+    async def test_qr_fields_override_ocr(self, mock_get_engine, mock_read_qr):
+        """Test that OCR reads the amount while reference and bank come from the QR code"""
+        from app.core.config import settings
+        
+        mock_engine = MagicMock()
+        mock_engine.process.return_value = {
+            "text": "ธนาคารกสิกรไทย\nจำนวนเงิน: 1,500.00 บาท\nเลขที่รายการ: 0I5I23",
+            "confidence": 0.9,
+            "engine": "paddleocr",
+            "processing_time": 1.0
+        }
+        mock_get_engine.return_value = mock_engine
+        mock_read_qr.return_value = self.SLIP_QR
+        
+        with patch.object(settings, "OCR_QR_ENABLED", True), \
+                patch('app.services.pipeline.ImagePreprocessor') as mock_preprocessor:
+            mock_preprocessor.preprocess_image.return_value = np.ones((100, 100), dtype=np.uint8)
+            service = ProcessingService()
+            result = await service.process_image(image_data=b"slip", preprocess=False)
+        
+        assert result.status == ProcessingStatus.COMPLETED
+        assert result.qr_used
+        assert result.ocr_engine == "paddleocr"
+        assert result.extracted_data.amount == 1500.0
+        assert result.extracted_data.reference_number == "015123143000BPM06312"
+        assert result.extracted_data.bank.code == "SCB"
+    
+    @pytest.mark.asyncio
+    @patch('app.services.processing_service.read_slip_qr')
+    @patch('app.services.processing_service.get_ocr_engine')
+    async def test_invalid_crc_is_ignored(self, mock_get_engine, mock_read_qr):
+        """Test that a QR code failing its CRC check contributes nothing"""
+        from app.core.config import settings
+        
+        mock_engine = MagicMock()
+        mock_engine.process.return_value = {
+            "text": "จำนวนเงิน: 1,500.00 บาท",
+            "confidence": 0.9,
+            "engine": "paddleocr",
+            "processing_time": 1.0
+        }
+        mock_get_engine.return_value = mock_engine
+        mock_read_qr.return_value = {**self.SLIP_QR, "crc_valid": False}
+        
+        with patch.object(settings, "OCR_QR_ENABLED", True), \
+                patch('app.services.pipeline.ImagePreprocessor') as mock_preprocessor:
+            mock_preprocessor.preprocess_image.return_value = np.ones((100, 100), dtype=np.uint8)
+            service = ProcessingService()
+            result = await service.process_image(image_data=b"slip", preprocess=False)
+        
+        assert result.status == ProcessingStatus.COMPLETED
+        assert not result.qr_used
+        assert result.extracted_data.reference_number != "015123143000BPM06312"
+
+
+    @pytest.mark.asyncio
+    @patch('app.services.processing_service.read_slip_qr')
+    @patch('app.services.processing_service.get_ocr_engine')
+    async def test_promptpay_qr_only_cross_checks(self, mock_get_engine, mock_read_qr):
+        """Test that a payment-request QR never skips OCR or replaces the OCR amount"""
+        from app.core.config import settings
+        
+        mock_engine = MagicMock()
+        mock_engine.process.return_value = {
+            "text": "จำนวนเงิน: 1,200.00 บาท",
+            "confidence": 0.9,
+            "engine": "paddleocr",
+            "processing_time": 1.0
+        }
+        mock_get_engine.return_value = mock_engine
+        mock_read_qr.return_value = {
+            "kind": "promptpay",
+            "crc_valid": True,
+            "amount": 1500.0,
+            "promptpay_id": "0066812345678",
+            "payload": "00020101021229370016A000000677010111011300668123456785303764540715000.005802TH6304ABCD",
+            "processing_time": 0.01
+        }
+        
+        with patch.object(settings, "OCR_QR_ENABLED", True), \
+                patch.object(settings, "OCR_CASCADE_REQUIRED_FIELDS", ["amount"]), \
+                patch('app.services.pipeline.ImagePreprocessor') as mock_preprocessor:
+            mock_preprocessor.preprocess_image.return_value = np.ones((100, 100), dtype=np.uint8)
+            service = ProcessingService()
+            result = await service.process_image(image_data=b"slip", preprocess=False)
+        
+        assert result.status == ProcessingStatus.COMPLETED
+        assert result.ocr_engine == "paddleocr"
+        assert not result.qr_used
+        assert result.qr_kind == "promptpay"
+        assert result.extracted_data.amount == 1200.0
+        assert result.extracted_data.receiver_account != "0066812345678"
+        assert result.qr_check["amount"] is False
+        mock_engine.process.assert_called_once()
 
 
 class TestProcessingServiceGetResult:
@@ -0,0 +1,126 @@
+import cv2
+import numpy as np
+import pytest
+
+from app.services.pipeline import read_slip_qr
+from app.utils.qr_payload import crc16_ccitt, cross_check, extracted_fields, parse_slip_qr, parse_tlv, trusted_fields
+
+
+def tlv(tag: str, value: str) -> str:
+    """Encode one TLV record"""
+    return f"{tag}{len(value):02d}{value}"
+
+
+def with_crc(body: str, tag: str) -> str:
+    """Append a CRC record to a payload"""
+    body += f"{tag}04"
+    return body + crc16_ccitt(body)
+
+
+def slip_payload(bank_id: str = "004", ref: str = "015123143000BPM06312") -> str:
+    """Slip verification mini QR payload"""
+    header = tlv("00", "000001") + tlv("01", bank_id) + tlv("02", ref)
+    return with_crc(tlv("00", header) + tlv("51", "TH"), "91")
+
+
+def promptpay_payload(amount: str = "1500.00") -> str:
+    """PromptPay EMVCo payment QR payload"""
+    merchant = tlv("00", "A000000677010111") + tlv("01", "0066812345678")
+    body = tlv("00", "01") + tlv("01", "12") + tlv("29", merchant) + tlv("53", "764") + tlv("54", amount) + tlv("58", "TH")
+    return with_crc(body, "63")
+
+
+class TestTlvAndCrc:
+    """Test EMVCo record parsing and checksums"""
+    
+    def test_parse_tlv(self):
+        """Test that records are split by their lengths"""
+        assert parse_tlv("0002ab0103xyz") == {"00": "ab", "01": "xyz"}
+    
+    def test_parse_tlv_truncated(self):
+        """Test that a record longer than the payload is rejected"""
+        with pytest.raises(ValueError):
+            parse_tlv("0010abc")
+    
+    def test_crc_check_value(self):
+        """Test the CRC-16/CCITT-FALSE check value"""
+        assert crc16_ccitt("123456789") == "29B1"
+
+
+class TestParseSlipQr:
+    """Test parsing of Thai slip QR payloads"""
+    
+    def test_slip_verification(self):
+        """Test that the reference and sending bank come from a slip QR"""
+        parsed = parse_slip_qr(slip_payload())
+        
+        assert parsed["kind"] == "slip_verification"
+        assert parsed["crc_valid"]
+        assert parsed["reference_number"] == "015123143000BPM06312"
+        assert parsed["bank"]["code"] == "KBANK"
+        assert extracted_fields(parsed) == {
+            "reference_number": "015123143000BPM06312",
+            "bank": parsed["bank"]
+        }
+    
+    def test_promptpay(self):
+        """Test that amount and PromptPay ID come from a payment QR"""
+        parsed = parse_slip_qr(promptpay_payload())
+        
+        assert parsed["kind"] == "promptpay"
+        assert parsed["crc_valid"]
+        assert extracted_fields(parsed) == {"amount": 1500.0, "receiver_account": "0066812345678"}
+    
+    def test_invalid_crc(self):
+        """Test that a corrupted payload fails its CRC check"""
+        payload = slip_payload()
+        corrupted = payload[:30] + ("9" if payload[30] != "9" else "8") + payload[31:]
+        assert parse_slip_qr(corrupted)["crc_valid"] is False
+    
+    def test_unknown_payloads(self):
+        """Test that URLs and unrelated TLV payloads are not slip QR codes"""
+        assert parse_slip_qr("https://example.com") is None
+        assert parse_slip_qr(tlv("00", "01") + tlv("59", "SHOP")) is None
+
+
+class TestTrustedFields:
+    """Test which QR fields may replace OCR and how the others are cross-checked"""
+    
+    def test_slip_verification_trusted(self):
+        """Test that slip verification fields replace OCR"""
+        assert trusted_fields(parse_slip_qr(slip_payload()))["reference_number"] == "015123143000BPM06312"
+    
+    def test_promptpay_not_trusted(self):
+        """Test that a payment request never replaces OCR"""
+        assert trusted_fields(parse_slip_qr(promptpay_payload())) == {}
+    
+    @pytest.mark.parametrize("extracted, expected", [
+        ({"amount": 1500.0, "receiver_account": "xxx-xxx-5678"}, {"amount": True, "receiver_account": True}),
+        ({"amount": 150.0, "receiver_account": "081-234-5678"}, {"amount": False, "receiver_account": True}),
+        ({"amount": 1500.0, "receiver_account": "xxx-xxx-9999"}, {"amount": True, "receiver_account": False}),
+        ({}, {})
+    ])
+    def test_promptpay_cross_check(self, extracted, expected):
+        """Test comparing a payment request with the OCR reading, masked accounts included"""
+        assert cross_check(parse_slip_qr(promptpay_payload()), extracted) == expected
+
+
+class TestReadSlipQr:
+    """Test decoding the QR code from slip image bytes"""
+    
+    def test_reads_qr_from_slip(self):
+        """Test that a QR code drawn on a slip is decoded and parsed"""
+        qr = cv2.QRCodeEncoder.create().encode(slip_payload())
+        qr = cv2.resize(qr, None, fx=6, fy=6, interpolation=cv2.INTER_NEAREST)
+        slip = np.full((1200, 600), 255, dtype=np.uint8)
+        slip[800:800 + qr.shape[0], 150:150 + qr.shape[1]] = qr
+        
+        parsed = read_slip_qr(None, cv2.imencode(".png", slip)[1].tobytes())
+        
+        assert parsed["reference_number"] == "015123143000BPM06312"
+        assert parsed["payload"] == slip_payload()
+    
+    def test_slip_without_qr(self):
+        """Test that a slip without a QR code yields None"""
+        slip = np.full((400, 300), 255, dtype=np.uint8)
+        assert read_slip_qr(None, cv2.imencode(".png", slip)[1].tobytes()) is None
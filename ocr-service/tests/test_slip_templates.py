@@ -0,0 +1,129 @@
+import json
+
+import cv2
+import numpy as np
+import pytest
+from unittest.mock import MagicMock, patch
+
+from app.core.config import settings
+from app.services.pipeline import run_template_ocr
+from app.services.slip_templates import SlipTemplate, TemplateRegistry, crop_region, read_template
+
+
+TEMPLATE = {
+    "bank": "KBANK",
+    "version": "test",
+    "aspect_ratio": 2.0,
+    "header_color": "#00A950",
+    "anchors": [{"region": [0.0, 0.0, 1.0, 0.1], "keywords": ["kplus"]}],
+    "regions": {
+        "amount": [0.3, 0.6, 0.9, 0.7],
+        "time": [0.3, 0.2, 0.6, 0.3],
+        "reference": [0.3, 0.4, 0.9, 0.5]
+    }
+}
+
+
+def render_slip(header_rgb=(0x00, 0xA9, 0x50), width=400, height=800) -> np.ndarray:
+    """White slip with a coloured header band"""
+    image = np.full((height, width, 3), 255, dtype=np.uint8)
+    image[:height // 10] = header_rgb[::-1]
+    return image
+
+
+@pytest.fixture
+def registry(tmp_path):
+    (tmp_path / "kbank.json").write_text(json.dumps(TEMPLATE))
+    (tmp_path / "broken.json").write_text('{"bank": "SCB"}')
+    return TemplateRegistry(str(tmp_path))
+
+
+def fake_engine(fields, anchor_text="KPLUS"):
+    """Engine whose field reads return the given text per allowlist name"""
+    engine = MagicMock()
+    engine.recognize.return_value = {"text": anchor_text, "confidence": 0.9, "engine": "paddleocr"}
+    engine.recognize_field.side_effect = lambda crop, field: {
+        "text": fields.get(field, ""), "confidence": 0.9, "engine": "tesseract"
+    }
+    return engine
+
+
+class TestTemplateRegistry:
+    """Test loading and matching slip templates"""
+    
+    def test_invalid_files_skipped(self, registry):
+        """Test that malformed templates do not prevent loading the others"""
+        assert [t.name for t in registry.templates] == ["KBANK/test"]
+    
+    def test_rejects_bad_regions(self):
+        """Test that regions outside 0-1 or with unknown names are rejected"""
+        with pytest.raises(ValueError):
+            SlipTemplate.from_dict({**TEMPLATE, "regions": {"amount": [0.5, 0.2, 0.4, 0.3]}})
+        with pytest.raises(ValueError):
+            SlipTemplate.from_dict({**TEMPLATE, "regions": {"fee": [0.1, 0.1, 0.2, 0.2]}})
+    
+    def test_matches_layout(self, registry):
+        """Test that a slip with the template's shape and header colour matches"""
+        template, score = registry.match(render_slip())
+        
+        assert template.name == "KBANK/test"
+        assert score > 0.95
+    
+    def test_weak_match_rejected(self, registry):
+        """Test that another header colour or aspect ratio does not match"""
+        assert registry.match(render_slip(header_rgb=(0x4E, 0x2A, 0x84))) is None
+        assert registry.match(render_slip(height=500)) is None
+    
+    def test_match_restricted_to_bank(self, registry):
+        """Test that a known bank only considers its own templates"""
+        assert registry.match(render_slip(), bank="KBANK")[0].name == "KBANK/test"
+        assert registry.match(render_slip(), bank="SCB") is None
+    
+    def test_crop_region(self):
+        """Test that normalized regions map to pixel crops"""
+        crop = crop_region(np.zeros((800, 400)), [0.25, 0.5, 0.75, 0.75])
+        assert crop.shape == (200, 200)
+
+
+class TestReadTemplate:
+    """Test reading the field regions of a matched template"""
+    
+    def test_fields_extracted(self):
+        """Test that field crops are read with their allowlist and parsed"""
+        template = SlipTemplate.from_dict(TEMPLATE)
+        engine = fake_engine({"amount": "1,500.00", "time": "14:30", "reference": "ABC123456789"})
+        
+        result = read_template(engine, render_slip(), template)
+        
+        assert result["template"] == "KBANK/test"
+        assert result["engine"] == "tesseract"
+        assert result["fields"]["amount"] == 1500.0
+        assert result["fields"]["transaction_time"] == "14:30"
+        assert result["fields"]["reference_number"] == "ABC123456789"
+        assert result["fields"]["bank"] == {"name": "Kasikorn Bank", "code": "KBANK"}
+        assert engine.recognize_field.call_count == 3
+    
+    def test_missing_anchor_falls_back(self):
+        """Test that a slip without the anchor text is left to the full pipeline"""
+        template = SlipTemplate.from_dict(TEMPLATE)
+        engine = fake_engine({"amount": "1,500.00"}, anchor_text="Bangkok Bank")
+        
+        assert read_template(engine, render_slip(), template) is None
+        engine.recognize_field.assert_not_called()
+    
+    def test_missing_required_field_falls_back(self):
+        """Test that an unreadable required field is left to the full pipeline"""
+        template = SlipTemplate.from_dict(TEMPLATE)
+        
+        assert read_template(fake_engine({"time": "14:30"}), render_slip(), template) is None
+    
+    def test_run_template_ocr(self, registry):
+        """Test the worker job on encoded image bytes"""
+        _, encoded = cv2.imencode(".png", render_slip())
+        engine = fake_engine({"amount": "250.00"})
+        
+        with patch("app.services.pipeline.get_template_registry", return_value=registry):
+            result = run_template_ocr(engine, encoded.tobytes())
+        
+        assert result["fields"]["amount"] == 250.0
+        assert result["template_score"] > 0.95
@@ -0,0 +1,90 @@
+import pytest
+import os
+import cv2
+
+from app.core import threading_config
+from app.core.threading_config import configure_threading, detect_cpu_limit, split_cpus
+
+
+class TestDetectCpuLimit:
+    """Test CPU limit detection from cgroups"""
+    
+    @pytest.fixture(autouse=True)
+    def eight_cores(self, monkeypatch):
+        monkeypatch.setattr(os, "sched_getaffinity", lambda pid: set(range(8)), raising=False)
+    
+    def test_cgroup2_quota(self, tmp_path):
+        """Test that a cgroup v2 quota below the core count is used"""
+        (tmp_path / "cpu.max").write_text("150000 100000\n")
+        assert detect_cpu_limit(str(tmp_path)) == (1.5, "cgroup2")
+    
+    def test_cgroup2_unlimited(self, tmp_path):
+        """Test that an unlimited cgroup falls back to the affinity mask"""
+        (tmp_path / "cpu.max").write_text("max 100000\n")
+        assert detect_cpu_limit(str(tmp_path)) == (8.0, "affinity")
+    
+    def test_cgroup1_quota(self, tmp_path):
+        """Test cgroup v1 CFS quota"""
+        (tmp_path / "cpu").mkdir()
+        (tmp_path / "cpu" / "cpu.cfs_quota_us").write_text("50000\n")
+        (tmp_path / "cpu" / "cpu.cfs_period_us").write_text("100000\n")
+        assert detect_cpu_limit(str(tmp_path)) == (0.5, "cgroup1")
+
+
+class TestSplitCpus:
+    """Test core assignment"""
+    
+    def test_no_pinning(self):
+        """Test that no cores means no pinning"""
+        assert split_cpus([], 2) == [None, None]
+    
+    def test_contiguous_sets(self):
+        """Test that cores are split into contiguous sets"""
+        assert split_cpus([0, 1, 2, 3, 4], 2) == [[0, 1, 2], [3, 4]]
+    
+    def test_more_processes_than_cores(self):
+        """Test that process count is capped at the core count"""
+        assert split_cpus([2, 3], 4) == [[2], [3]]
+
+
+class TestConfigureThreading:
+    """Test applying the thread configuration"""
+    
+    @pytest.fixture(autouse=True)
+    def restore(self):
+        threads = cv2.getNumThreads()
+        env = {name: os.environ.get(name) for name in threading_config.THREAD_ENV_VARS}
+        yield
+        cv2.setNumThreads(threads)
+        for name, value in env.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+    
+    def test_threads_divided_by_concurrency(self, monkeypatch):
+        """Test that the CPU limit is shared by the concurrent OCR jobs"""
+        monkeypatch.setattr(threading_config, "detect_cpu_limit", lambda: (4.0, "cgroup2"))
+        monkeypatch.setattr(threading_config.settings, "OCR_THREADS", 0)
+        monkeypatch.delenv("OMP_NUM_THREADS", raising=False)
+        
+        config = configure_threading(cpus=[], concurrency=2)
+        
+        assert config.threads == 2
+        assert cv2.getNumThreads() == 2
+        assert os.environ["OMP_NUM_THREADS"] == "2"
+    
+    def test_at_least_one_thread(self, monkeypatch):
+        """Test that a fractional CPU limit still gives one thread"""
+        monkeypatch.setattr(threading_config, "detect_cpu_limit", lambda: (0.5, "cgroup1"))
+        monkeypatch.setattr(threading_config.settings, "OCR_THREADS", 0)
+        
+        assert configure_threading(cpus=[], concurrency=2).threads == 1
+    
+    def test_explicit_environment_wins(self, monkeypatch):
+        """Test that an explicitly set OMP_NUM_THREADS is kept"""
+        monkeypatch.setenv("OMP_NUM_THREADS", "3")
+        
+        configure_threading(threads=1, cpus=[])
+        
+        assert os.environ["OMP_NUM_THREADS"] == "3"
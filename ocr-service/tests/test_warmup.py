@@ -0,0 +1,118 @@
+import pytest
+import cv2
+import numpy as np
+from unittest.mock import MagicMock, patch
+
+from app.services import warmup
+from app.services.engine_router import EngineRouter
+from app.services.warmup import WarmupState, run_warmup, synthetic_slip, warm_up_engine
+from app.utils.rolling_stats import recording
+
+
+class FakePool:
+    """Worker pool stand-in running one job per engine inline"""
+    
+    def __init__(self, *engines):
+        self.engines = engines
+        self.calls = []
+    
+    async def run_on_every_worker(self, func, *args, record=True):
+        self.calls.append((func.__name__, record))
+        return [func(engine, *args) for engine in self.engines]
+
+
+class TestSyntheticSlip:
+    """Test synthetic warm-up images"""
+    
+    def test_phone_aspect_png(self):
+        """Test that slips decode at the requested height with a 9:16 aspect"""
+        image = cv2.imdecode(np.frombuffer(synthetic_slip(640), np.uint8), cv2.IMREAD_COLOR)
+        assert image.shape == (640, 360, 3)
+        # Text was drawn below the header band
+        assert image[100:].min() < 100
+
+
+class TestWarmup:
+    """Test warm-up runs and readiness state"""
+    
+    @pytest.fixture(autouse=True)
+    def small_sizes(self, monkeypatch):
+        monkeypatch.setattr(warmup.settings, "OCR_WARMUP_ENABLED", True)
+        monkeypatch.setattr(warmup.settings, "OCR_WARMUP_SIZES", [320, 640])
+    
+    def test_warm_up_engine_runs_primary_engine_at_every_size(self):
+        """Test that only the primary engine runs, at every size"""
+        engine = MagicMock()
+        engine.engines = ["paddleocr", "easyocr"]
+        state = WarmupState()
+        
+        warm_up_engine(engine, state)
+        
+        assert state.ready and state.status == "done"
+        assert engine.process.call_count == 2
+        assert {call.kwargs["engine"] for call in engine.process.call_args_list} == {"paddleocr"}
+        assert set(state.stages) == {
+            "preprocess_320", "paddleocr_320",
+            "preprocess_640", "paddleocr_640"
+        }
+        assert state.duration is not None
+    
+    def test_warm_up_left_out_of_statistics(self):
+        """Test that engine calls made during warm-up are not recorded"""
+        router = EngineRouter()
+        engine = MagicMock()
+        engine.engines = ["paddleocr"]
+        engine.process.side_effect = lambda image, engine: router.record_success(engine, 0.5, 0.9)
+        
+        warm_up_engine(engine, WarmupState())
+        
+        assert engine.process.call_count == 2
+        assert router.stats()["engines"] == {}
+        assert recording()
+    
+    def test_engine_errors_recorded(self):
+        """Test that a failing engine does not stop warm-up"""
+        engine = MagicMock()
+        engine.engines = ["paddleocr"]
+        engine.process.side_effect = RuntimeError("model missing")
+        state = WarmupState()
+        
+        warm_up_engine(engine, state)
+        
+        assert state.ready
+        assert len(state.errors) == 2
+    
+    def test_disabled_is_ready(self, monkeypatch):
+        """Test that a disabled warm-up reports ready immediately"""
+        monkeypatch.setattr(warmup.settings, "OCR_WARMUP_ENABLED", False)
+        state = warm_up_engine(MagicMock(), WarmupState())
+        assert state.ready and state.status == "skipped"
+    
+    @pytest.mark.asyncio
+    async def test_run_warmup_on_every_worker(self):
+        """Test that every worker warms its own engine, unrecorded by the pool"""
+        engines = [MagicMock(engines=["paddleocr", "easyocr"]) for _ in range(3)]
+        pool = FakePool(*engines)
+        state = WarmupState()
+        
+        assert not state.ready
+        await run_warmup(pool, state)
+        
+        assert state.ready and state.status == "done"
+        assert pool.calls == [("warm_up_worker", False)]
+        for engine in engines:
+            assert [call.kwargs["engine"] for call in engine.process.call_args_list] == ["paddleocr"] * 2
+        assert set(state.stages) == {"preprocess_320", "paddleocr_320", "preprocess_640", "paddleocr_640"}
+    
+    @pytest.mark.asyncio
+    async def test_run_warmup_ready_when_one_worker_fails(self):
+        """Test that warm-up errors of one worker are reported without failing"""
+        broken = MagicMock(engines=["paddleocr"])
+        broken.process.side_effect = RuntimeError("model missing")
+        pool = FakePool(MagicMock(engines=["paddleocr"]), broken)
+        state = WarmupState()
+        
+        await run_warmup(pool, state)
+        
+        assert state.ready and state.status == "done"
+        assert state.errors == ["paddleocr@320: model missing", "paddleocr@640: model missing"]
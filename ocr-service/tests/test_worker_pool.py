@@ -0,0 +1,117 @@
+import pytest
+import asyncio
+import os
+import threading
+import time
+from unittest.mock import MagicMock
+
+from app.services.worker_pool import EnginePool, OCRWorkerPool
+
+
+def _engine_id(engine, delay=0.0):
+    time.sleep(delay)
+    return id(engine)
+
+
+def _thread_name(engine):
+    return threading.current_thread().name
+
+
+def _pid(engine):
+    return os.getpid()
+
+
+class TestEnginePool:
+    """Test engine checkout"""
+    
+    def test_seed_engine_reused(self):
+        """Test that the seed engine is handed out before creating new ones"""
+        seed = MagicMock()
+        factory = MagicMock()
+        pool = EnginePool(factory, size=2, seed=seed)
+        
+        with pool.checkout() as engine:
+            assert engine is seed
+        with pool.checkout() as engine:
+            assert engine is seed
+        
+        factory.assert_not_called()
+    
+    def test_engines_created_lazily(self):
+        """Test that a new engine is created only when all are busy"""
+        pool = EnginePool(MagicMock, size=2)
+        
+        with pool.checkout() as first:
+            with pool.checkout() as second:
+                assert first is not second
+        
+        assert pool.created == 2
+
+
+class TestOCRWorkerPool:
+    """Test bounded worker pool"""
+    
+    def test_invalid_mode(self):
+        """Test that unknown modes are rejected"""
+        with pytest.raises(ValueError):
+            OCRWorkerPool(engine_factory=MagicMock, mode="fiber")
+    
+    @pytest.mark.asyncio
+    async def test_runs_off_event_loop(self):
+        """Test that jobs run in worker threads"""
+        pool = OCRWorkerPool(engine_factory=MagicMock, workers=1, mode="thread")
+        name = await pool.run(_thread_name)
+        assert name.startswith("ocr-worker")
+        pool.shutdown()
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_jobs_use_separate_engines(self):
+        """Test that concurrent workers never share an engine"""
+        pool = OCRWorkerPool(engine_factory=MagicMock, workers=2, mode="thread")
+        ids = await asyncio.gather(
+            pool.run(_engine_id, 0.05),
+            pool.run(_engine_id, 0.05)
+        )
+        assert ids[0] != ids[1]
+        pool.shutdown()
+    
+    @pytest.mark.asyncio
+    async def test_queue_depth_and_busy_workers(self):
+        """Test that queue depth and busy workers are reported"""
+        pool = OCRWorkerPool(engine_factory=MagicMock, workers=1, mode="thread")
+        
+        tasks = [asyncio.create_task(pool.run(_engine_id, 0.1)) for _ in range(3)]
+        await asyncio.sleep(0.02)
+        
+        stats = pool.stats()
+        assert stats["busy_workers"] == 1
+        assert stats["queue_depth"] == 2
+        
+        await asyncio.gather(*tasks)
+        stats = pool.stats()
+        assert stats["busy_workers"] == 0
+        assert stats["queue_depth"] == 0
+        assert stats["completed"] == 3
+        pool.shutdown()
+    
+    @pytest.mark.asyncio
+    async def test_run_on_every_worker_uses_every_engine(self):
+        """Test that a job run on every worker reaches every engine instance"""
+        pool = OCRWorkerPool(engine_factory=MagicMock, workers=3, mode="thread")
+        ids = await pool.run_on_every_worker(_engine_id, record=False)
+        
+        assert len(set(ids)) == 3
+        assert pool.engines.created == 3
+        assert pool.stats()["completed"] == 0
+        pool.shutdown()
+    
+    @pytest.mark.asyncio
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="requires fork()")
+    async def test_run_on_every_worker_uses_every_process(self):
+        """Test that a job run on every worker reaches every pool process"""
+        pool = OCRWorkerPool(workers=2, mode="process")
+        pids = await pool.run_on_every_worker(_pid)
+        
+        assert len(set(pids)) == 2
+        assert pool.stats()["completed"] == 2
+        pool.shutdown()